@@ -0,0 +1,22 @@
+"""
+Abbruchsignal für lang laufende Suchen (z.B. aus einem anderen Thread, etwa der GUI).
+
+    token = CancellationToken()
+    threading.Thread(target=lambda: local_search(..., cancel_token=token)).start()
+    ...
+    token.cancel()   # die Suche endet nach der laufenden Iteration mit der besten Lösung
+"""
+import threading
+
+
+class CancellationToken:
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
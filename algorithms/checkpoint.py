@@ -0,0 +1,115 @@
+"""
+Checkpoints für lang laufende lokale Suchen.
+
+Ein Checkpoint enthält die beste Lösung (als int-Spalten: Box-Größen, Rechteck-
+Index in problem.rectangles, x, y, Rotation), den Zielfunktionswert, Iteration,
+verstrichene Zeit, den gepickelten Nachbarschaftsgenerator (inkl. Zustand wie
+overlap_ratio) und die RNG-Zustände. Geschrieben wird atomar (temporäre Datei +
+os.replace), ein abgebrochener Schreibvorgang hinterlässt also den alten Checkpoint.
+Zusatzattribute der Lösung (z.B. guillotine_data) werden nicht gespeichert.
+Die Formatversion steht im Dateikopf und zusätzlich im gepickelten Payload; Dateien
+anderer Versionen oder nicht mehr entpickelbare Inhalte führen zu einem ValueError.
+"""
+import os
+import pickle
+from array import array
+
+from problem.rectangle_packing_problem import Box
+
+CHECKPOINT_MAGIC = b"RPCK"
+CHECKPOINT_VERSION = 2
+
+
+class SearchCheckpoint:
+    """Zustand einer local_search nach einer abgeschlossenen Iteration."""
+
+    def __init__(self, solution, best_value, iteration, elapsed_time, generator_bytes,
+                 rng_state, parallel_rng_state=None):
+        self.solution = solution
+        self.best_value = best_value
+        self.iteration = iteration
+        self.elapsed_time = elapsed_time
+        self.generator_bytes = generator_bytes  # pickle.dumps(neighbor_generator)
+        self.rng_state = rng_state              # random.getstate()
+        self.parallel_rng_state = parallel_rng_state
+
+    def neighbor_generator(self):
+        """Der gespeicherte Nachbarschaftsgenerator (neu entpickelt)."""
+        try:
+            return pickle.loads(self.generator_bytes)
+        except (pickle.UnpicklingError, AttributeError, ImportError, EOFError, TypeError) as e:
+            raise ValueError(f"Nachbarschaftsgenerator des Checkpoints nicht ladbar: {e}") from e
+
+
+def save_checkpoint(path, problem, checkpoint):
+    payload = {
+        "version": CHECKPOINT_VERSION,
+        "L": problem.L,
+        "rect_count": len(problem.rectangles),
+        "solution": encode_solution(problem, checkpoint.solution),
+        "best_value": checkpoint.best_value,
+        "iteration": checkpoint.iteration,
+        "elapsed_time": checkpoint.elapsed_time,
+        "generator": checkpoint.generator_bytes,
+        "rng_state": checkpoint.rng_state,
+        "parallel_rng_state": checkpoint.parallel_rng_state,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CHECKPOINT_MAGIC)
+        f.write(bytes([CHECKPOINT_VERSION]))
+        pickle.dump(payload, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, problem):
+    """Lädt einen Checkpoint; die Lösung wird mit problem.create_empty_solution() aufgebaut."""
+    with open(path, "rb") as f:
+        header = f.read(len(CHECKPOINT_MAGIC) + 1)
+        if header[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+            raise ValueError(f"Keine Checkpoint-Datei: {path}")
+        if len(header) <= len(CHECKPOINT_MAGIC) or header[-1] != CHECKPOINT_VERSION:
+            raise ValueError(f"Nicht unterstützte Checkpoint-Version: {header[len(CHECKPOINT_MAGIC):]!r} "
+                             f"(erwartet {CHECKPOINT_VERSION})")
+        try:
+            payload = pickle.load(f)
+        except (pickle.UnpicklingError, AttributeError, ImportError, EOFError, TypeError) as e:
+            raise ValueError(f"Checkpoint {path} nicht lesbar: {e}") from e
+    if not isinstance(payload, dict) or payload.get("version") != CHECKPOINT_VERSION:
+        version = payload.get("version") if isinstance(payload, dict) else None
+        raise ValueError(f"Nicht unterstützte Checkpoint-Version im Inhalt: {version} (erwartet {CHECKPOINT_VERSION})")
+    if payload["L"] != problem.L or payload["rect_count"] != len(problem.rectangles):
+        raise ValueError("Checkpoint gehört zu einer anderen Probleminstanz")
+    return SearchCheckpoint(decode_solution(problem, payload["solution"]), payload["best_value"],
+                            payload["iteration"], payload["elapsed_time"], payload["generator"],
+                            payload["rng_state"], payload["parallel_rng_state"])
+
+
+def encode_solution(problem, solution):
+    """Lösung als int-Spalten (Box-Größen, Rechteck-Index, x, y, Rotation)."""
+    index = {id(r): i for i, r in enumerate(problem.rectangles)}
+    box_sizes = array('i')
+    rect_ids, xs, ys, rotated = array('i'), array('i'), array('i'), array('b')
+    for box_content in solution.boxes:
+        box_sizes.append(len(box_content))
+        for (r, (x, y), rot) in box_content:
+            rect_ids.append(index[id(r)])
+            xs.append(x)
+            ys.append(y)
+            rotated.append(1 if rot else 0)
+    return box_sizes, rect_ids, xs, ys, rotated
+
+
+def decode_solution(problem, columns):
+    """Gegenstück zu encode_solution; baut die Lösung mit problem.create_empty_solution()."""
+    box_sizes, rect_ids, xs, ys, rotated = columns
+    rects = problem.rectangles
+    solution = problem.create_empty_solution()
+    pos = 0
+    for size in box_sizes:
+        box_content = Box()
+        for i in range(pos, pos + size):
+            list.append(box_content, (rects[rect_ids[i]], (xs[i], ys[i]), bool(rotated[i])))
+        pos += size
+        solution.boxes.append(box_content)
+    return solution
@@ -4,9 +4,12 @@ def greedy(problem, strategy):
     - Sortiere die Elemente (Rechtecke) gem. strategy.get_ordered_rectangles.
     - Platziere nacheinander jedes Rechteck in der (Teil-)Lösung, z.B. per
       strategy.place_rectangle_in_solution(...).
+    Kompakte Lösungen (CompactRectangleSolution) werden am Ende wieder eingefroren.
     """
     sorted_rects = strategy.get_ordered_rectangles(problem.rectangles)
     solution = problem.create_empty_solution()
     for rect in sorted_rects:
         solution = strategy.place_rectangle_in_solution(rect, solution, problem)
+    if hasattr(solution, 'freeze'):
+        solution.freeze()
     return solution
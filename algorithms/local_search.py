@@ -1,56 +1,330 @@
-def local_search(problem, current_solution, neighbor_generator, max_iter=1000, max_time=10.0, partial_sample_size=5, snapshot_callback=None):
+import pickle
+import random
+
+from problem.zobrist import MASK, box_contribution, solution_hash
+
+
+def local_search(problem, current_solution, neighbor_generator, max_iter=1000, max_time=10.0, partial_sample_size=5, snapshot_callback=None, first_k=None,
+                 workers=1, parallel_chunk_size=None, parallel_seed=0, checkpoint_path=None, checkpoint_interval=5.0,
+                 resume_from=None, stop_at_bound=False, transposition_table=None, cancel_token=None):
     """
     Generischer lokaler Suchalgorithmus:
     - Beginnt mit einer (schlechten) Startlösung
     - Erzeugt Nachbarn mit neighbor_generator
     - Wählt den besten Nachbarn und wiederholt
+    Bietet neighbor_generator get_moves/get_moves_subset an, wird mit Move-Objekten
+    gearbeitet: die Startlösung wird (copy-on-write) kopiert und der jeweils beste
+    Zug in-place angewendet. snapshot_callback erhält dann die laufende Lösung.
+    Mit iter_moves werden die Züge lazy erzeugt und einzeln bewertet.
+    Eine kompakte Ergebnislösung (CompactRectangleSolution) wird eingefroren zurückgegeben.
+
+    :param first_k: None = bester aller Nachbarn; k = die Suche einer Iteration stoppt,
+                    sobald k verbessernde Nachbarn gefunden wurden, und nimmt den besten
+                    davon ("best of first k", k=1 ist echtes First Improvement).
+                    Gespart wird nur bei lazy erzeugten Kandidaten (iter_moves bzw.
+                    iter_neighbors); liefert der Generator nur Listen (get_neighbors_subset),
+                    sind alle Nachbarn schon gebaut und bewertet, first_k ändert dann
+                    lediglich, welcher Nachbar gewinnt.
+    :param workers: > 1 verteilt Erzeugung und Bewertung der Stichprobe auf einen
+                    Prozess-Pool (nur mit partial_sample_size > 0, siehe
+                    algorithms.parallel_evaluation).
+    :param parallel_chunk_size: Rechtecke der Stichprobe pro Worker-Aufgabe
+                                (None = Stichprobe gleichmäßig auf die Worker verteilt).
+    :param parallel_seed: Basis-Seed für die RNGs der Worker-Aufgaben.
+    :param checkpoint_path: schreibt höchstens alle checkpoint_interval Sekunden (nach
+                            einer Iteration) sowie am Ende einen Checkpoint (siehe
+                            algorithms.checkpoint); fortsetzen mit resume_local_search.
+    :param resume_from: SearchCheckpoint, dessen Iteration, Zeit und RNG-Zustände
+                        übernommen werden (max_iter/max_time gelten insgesamt).
+    :param stop_at_bound: beendet die Suche, sobald eine zulässige Lösung
+                          (problem.solution_penalty() == 0) die untere Schranke
+                          problem.objective_lower_bound() erreicht (Lösung optimal).
+    :param transposition_table: TranspositionTable (algorithms.transposition_table), die
+                                vor jeder Bewertung nach dem Hash des Nachbarn gefragt
+                                wird (nicht mit workers > 1).
+    :param cancel_token: CancellationToken (algorithms.cancellation); nach cancel()
+                         endet die Suche vor der nächsten Iteration.
     """
     import time
     
-    best_solution = current_solution
-    best_value = problem.evaluate_solution(best_solution)
+    best_value = problem.evaluate_solution(current_solution)
+    
+    # Nachbarschaften mit Move-API (get_moves/get_moves_subset) werden nur über
+    # delta() bewertet; angewendet wird ausschließlich der akzeptierte Zug.
+    use_moves = hasattr(neighbor_generator, 'get_moves_subset') or hasattr(neighbor_generator, 'iter_moves')
+    if use_moves:
+        best_solution = current_solution.copy()
+    else:
+        best_solution = current_solution
+    
+    evaluator = None
+    if workers > 1 and partial_sample_size > 0:
+        from .parallel_evaluation import ParallelNeighborEvaluator
+        evaluator = ParallelNeighborEvaluator(problem, workers, parallel_chunk_size, parallel_seed)
     
     start_time = time.time()
     elapsed_time = 0
     iter_count = 0
+    if resume_from is not None:
+        start_time -= resume_from.elapsed_time
+        elapsed_time = resume_from.elapsed_time
+        iter_count = resume_from.iteration
+        random.setstate(resume_from.rng_state)
+        if evaluator is not None and resume_from.parallel_rng_state is not None:
+            evaluator._rng.setstate(resume_from.parallel_rng_state)
+    last_checkpoint = time.time()
+    target = problem.objective_lower_bound() if stop_at_bound else None
+    if transposition_table is not None:
+        transposition_table.put(solution_hash(best_solution), best_value)
     
-    # FIRST IMPROVEMENT Strategie
-    # Speichere den aktuellen besten Wert
-    while iter_count < max_iter and elapsed_time < max_time:
-        # Optional: Nur einen Teil der möglichen Nachbarn durchsuchen
-        if partial_sample_size > 0:
-            neighbors = neighbor_generator.get_neighbors_subset(problem, best_solution, partial_sample_size)
-        else:
-            neighbors = neighbor_generator.get_neighbors(problem, best_solution)
-        
-        # Wenn keine Nachbarn gefunden wurden, breche ab
-        if not neighbors:
-            break
-            
-        # Finde den besten Nachbarn
-        best_neighbor = None
-        best_neighbor_value = float('inf')
-        
-        for neighbor in neighbors:
-            neighbor_value = problem.evaluate_solution(neighbor)
-            if neighbor_value < best_neighbor_value:
-                best_neighbor = neighbor
-                best_neighbor_value = neighbor_value
-        
-        # Wenn der beste Nachbar besser ist als die aktuelle Lösung, aktualisiere
-        if best_neighbor_value < best_value:
-            best_solution = best_neighbor
-            best_value = best_neighbor_value
+    try:
+        # Best Improvement bzw. mit first_k (best of) FIRST IMPROVEMENT Strategie
+        # Speichere den aktuellen besten Wert
+        while iter_count < max_iter and elapsed_time < max_time:
+            if target is not None and best_value <= target and problem.solution_penalty(best_solution) == 0:
+                # Untere Schranke zulässig erreicht: keine zulässige Lösung kann besser sein
+                break
+            if cancel_token is not None and cancel_token.cancelled:
+                break
+            if evaluator is not None:
+                step = _parallel_step(evaluator, best_solution, best_value, neighbor_generator, partial_sample_size, first_k, use_moves)
+            elif use_moves:
+                step = _move_step(problem, best_solution, best_value, neighbor_generator, partial_sample_size, first_k,
+                                  transposition_table)
+            else:
+                step = _neighbor_step(problem, best_solution, best_value, neighbor_generator, partial_sample_size, first_k,
+                                      transposition_table)
+            if step is None:
+                # Kein besserer Nachbar gefunden, Lokales Optimum erreicht
+                break
+            best_solution, best_value = step
             
             # Optional: Snapshot für die Visualisierung speichern
             elapsed_time = time.time() - start_time
             if snapshot_callback:
                 snapshot_callback(best_solution, iter_count, best_value, elapsed_time)
+                
+            iter_count += 1
+            elapsed_time = time.time() - start_time
+            if checkpoint_path is not None and time.time() - last_checkpoint >= checkpoint_interval:
+                _write_checkpoint(checkpoint_path, problem, best_solution, best_value, iter_count,
+                                  elapsed_time, neighbor_generator, evaluator)
+                last_checkpoint = time.time()
+    except BaseException:
+        # Auch nach einem Abbruch (z.B. KeyboardInterrupt) den letzten Stand sichern;
+        # ein Fehler dabei darf die ursprüngliche Ausnahme aber nicht verdecken
+        if checkpoint_path is not None:
+            try:
+                _write_checkpoint(checkpoint_path, problem, best_solution, best_value, iter_count,
+                                  time.time() - start_time, neighbor_generator, evaluator)
+            except Exception:
+                pass
+        raise
+    else:
+        if checkpoint_path is not None:
+            _write_checkpoint(checkpoint_path, problem, best_solution, best_value, iter_count,
+                              time.time() - start_time, neighbor_generator, evaluator)
+    finally:
+        if evaluator is not None:
+            evaluator.shutdown()
+    
+    if hasattr(best_solution, 'freeze'):
+        best_solution.freeze()
+    return best_solution
+
+
+def resume_local_search(problem, checkpoint_path, neighbor_generator=None, **kwargs):
+    """
+    Setzt eine lokale Suche aus einem Checkpoint fort (gleiches problem). Ohne
+    neighbor_generator wird der gespeicherte verwendet, sonst erhält der übergebene
+    dessen öffentlichen Zustand (z.B. overlap_ratio). Weitere Parameter wie bei
+    local_search; checkpoint_path wird standardmäßig weiter beschrieben.
+    """
+    from .checkpoint import load_checkpoint
+    checkpoint = load_checkpoint(checkpoint_path, problem)
+    saved_generator = checkpoint.neighbor_generator()
+    if neighbor_generator is None:
+        neighbor_generator = saved_generator
+    else:
+        neighbor_generator.__dict__.update(
+            {key: value for key, value in vars(saved_generator).items() if not key.startswith('_')})
+    kwargs.setdefault('checkpoint_path', checkpoint_path)
+    return local_search(problem, checkpoint.solution, neighbor_generator, resume_from=checkpoint, **kwargs)
+
+
+def _write_checkpoint(path, problem, solution, value, iter_count, elapsed_time, neighbor_generator, evaluator):
+    from .checkpoint import SearchCheckpoint, save_checkpoint
+    checkpoint = SearchCheckpoint(solution, value, iter_count, elapsed_time,
+                                  pickle.dumps(neighbor_generator, pickle.HIGHEST_PROTOCOL),
+                                  random.getstate(),
+                                  evaluator._rng.getstate() if evaluator is not None else None)
+    save_checkpoint(path, problem, checkpoint)
+
+
+def _neighbor_step(problem, solution, current_value, neighbor_generator, partial_sample_size, first_k, table=None):
+    """
+    Erzeugt alle Nachbarn als Lösungen und liefert (bester Nachbar, Wert),
+    falls dieser verbessert, sonst None. Mit first_k und iter_neighbors werden die
+    Nachbarn einzeln gebaut und bewertet (siehe _lazy_neighbor_step).
+    """
+    if first_k is not None and hasattr(neighbor_generator, 'iter_neighbors'):
+        return _lazy_neighbor_step(problem, solution, current_value, neighbor_generator, partial_sample_size,
+                                   first_k, table)
+
+    # Optional: Nur einen Teil der möglichen Nachbarn durchsuchen
+    if partial_sample_size > 0:
+        neighbors = neighbor_generator.get_neighbors_subset(problem, solution, partial_sample_size)
+    else:
+        neighbors = neighbor_generator.get_neighbors(problem, solution)
+    
+    # Wenn keine Nachbarn gefunden wurden, breche ab
+    if not neighbors:
+        return None
+        
+    # Finde den besten Nachbarn
+    best_neighbor = None
+    best_neighbor_value = float('inf')
+    
+    # Alle Nachbarn gebündelt bewerten
+    if table is None:
+        neighbor_values = problem.evaluate_solutions(neighbors)
+    else:
+        neighbor_values = _evaluate_with_table(problem, solution, neighbors, table)
+    improving = 0
+    for neighbor, neighbor_value in zip(neighbors, neighbor_values):
+        if neighbor_value < best_neighbor_value:
+            best_neighbor = neighbor
+            best_neighbor_value = neighbor_value
+        if first_k is not None and neighbor_value < current_value:
+            improving += 1
+            if improving >= first_k:
+                break
+    if best_neighbor_value < current_value:
+        return best_neighbor, best_neighbor_value
+    return None
+
+
+def _lazy_neighbor_step(problem, solution, current_value, neighbor_generator, partial_sample_size, first_k, table):
+    """
+    Wie _neighbor_step, aber Nachbar für Nachbar: nach first_k verbessernden Nachbarn
+    werden die restlichen weder gebaut noch bewertet.
+    """
+    shared = _shared_contributions(solution) if table is not None else None
+    best_neighbor = None
+    best_neighbor_value = float('inf')
+    improving = 0
+    for neighbor in neighbor_generator.iter_neighbors(problem, solution, partial_sample_size):
+        if table is None:
+            neighbor_value = problem.evaluate_solution(neighbor)
         else:
-            # Kein besserer Nachbar gefunden, Lokales Optimum erreicht
-            break
-            
-        iter_count += 1
-        elapsed_time = time.time() - start_time
+            key = _neighbor_hash(shared, neighbor)
+            neighbor_value = table.get(key)
+            if neighbor_value is None:
+                neighbor_value = problem.evaluate_solution(neighbor)
+                table.put(key, neighbor_value)
+        if neighbor_value < best_neighbor_value:
+            best_neighbor = neighbor
+            best_neighbor_value = neighbor_value
+        if neighbor_value < current_value:
+            improving += 1
+            if improving >= first_k:
+                break
+    if best_neighbor_value < current_value:
+        return best_neighbor, best_neighbor_value
+    return None
+
+
+def _move_step(problem, solution, current_value, neighbor_generator, partial_sample_size, first_k, table=None):
+    """
+    Bewertet die Züge per delta() und wendet den besten in-place auf solution an,
+    falls er verbessert. Gibt (solution, neuer Wert) zurück, sonst None.
+    """
+    if hasattr(neighbor_generator, 'iter_moves'):
+        # Streaming: Züge werden erst beim Iterieren gebaut
+        moves = neighbor_generator.iter_moves(problem, solution, partial_sample_size)
+    elif partial_sample_size > 0:
+        moves = neighbor_generator.get_moves_subset(problem, solution, partial_sample_size)
+    else:
+        moves = neighbor_generator.get_moves(problem, solution)
+    
+    current_hash = solution_hash(solution) if table is not None else None
+    best_move = None
+    best_delta = 0
+    improving = 0
+    for move in moves:
+        key = move.result_hash(solution, current_hash) if table is not None else None
+        value = table.get(key) if key is not None else None
+        if value is not None:
+            delta = value - current_value
+        else:
+            delta = move.delta(problem, solution)
+            if key is not None:
+                table.put(key, current_value + delta)
+        if delta < 0:
+            improving += 1
+            if delta < best_delta:
+                best_move = move
+                best_delta = delta
+            if first_k is not None and improving >= first_k:
+                break
     
-    return best_solution
\ No newline at end of file
+    if best_move is None:
+        # Keine Züge oder kein verbessernder Zug: Lokales Optimum erreicht
+        return None
+    best_move.apply(solution)
+    return solution, current_value + best_delta
+
+
+def _evaluate_with_table(problem, solution, neighbors, table):
+    """
+    Wie problem.evaluate_solutions, bewertet aber nur Nachbarn, deren Hash unbekannt ist.
+    Die Nachbarn teilen sich (copy-on-write) die meisten Boxen mit solution, deren
+    Hash-Beiträge daher nur einmal bestimmt werden.
+    """
+    shared = _shared_contributions(solution)
+    values = [None]*len(neighbors)
+    missing = {}  # Hash -> Indizes der Nachbarn
+    for i, neighbor in enumerate(neighbors):
+        key = _neighbor_hash(shared, neighbor)
+        if key in missing:
+            # Duplikat innerhalb der Nachbarschaft
+            table.hits += 1
+            missing[key].append(i)
+            continue
+        value = table.get(key)
+        if value is None:
+            missing[key] = [i]
+        else:
+            values[i] = value
+    if missing:
+        new_values = problem.evaluate_solutions([neighbors[indices[0]] for indices in missing.values()])
+        for (key, indices), value in zip(missing.items(), new_values):
+            table.put(key, value)
+            for i in indices:
+                values[i] = value
+    return values
+
+
+def _shared_contributions(solution):
+    return {id(box_content): box_contribution(box_content) for box_content in solution.boxes}
+
+
+def _neighbor_hash(shared, neighbor):
+    """Hash eines Nachbarn; Beiträge der mit solution geteilten Boxen aus shared."""
+    key = 0
+    for box_content in neighbor.boxes:
+        contribution = shared.get(id(box_content))
+        key += contribution if contribution is not None else box_contribution(box_content)
+    return key & MASK
+
+
+def _parallel_step(evaluator, solution, current_value, neighbor_generator, partial_sample_size, first_k, use_moves):
+    """Wie _move_step/_neighbor_step, aber über den Prozess-Pool."""
+    candidate, score = evaluator.best_candidate(solution, current_value, neighbor_generator,
+                                                partial_sample_size, first_k, use_moves)
+    if candidate is None:
+        return None
+    if use_moves:
+        candidate.apply(solution)
+        return solution, current_value + score
+    return candidate, score
@@ -0,0 +1,211 @@
+"""
+Optionale Zähler und Timer für die heißen Pfade des Solvers.
+
+Die Messpunkte werden nicht im Code der Module geprüft, sondern stehen zentral
+in INSTRUMENTATION: enable() ersetzt die betroffenen Funktionen/Methoden durch
+zählende Wrapper, disable() stellt die Originale wieder her. Ausgeschaltet
+kostet die Instrumentierung daher nichts. Gezählt wird nur im aktuellen
+Prozess (nicht in den Workern der parallelen Bewertung).
+
+    from algorithms import metrics
+    metrics.enable(dump_interval=5.0)   # optional: periodischer Dump nach stderr
+    ...
+    print(metrics.as_dict())
+    metrics.disable()
+
+Da die Messpunkte über Namen gefunden werden, zählt hook_counts() zusätzlich die
+Aufrufe jedes einzelnen Eintrags; ein Test stellt sicher, dass keiner davon nach
+einer Umbenennung oder Umstellung der Aufrufer stumm bleibt.
+"""
+import importlib
+import json
+import sys
+import time
+from functools import wraps
+
+# (Modul, Attributpfad, Art, Name der Metrik)
+#   count:     Aufrufe zählen
+#   placement: Platzierungsversuch; None bzw. (None, ...) gilt als gescheitert
+#   timer:     Aufrufe zählen und Laufzeit messen
+#   move:      Move-Konstruktor; gezählt wird pro Zugtyp (Move.kind)
+INSTRUMENTATION = [
+    ("problem.rectangle_packing_problem", "RectanglePackingProblem.evaluate_solution", "count", "evaluate_solution"),
+    ("problem.rectangle_packing_problem", "RectanglePackingProblem.evaluate_solutions", "count", "evaluate_solutions"),
+    ("problem.rectangle_packing_problem", "RectanglePackingProblem._compute_box_penalty", "count", "box_penalty_computations"),
+    ("neighbors.moves", "Move.__init__", "move", "moves"),
+    ("neighbors.moves", "Move.delta", "count", "move_deltas"),
+    ("neighbors.moves", "Move.apply", "count", "moves_applied"),
+    ("neighbors.moves", "DecodedRepackMove.delta", "count", "move_deltas"),
+    ("problem.rectangle_packing_problem", "RectangleSolution.copy", "count", "copies.solution"),
+    ("problem.compact_solution", "CompactRectangleSolution.copy", "count", "copies.solution"),
+    ("problem.rectangle_packing_problem", "Box.__copy__", "count", "copies.box"),
+    ("problem.rectangle_packing_problem", "Box.__deepcopy__", "count", "deepcopies.box"),
+    ("problem.compact_solution", "CompactRectangleSolution.__deepcopy__", "count", "deepcopies.solution"),
+    ("strategies.bottomleft_strategy", "StrategyBottomLeft._can_place", "count", "overlap_checks.bottomleft"),
+    ("neighbors.geometry_based_neighbor", "GeometryBasedNeighbor._overlaps_any", "count", "overlap_checks.geometry"),
+    ("neighbors.geometry_based_neighbor", "GeometryBasedNeighbor._is_valid_position", "count", "overlap_checks.geometry"),
+    ("strategies.bottomleft_strategy", "StrategyBottomLeft._find_position_for_rect", "placement", "placements.bottomleft"),
+    ("strategies.bottomleft_strategy", "StrategyBottomLeft._find_skyline_position", "placement", "placements.skyline"),
+    ("strategies.free_rect_index", "FreeRectIndex.best_fit", "placement", "placements.guillotine"),
+    ("neighbors.geometry_based_neighbor", "GeometryBasedNeighbor._find_bottom_left_position", "placement", "placements.geometry"),
+    ("problem.shelf_packing", "shelf_placement", "placement", "placements.shelf"),
+    # shelf_placement ist zusätzlich per Namen importiert
+    ("problem.rectangle_packing_problem", "shelf_placement", "placement", "placements.shelf"),
+    ("algorithms.local_search", "_move_step", "timer", "local_search.iteration"),
+    ("algorithms.local_search", "_neighbor_step", "timer", "local_search.iteration"),
+    ("algorithms.local_search", "_parallel_step", "timer", "local_search.iteration"),
+]
+
+_counters = {}
+_hook_calls = {}  # "Modul:Attributpfad" -> Aufrufe (unabhängig vom Namen der Metrik)
+_timers = {}     # Name -> [Anzahl, Summe, Maximum]
+_originals = []  # (Besitzer, Attribut, Original)
+_dump = None     # [Intervall, Stream, nächster Zeitpunkt]
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable(dump_interval=None, dump_stream=None, reset_counters=True):
+    """
+    Schaltet die Instrumentierung ein.
+    :param dump_interval: Sekunden zwischen zwei Dumps (als JSON-Zeile, geprüft
+                          nach jeder local_search-Iteration); None = kein Dump.
+    :param dump_stream: Ziel der Dumps (Standard: sys.stderr).
+    """
+    global _dump
+    if reset_counters:
+        reset()
+    if dump_interval is not None:
+        _dump = [dump_interval, dump_stream or sys.stderr, time.perf_counter() + dump_interval]
+    if is_enabled():
+        return
+    for module_name, path, kind, name in INSTRUMENTATION:
+        owner = importlib.import_module(module_name)
+        *owner_path, attr = path.split(".")
+        for part in owner_path:
+            owner = getattr(owner, part)
+        original = vars(owner)[attr]
+        _originals.append((owner, attr, original))
+        setattr(owner, attr, _WRAPPERS[kind](original, name, f"{module_name}:{path}"))
+
+
+def disable():
+    """Stellt alle Originalfunktionen wieder her (die Messwerte bleiben erhalten)."""
+    global _dump
+    for owner, attr, original in reversed(_originals):
+        setattr(owner, attr, original)
+    _originals.clear()
+    _dump = None
+
+
+def reset():
+    _counters.clear()
+    _timers.clear()
+    _hook_calls.clear()
+
+
+def hook_counts():
+    """Aufrufe je Eintrag aus INSTRUMENTATION ("Modul:Attributpfad" -> Anzahl, auch 0)."""
+    return {f"{module_name}:{path}": _hook_calls.get(f"{module_name}:{path}", 0)
+            for module_name, path, _, _ in INSTRUMENTATION}
+
+
+def as_dict():
+    """Aktuelle Messwerte: {"counters": {...}, "timers": {Name: {count, total, mean, max}}}."""
+    return {
+        "counters": dict(sorted(_counters.items())),
+        "timers": {name: {"count": count, "total": total, "mean": total / count if count else 0.0, "max": maximum}
+                   for name, (count, total, maximum) in sorted(_timers.items())},
+    }
+
+
+def dump(stream=None):
+    """Schreibt die Messwerte als eine JSON-Zeile (mit Zeitstempel)."""
+    stream = stream or sys.stderr
+    stream.write(json.dumps({"time": time.time(), **as_dict()}) + "\n")
+    stream.flush()
+
+
+class collecting:
+    """Kontextmanager: with metrics.collecting() as m: ... ; m enthält danach as_dict()."""
+
+    def __init__(self, **enable_kwargs):
+        self.enable_kwargs = enable_kwargs
+        self.result = None
+
+    def __enter__(self):
+        enable(**self.enable_kwargs)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.result = as_dict()
+        disable()
+
+
+# ------------------------------------------------------------------------------
+#   Wrapper
+# ------------------------------------------------------------------------------
+
+def _count(func, name, hook):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _hook_calls[hook] = _hook_calls.get(hook, 0) + 1
+        _counters[name] = _counters.get(name, 0) + 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _placement(func, name, hook):
+    tried = name + ".tried"
+    succeeded = name + ".succeeded"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _hook_calls[hook] = _hook_calls.get(hook, 0) + 1
+        result = func(*args, **kwargs)
+        _counters[tried] = _counters.get(tried, 0) + 1
+        if result is not None and not (isinstance(result, tuple) and len(result) == 2 and result[0] is None):
+            _counters[succeeded] = _counters.get(succeeded, 0) + 1
+        return result
+    return wrapper
+
+
+def _timer(func, name, hook):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _hook_calls[hook] = _hook_calls.get(hook, 0) + 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = _timers.get(name)
+            if entry is None:
+                _timers[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+            _maybe_dump()
+    return wrapper
+
+
+def _move(func, name, hook):
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        _hook_calls[hook] = _hook_calls.get(hook, 0) + 1
+        func(self, *args, **kwargs)
+        key = name + "." + self.kind
+        _counters[key] = _counters.get(key, 0) + 1
+    return wrapper
+
+
+def _maybe_dump():
+    if _dump is not None and time.perf_counter() >= _dump[2]:
+        _dump[2] = time.perf_counter() + _dump[0]
+        dump(_dump[1])
+
+
+_WRAPPERS = {"count": _count, "placement": _placement, "timer": _timer, "move": _move}
@@ -0,0 +1,146 @@
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .checkpoint import decode_solution, encode_solution
+
+# Problem-Instanz im Worker-Prozess (einmalig per initializer übertragen)
+_worker_problem = None
+
+
+class ParallelNeighborEvaluator:
+    """
+    Verteilt Erzeugung und Bewertung der Nachbarn einer local_search-Iteration
+    auf einen ProcessPoolExecutor.
+
+    - Die Stichprobe (partial_sample_size) wird in Chunks zu chunk_size Rechtecken
+      aufgeteilt (Standard: ein Chunk pro Worker); jeder Chunk ist eine Aufgabe mit
+      eigenem, deterministisch aus seed abgeleitetem RNG-Seed (random.seed im Worker).
+    - Die Lösung wird pro Iteration einmal als int-Spalten (algorithms.checkpoint.
+      encode_solution) serialisiert und im Worker gegen _worker_problem dekodiert,
+      die Rectangle-Objekte sind dort also die des Worker-Problems. Der
+      Nachbarschaftsgenerator wird ebenfalls einmal pro Iteration gepickelt.
+    - Worker liefern nur (Index, Score) ihres besten Kandidaten zurück. Der Gewinner
+      wird im Hauptprozess mit demselben Seed und einer Kopie desselben gepickelten
+      Generators (ohne prozesslokale Caches) nachgebaut, es werden also keine
+      Lösungen zurückübertragen.
+    Funktioniert mit jedem Generator mit get_neighbors_subset (bzw. Move-API).
+    """
+
+    def __init__(self, problem, workers, chunk_size=None, seed=0):
+        self.problem = problem
+        self.workers = workers
+        self.chunk_size = None if chunk_size is None else max(1, chunk_size)
+        self._rng = random.Random(seed)
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(problem,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+    def best_candidate(self, solution, current_value, neighbor_generator, sample_size, first_k, use_moves):
+        """
+        Liefert (Kandidat, Score) des besten verbessernden Kandidaten über alle Chunks
+        oder (None, None). Kandidat ist ein Move (Score = delta) bzw. eine Nachbarlösung
+        (Score = Zielfunktionswert).
+        """
+        chunk_size = self.chunk_size or max(1, -(-sample_size // self.workers))
+        chunk_sizes = [chunk_size]*(sample_size // chunk_size)
+        if sample_size % chunk_size:
+            chunk_sizes.append(sample_size % chunk_size)
+        seeds = [self._rng.getrandbits(64) for _ in chunk_sizes]
+
+        solution_bytes = pickle.dumps(encode_solution(self.problem, solution), pickle.HIGHEST_PROTOCOL)
+        generator_bytes = pickle.dumps(neighbor_generator, pickle.HIGHEST_PROTOCOL)
+        tasks = [(solution_bytes, generator_bytes, size, chunk_seed, current_value, first_k, use_moves)
+                 for size, chunk_seed in zip(chunk_sizes, seeds)]
+        results = list(self._executor.map(_evaluate_chunk, tasks))
+
+        # Bei Gleichstand gewinnt der Chunk mit kleinerem Index (deterministisch)
+        best_chunk = None
+        best_score = 0
+        for chunk_idx, (index, score, _) in enumerate(results):
+            if index is not None and score < best_score:
+                best_chunk = chunk_idx
+                best_score = score
+
+        candidate = None
+        if best_chunk is not None:
+            candidate = self._replay(solution, pickle.loads(generator_bytes), chunk_sizes[best_chunk],
+                                     seeds[best_chunk], results[best_chunk][0], use_moves)
+
+        # Generator-Zustand so fortschreiben wie nach einem seriellen Aufruf
+        neighbor_generator.__dict__.update(results[0][2])
+
+        if candidate is None:
+            return None, None
+        if use_moves:
+            return candidate, best_score
+        return candidate, current_value + best_score
+
+    def _replay(self, solution, neighbor_generator, sample_size, chunk_seed, index, use_moves):
+        # Globalen RNG-Zustand des Aufrufers nicht verändern
+        rng_state = random.getstate()
+        try:
+            random.seed(chunk_seed)
+            candidates = _candidates(self.problem, solution, neighbor_generator, sample_size, use_moves)
+            for candidate_idx, candidate in enumerate(candidates):
+                if candidate_idx == index:
+                    return candidate
+        finally:
+            random.setstate(rng_state)
+        return None
+
+
+def _init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _evaluate_chunk(task):
+    solution_bytes, generator_bytes, sample_size, chunk_seed, current_value, first_k, use_moves = task
+    solution = decode_solution(_worker_problem, pickle.loads(solution_bytes))
+    neighbor_generator = pickle.loads(generator_bytes)
+    random.seed(chunk_seed)
+    candidates = _candidates(_worker_problem, solution, neighbor_generator, sample_size, use_moves)
+    index, score = _best_in_chunk(_worker_problem, solution, current_value, candidates, use_moves, first_k)
+    return index, score, _public_state(neighbor_generator)
+
+
+def _candidates(problem, solution, neighbor_generator, sample_size, use_moves):
+    if not use_moves:
+        return neighbor_generator.get_neighbors_subset(problem, solution, sample_size)
+    if hasattr(neighbor_generator, 'iter_moves'):
+        return neighbor_generator.iter_moves(problem, solution, sample_size)
+    return neighbor_generator.get_moves_subset(problem, solution, sample_size)
+
+
+def _best_in_chunk(problem, solution, current_value, candidates, use_moves, first_k):
+    """Index und Score (Verbesserung, < 0) des besten Kandidaten im Chunk."""
+    if use_moves:
+        scores = (move.delta(problem, solution) for move in candidates)
+    else:
+        scores = (value - current_value for value in problem.evaluate_solutions(candidates))
+    best_index = None
+    best_score = 0
+    improving = 0
+    for index, score in enumerate(scores):
+        if score < 0:
+            improving += 1
+            if score < best_score:
+                best_index = index
+                best_score = score
+            if first_k is not None and improving >= first_k:
+                break
+    return best_index, best_score
+
+
+def _public_state(neighbor_generator):
+    # Nur öffentliche Attribute (z.B. overlap_ratio), keine internen Caches
+    return {key: value for key, value in vars(neighbor_generator).items() if not key.startswith('_')}
@@ -0,0 +1,225 @@
+"""
+Paralleles Multi-Start-Portfolio aus unabhängigen lokalen Suchen.
+
+Jeder Lauf (RunSpec) kombiniert eine Startlösung (Greedy Guillotine, Greedy
+BottomLeft oder eine zufällige, per Shelf gepackte Permutation) mit einer
+Nachbarschaft und eigenen Parametern. Die Läufe arbeiten in Runden von
+round_time Sekunden (ein local_search-Aufruf pro Runde) auf einem Prozess-Pool.
+Nach jeder Runde meldet ein Lauf sein Ergebnis an den Hauptprozess, der das
+globale Optimum führt; Läufe, die sich in einer Runde nicht verbessert haben
+(stagniert) und schlechter als das globale Optimum sind, starten von diesem
+neu (mit frischem Generator). Lösungen werden als int-Spalten übertragen
+(siehe algorithms.checkpoint). Wegen der Zeitlimits ist das Ergebnis nicht
+deterministisch. Erreicht ein Lauf zulässig die untere Schranke des Problems
+(problem.objective_lower_bound), werden keine weiteren Runden gestartet und
+noch nicht begonnene abgebrochen; die Läufe selbst suchen mit stop_at_bound=True
+(sofern search_kwargs nichts anderes angibt).
+"""
+import os
+import pickle
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .checkpoint import decode_solution, encode_solution
+from .greedy import greedy
+from .local_search import local_search
+
+# Problem-Instanz im Worker-Prozess (einmalig per initializer übertragen)
+_worker_problem = None
+
+START_SOLUTIONS = ("guillotine", "bottomleft", "random")
+NEIGHBORHOODS = ("geometry", "rule", "overlap")
+
+
+class RunSpec:
+    """
+    Konfiguration eines Portfolio-Laufs.
+    :param start: "guillotine", "bottomleft" oder "random"
+    :param neighbor: "geometry", "rule" oder "overlap"
+    :param neighbor_kwargs: Parameter für den Konstruktor der Nachbarschaft
+    :param search_kwargs: weitere Parameter für local_search (z.B. partial_sample_size)
+    :param seed: Basis-Seed des Laufs
+    """
+
+    def __init__(self, start="guillotine", neighbor="geometry", neighbor_kwargs=None, search_kwargs=None, seed=0):
+        if start not in START_SOLUTIONS:
+            raise ValueError(f"Unbekannte Startlösung: {start}")
+        if neighbor not in NEIGHBORHOODS:
+            raise ValueError(f"Unbekannte Nachbarschaft: {neighbor}")
+        self.start = start
+        self.neighbor = neighbor
+        self.neighbor_kwargs = neighbor_kwargs or {}
+        self.search_kwargs = search_kwargs or {}
+        self.seed = seed
+
+    def __repr__(self):
+        return f"RunSpec({self.start!r}, {self.neighbor!r}, seed={self.seed})"
+
+
+class PortfolioResult:
+    def __init__(self, best_solution, best_value, best_run, history):
+        self.best_solution = best_solution
+        self.best_value = best_value
+        self.best_run = best_run    # Index des Laufs mit dem besten Ergebnis
+        self.history = history      # Liste von (Zeit, Lauf, Runde, Wert, neu gestartet)
+
+
+def default_portfolio(runs, seed=0):
+    """Mischt Startlösungen, Nachbarschaften und Stichprobengrößen über runs Läufe."""
+    sample_sizes = (5, 10, 20)
+    specs = []
+    for i in range(runs):
+        specs.append(RunSpec(start=START_SOLUTIONS[i % len(START_SOLUTIONS)],
+                             neighbor=NEIGHBORHOODS[(i // len(START_SOLUTIONS)) % len(NEIGHBORHOODS)],
+                             search_kwargs={"partial_sample_size": sample_sizes[(i // 9) % len(sample_sizes)]},
+                             seed=seed + i))
+    return specs
+
+
+def run_portfolio(problem, specs=None, workers=None, max_time=60.0, round_time=5.0, max_rounds=None,
+                  seed=0, progress_callback=None):
+    """
+    Führt die Läufe aus specs (Standard: default_portfolio mit workers Läufen) parallel aus.
+    :param workers: Prozesse im Pool (Standard: os.cpu_count()); es sind nie mehr als
+                    workers Runden gleichzeitig übergeben, weitere Läufe warten reihum.
+    :param max_time: Gesamtzeit; jede Runde erhält höchstens die bis dahin verbleibende
+                     Zeit, nach Ablauf wird keine Runde mehr gestartet.
+    :param max_rounds: optionale Obergrenze für Runden pro Lauf.
+    :param progress_callback: progress_callback(bester Wert, Zeit, Lauf, Wert des Laufs)
+                              nach jeder Runde.
+    :return: PortfolioResult
+    """
+    workers = workers or os.cpu_count() or 1
+    if specs is None:
+        specs = default_portfolio(workers, seed)
+    start_time = time.time()
+    deadline = start_time + max_time
+    target = problem.objective_lower_bound()
+
+    runs = [_RunState(spec) for spec in specs]
+    best_columns = None
+    best_value = None
+    best_penalty = None
+    best_run = None
+    history = []
+
+    # Läufe, deren nächste Runde noch nicht übergeben wurde (FIFO = reihum)
+    ready = deque(range(len(runs)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem,)) as executor:
+        pending = {}
+
+        def submit_ready():
+            # höchstens workers Runden gleichzeitig, jede mit dem verbleibenden Zeitbudget
+            while ready and len(pending) < workers:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    ready.clear()
+                    return
+                run_idx = ready.popleft()
+                pending[executor.submit(_run_round, runs[run_idx].task(min(round_time, remaining)))] = run_idx
+
+        submit_ready()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                run_idx = pending.pop(future)
+                run = runs[run_idx]
+                columns, value, penalty, generator_bytes = future.result()
+                improved = run.value is None or value < run.value
+                run.columns, run.value, run.generator_bytes = columns, value, generator_bytes
+                run.rounds += 1
+                if best_value is None or value < best_value:
+                    best_columns, best_value, best_penalty, best_run = columns, value, penalty, run_idx
+
+                restarted = False
+                if not improved and value > best_value:
+                    # stagniert: vom globalen Optimum mit frischem Generator neu starten
+                    run.columns, run.value, run.generator_bytes = best_columns, best_value, None
+                    restarted = True
+                elapsed = time.time() - start_time
+                history.append((elapsed, run_idx, run.rounds, value, restarted))
+                if progress_callback:
+                    progress_callback(best_value, elapsed, run_idx, value)
+
+                if target is not None and best_value <= target and best_penalty == 0:
+                    # optimal: übrige Runden sind überflüssig
+                    ready.clear()
+                    for other in list(pending):
+                        if other.cancel():
+                            del pending[other]
+                    continue
+                if max_rounds is None or run.rounds < max_rounds:
+                    ready.append(run_idx)
+            submit_ready()
+
+    best_solution = decode_solution(problem, best_columns) if best_columns is not None else None
+    return PortfolioResult(best_solution, best_value, best_run, history)
+
+
+class _RunState:
+    """Zustand eines Laufs zwischen zwei Runden (im Hauptprozess)."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.columns = None          # None = Startlösung erst im Worker bauen
+        self.value = None
+        self.generator_bytes = None  # None = frischer Generator
+        self.rounds = 0
+
+    def task(self, max_time):
+        round_seed = random.Random(f"{self.spec.seed}:{self.rounds}").getrandbits(64)
+        return self.spec, self.columns, self.generator_bytes, round_seed, max_time
+
+
+def _init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _run_round(task):
+    spec, columns, generator_bytes, round_seed, max_time = task
+    problem = _worker_problem
+    random.seed(round_seed)
+    if columns is None:
+        solution = _start_solution(problem, spec.start)
+    else:
+        solution = decode_solution(problem, columns)
+    if generator_bytes is None:
+        neighbor_generator = _make_neighbor(spec)
+    else:
+        neighbor_generator = pickle.loads(generator_bytes)
+    search_kwargs = dict(spec.search_kwargs)
+    search_kwargs["max_time"] = max_time
+    search_kwargs.setdefault("stop_at_bound", True)
+    best = local_search(problem, solution, neighbor_generator, **search_kwargs)
+    return (encode_solution(problem, best), problem.evaluate_solution(best), problem.solution_penalty(best),
+            pickle.dumps(neighbor_generator, pickle.HIGHEST_PROTOCOL))
+
+
+def _start_solution(problem, start):
+    if start == "guillotine":
+        from strategies.guillotine_strategy import StrategyGuillotine
+        return greedy(problem, StrategyGuillotine())
+    if start == "bottomleft":
+        from strategies.bottomleft_strategy import StrategyBottomLeft
+        return greedy(problem, StrategyBottomLeft())
+    # zufällige Permutation, per Shelf gepackt
+    order = problem.rectangles[:]
+    random.shuffle(order)
+    solution = problem.create_empty_solution()
+    for rect in order:
+        problem.place_rectangle_shelf(rect, solution)
+    return solution
+
+
+def _make_neighbor(spec):
+    if spec.neighbor == "geometry":
+        from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
+        return GeometryBasedNeighbor(**spec.neighbor_kwargs)
+    if spec.neighbor == "rule":
+        from neighbors.rule_based_neighbor import RuleBasedNeighbor
+        return RuleBasedNeighbor(**spec.neighbor_kwargs)
+    from neighbors.overlapping_neighbor import OverlappingNeighbor
+    return OverlappingNeighbor(**spec.neighbor_kwargs)
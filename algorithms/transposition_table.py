@@ -0,0 +1,55 @@
+"""
+Transpositionstabelle für die lokale Suche: begrenzter LRU-Cache
+Lösungs-Hash (problem.zobrist) -> Zielfunktionswert.
+
+Zufällige Verschiebungen werden an der Box abgeschnitten und erzeugen daher oft
+exakt dieselbe Lösung, außerdem besucht die Suche Zustände mehrfach. local_search
+fragt die Tabelle vor jeder Bewertung (evaluate_solutions bzw. Move.delta) und
+bewertet nur die Fehlschläge. Die Trefferquote liefern hits/misses bzw. stats().
+
+    table = TranspositionTable(max_size=100000)
+    local_search(problem, solution, neighbor, transposition_table=table)
+    print(table.stats())
+"""
+from collections import OrderedDict
+
+
+class TranspositionTable:
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key):
+        """Gespeicherter Wert für key (zählt Treffer/Fehlschlag), sonst None."""
+        value = self._values.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate(),
+                "size": len(self._values), "max_size": self.max_size}
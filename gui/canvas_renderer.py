@@ -0,0 +1,149 @@
+"""
+Virtualisiertes, inkrementelles Zeichnen einer Lösung auf einem Tk-Canvas.
+
+Die Boxen liegen in einem Raster (box_size Pixel, Abstand margin); gezeichnet
+werden nur Boxen, die im sichtbaren Ausschnitt liegen. Jede gezeichnete Box
+belegt einen Slot mit ihren Canvas-Items und dem zuletzt gezeichneten Inhalt:
+ist der Inhalt beim nächsten Aufruf derselbe (gleiches Objekt bzw. gleicher Hash,
+siehe problem.zobrist), bleibt die Box unangetastet, sonst werden die vorhandenen
+Items per coords/itemconfig umgesetzt. Nicht mehr benötigte Items wandern
+versteckt in einen Pool und werden wiederverwendet. Unterhalb von
+LOD_BOX_SIZE Pixeln wird pro Box nur ein Füllstandsbalken gezeichnet.
+"""
+from problem.zobrist import box_hash
+
+LOD_BOX_SIZE = 80
+RECT_COLORS = ("#1E90FF", "#FFD700")
+
+
+class _BoxSlot:
+    def __init__(self, frame):
+        self.frame = frame   # Item des Box-Rahmens
+        self.items = []      # Items der Rechtecke bzw. des Füllstandsbalkens
+        self.content = None  # zuletzt gezeichneter Box-Inhalt
+        self.hash = None
+
+
+class CanvasRenderer:
+
+    def __init__(self, canvas, box_size=200, margin=20, top=40):
+        self.canvas = canvas
+        self.box_size = box_size
+        self.margin = margin
+        self.top = top
+        self._slots = {}     # Box-Index -> _BoxSlot
+        self._pool = []      # versteckte, wiederverwendbare Rechteck-Items
+        self._layout = None  # (box_size, Spalten, L) der gezeichneten Slots
+        self._info_item = None
+        self.solution = None
+        self.L = None
+
+    def reset(self):
+        """Vergessen aller Items (nach canvas.delete("all"))."""
+        self._slots.clear()
+        self._pool.clear()
+        self._layout = None
+        self._info_item = None
+        self.solution = None
+
+    def draw(self, solution, L, info_text):
+        self.solution = solution
+        self.L = L
+        if self._info_item is None:
+            self._info_item = self.canvas.create_text(10, 10, text=info_text, anchor="nw",
+                                                      font=("Arial", 12, "bold"))
+        else:
+            self.canvas.itemconfigure(self._info_item, text=info_text)
+        self.render_visible()
+
+    def render_visible(self):
+        """Zeichnet die sichtbaren Boxen (nach Scrollen, Zoom oder Größenänderung aufrufen)."""
+        if self.solution is None:
+            return
+        boxes = self.solution.boxes
+        columns = max(1, (self.canvas.winfo_width() - self.margin) // (self.box_size + self.margin))
+        layout = (self.box_size, columns, self.L)
+        if layout != self._layout:
+            for b_idx in list(self._slots):
+                self._release_slot(b_idx)
+            self._layout = layout
+        step = self.box_size + self.margin
+        rows = -(-len(boxes) // columns)
+        self.canvas.config(scrollregion=(0, 0, self.margin + columns*step, self.top + rows*step + self.margin))
+
+        first_row = max(0, int((self.canvas.canvasy(0) - self.top) // step))
+        last_row = int((self.canvas.canvasy(self.canvas.winfo_height()) - self.top) // step)
+        first = min(len(boxes), first_row*columns)
+        last = min(len(boxes), (last_row + 1)*columns)
+        for b_idx in list(self._slots):
+            if not first <= b_idx < last:
+                self._release_slot(b_idx)
+        for b_idx in range(first, last):
+            x0 = self.margin + (b_idx % columns)*step
+            y0 = self.top + (b_idx // columns)*step
+            self._render_box(b_idx, boxes[b_idx], x0, y0)
+
+    def zoom(self, factor, min_size=20, max_size=400):
+        self.box_size = max(min_size, min(max_size, int(self.box_size*factor)))
+        self.render_visible()
+
+    # --------------------------------------------------------------------------
+    #   Interna
+    # --------------------------------------------------------------------------
+
+    def _render_box(self, b_idx, box_content, x0, y0):
+        slot = self._slots.get(b_idx)
+        if slot is None:
+            slot = _BoxSlot(self.canvas.create_rectangle(x0, y0, x0 + self.box_size, y0 + self.box_size,
+                                                         outline="gray", width=2))
+            self._slots[b_idx] = slot
+        elif slot.content is box_content and not isinstance(box_content, list):
+            return
+        content_hash = box_hash(box_content)
+        if slot.hash == content_hash:
+            slot.content = box_content
+            return
+
+        scale = self.box_size / float(self.L)
+        coords = []
+        if self.box_size < LOD_BOX_SIZE:
+            # Füllstand statt einzelner Rechtecke
+            used = sum(r.width*r.height for (r, _, _) in box_content)
+            height = min(1.0, used / float(self.L*self.L))*self.box_size
+            coords.append(((x0, y0 + self.box_size - height, x0 + self.box_size, y0 + self.box_size), "#4682B4"))
+        else:
+            for r_index, (rect, (rx, ry), rot) in enumerate(box_content):
+                w = rect.width if not rot else rect.height
+                h = rect.height if not rot else rect.width
+                coords.append(((x0 + rx*scale, y0 + ry*scale, x0 + (rx + w)*scale, y0 + (ry + h)*scale),
+                               RECT_COLORS[r_index % 2]))
+
+        while len(slot.items) > len(coords):
+            self._hide(slot.items.pop())
+        for i, (rect_coords, fill) in enumerate(coords):
+            if i < len(slot.items):
+                self.canvas.coords(slot.items[i], *rect_coords)
+                self.canvas.itemconfigure(slot.items[i], fill=fill)
+            else:
+                slot.items.append(self._acquire(rect_coords, fill))
+        slot.content = box_content
+        slot.hash = content_hash
+
+    def _acquire(self, rect_coords, fill):
+        if self._pool:
+            item = self._pool.pop()
+            self.canvas.coords(item, *rect_coords)
+            self.canvas.itemconfigure(item, fill=fill, state="normal")
+            self.canvas.tag_raise(item)
+            return item
+        return self.canvas.create_rectangle(*rect_coords, outline="black", width=1, fill=fill)
+
+    def _hide(self, item):
+        self.canvas.itemconfigure(item, state="hidden")
+        self._pool.append(item)
+
+    def _release_slot(self, b_idx):
+        slot = self._slots.pop(b_idx)
+        for item in slot.items:
+            self._hide(item)
+        self.canvas.delete(slot.frame)
@@ -1,14 +1,25 @@
+import queue
+import threading
 import tkinter as tk
 import tkinter.ttk as ttk
 
 from problem.instance_generator import generate_instances
-from problem.rectangle_packing_problem import RectanglePackingProblem, RectangleSolution
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
+from algorithms.cancellation import CancellationToken
 from algorithms.local_search import local_search
 from strategies.guillotine_strategy import StrategyGuillotine
 from strategies.bottomleft_strategy import StrategyBottomLeft
 from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
 from neighbors.rule_based_neighbor import RuleBasedNeighbor
 from neighbors.overlapping_neighbor import OverlappingNeighbor
+from gui.canvas_renderer import CanvasRenderer
+from gui.snapshot_log import SnapshotLog
+
+# Fortschritt der lokalen Suche: Abfrageintervall im Tk-Thread (ms), Mindestabstand
+# zweier Meldungen im Worker (s) und Größe der Queue
+PROGRESS_POLL_MS = 100
+PROGRESS_INTERVAL = 0.05
+PROGRESS_QUEUE_SIZE = 16
 
 class PackingGUI:
     def __init__(self, width=1200, height=800):
@@ -36,13 +47,17 @@ class PackingGUI:
         self.current_problem = None
         self.current_rectangles = []
 
-        # Snapshots
-        self.snapshots = []
+        # Snapshots (Delta-Log, siehe gui.snapshot_log)
+        self.snapshots = SnapshotLog()
         self.snapshot_idx = 0
 
         # Progress
         self.progress_toplevel = None
         self.progress_var = None
+        self.progress_label = None
+        self.progress_queue = None
+        self.snapshot_queue = None
+        self.cancel_token = None
 
         self._build_ui()
 
@@ -109,7 +124,14 @@ class PackingGUI:
         self.canvas = tk.Canvas(self.canvas_frame, bg="white")
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        self.scrollbar_y = ttk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        # Nur sichtbare Boxen werden gezeichnet (siehe gui.canvas_renderer)
+        self.renderer = CanvasRenderer(self.canvas)
+        self.canvas.bind("<Configure>", lambda event: self.renderer.render_visible())
+        self.canvas.bind("<Control-MouseWheel>", self.on_zoom_wheel)
+        self.canvas.bind("<Control-Button-4>", lambda event: self.renderer.zoom(1.25))
+        self.canvas.bind("<Control-Button-5>", lambda event: self.renderer.zoom(0.8))
+
+        self.scrollbar_y = ttk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.on_yscroll)
         self.scrollbar_x = ttk.Scrollbar(self.canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
         self.scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
         self.scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
@@ -127,7 +149,22 @@ class PackingGUI:
         btn_next = ttk.Button(nav_frame, text="Weiter >>", command=self.show_next)
         btn_next.pack(side=tk.LEFT, padx=5)
 
+        btn_zoom_out = ttk.Button(nav_frame, text="Zoom -", command=lambda: self.renderer.zoom(0.8))
+        btn_zoom_out.pack(side=tk.RIGHT, padx=5)
+        btn_zoom_in = ttk.Button(nav_frame, text="Zoom +", command=lambda: self.renderer.zoom(1.25))
+        btn_zoom_in.pack(side=tk.RIGHT, padx=5)
+
+    def on_yscroll(self, *args):
+        self.canvas.yview(*args)
+        self.renderer.render_visible()
+
+    def on_zoom_wheel(self, event):
+        self.renderer.zoom(1.25 if event.delta > 0 else 0.8)
+
     def on_generate_instance(self):
+        if self.progress_toplevel is not None:
+            # lokale Suche läuft noch auf der aktuellen Instanz
+            return
         nr = self.var_num_rect.get()
         mn1 = self.var_min_side1.get()
         mx1 = self.var_max_side1.get()
@@ -139,9 +176,10 @@ class PackingGUI:
         self.current_rectangles = inst
         self.current_problem = RectanglePackingProblem(L, inst)
 
-        self.snapshots = []
+        self.snapshots.clear()
         self.snapshot_idx = 0
         self.canvas.delete("all")
+        self.renderer.reset()
         self.label_stepinfo.config(text="Schritt 0/0")
         self.canvas.create_text(20, 20, text=f"{nr} Rechtecke generiert.\nNoch keine Lösung.", anchor="nw")
         self.canvas.config(scrollregion=(0, 0, 0, 0))
@@ -155,12 +193,14 @@ class PackingGUI:
             self.combo_neighbor.grid()
 
     def on_start_algorithm(self):
-        if not self.current_problem:
+        if not self.current_problem or self.progress_toplevel is not None:
+            # keine Instanz oder lokale Suche läuft noch
             return
 
         self.snapshots.clear()
         self.snapshot_idx = 0
         self.canvas.delete("all")
+        self.renderer.reset()
 
         if self.var_algorithm.get() == "Greedy":
             self.run_greedy()
@@ -187,15 +227,29 @@ class PackingGUI:
         self.show_snapshot()
 
     def run_local_search_threaded(self):
+        """
+        Startet die lokale Suche in einem Worker-Thread. Der Worker fasst weder Tk noch
+        den SnapshotLog an: er legt nur copy-on-write Kopien der Lösung und zum Schluss
+        ("done", Lösung) in eine unbegrenzte Queue, gedrosselte Fortschrittsmeldungen in
+        eine begrenzte. Der Tk-Mainloop fragt beide alle PROGRESS_POLL_MS ab und baut dabei
+        das Log auf.
+        """
+        self.cancel_token = CancellationToken()
+        self.progress_queue = queue.Queue(maxsize=PROGRESS_QUEUE_SIZE)
+        self.snapshot_queue = queue.SimpleQueue()
         self.progress_toplevel = tk.Toplevel(self.root)
         self.progress_toplevel.title("Lokale Suche - bitte warten...")
+        self.progress_toplevel.protocol("WM_DELETE_WINDOW", self.cancel_token.cancel)
         ttk.Label(self.progress_toplevel, text="Suche nach besseren Lösungen...").pack(padx=10, pady=10)
         self.progress_var = tk.DoubleVar(value=0)
         pbar = ttk.Progressbar(self.progress_toplevel, variable=self.progress_var, maximum=100)
         pbar.pack(fill="x", padx=10, pady=10)
-        start_sol = RectangleSolution()
+        self.progress_label = ttk.Label(self.progress_toplevel, text="")
+        self.progress_label.pack(padx=10)
+        ttk.Button(self.progress_toplevel, text="Abbrechen", command=self.cancel_token.cancel).pack(pady=10)
+        start_sol = self.current_problem.create_empty_solution()
         for r in self.current_rectangles:
-            start_sol.boxes.append([(r, (0,0), False)])
+            start_sol.boxes.append(Box([(r, (0,0), False)]))
         nb = self.var_neighbor_type.get()
         if nb == "Geometry":
             neighbor = GeometryBasedNeighbor(max_shift=5, neighbor_count=5)
@@ -203,26 +257,75 @@ class PackingGUI:
             neighbor = RuleBasedNeighbor(swaps_per_call=5)
         else:
             neighbor = OverlappingNeighbor(initial_overlap_ratio=100, decrement=10, neighbor_count=5)
+        max_time = 10.0
+        run_log = SnapshotLog()
+        progress_queue = self.progress_queue
+        snapshot_queue = self.snapshot_queue
+        last_report = [0.0]
         def snapshot_cb(sol, iteration, val, elapsed):
-            self.add_snapshot(sol, f"Iter {iteration}: val={val}")
-            progress_pct = min(100, (elapsed/10.0)*100)
-            self.progress_var.set(progress_pct)
-            self.root.update_idletasks()
+            # die Suche verändert sol weiter; die Kopie teilt die Boxen bis zur nächsten Änderung
+            snapshot_queue.put(("snapshot", sol.copy(), f"Iter {iteration}: val={val}"))
+            # gedrosselt; ist die Queue voll, fällt die Meldung weg (die nächste ist aktueller)
+            if elapsed - last_report[0] >= PROGRESS_INTERVAL:
+                last_report[0] = elapsed
+                try:
+                    progress_queue.put_nowait(("progress", iteration, val, elapsed))
+                except queue.Full:
+                    pass
         def worker():
-            best_sol = local_search(
-                problem=self.current_problem,
-                current_solution=start_sol,
-                neighbor_generator=neighbor,
-                max_iter=1000,
-                max_time=10.0,
-                partial_sample_size=5,
-                snapshot_callback=snapshot_cb
-            )
-            self.root.after(0, self.local_search_done, best_sol)
-        import threading
-        t = threading.Thread(target=worker)
+            best_sol = start_sol
+            try:
+                best_sol = local_search(
+                    problem=self.current_problem,
+                    current_solution=start_sol,
+                    neighbor_generator=neighbor,
+                    max_iter=1000,
+                    max_time=max_time,
+                    partial_sample_size=5,
+                    snapshot_callback=snapshot_cb,
+                    cancel_token=self.cancel_token
+                )
+            finally:
+                # das Ende muss ankommen, sonst bleibt das Fortschrittsfenster offen; die
+                # unbegrenzte Queue blockiert nie und liefert es nach allen Snapshots
+                snapshot_queue.put(("done", best_sol))
+        self.root.after(PROGRESS_POLL_MS, self.poll_progress, progress_queue, snapshot_queue, run_log, max_time)
+        t = threading.Thread(target=worker, daemon=True)
         t.start()
 
+    def poll_progress(self, progress_queue, snapshot_queue, run_log, max_time):
+        """
+        Verarbeitet (im Tk-Thread) alle angefallenen Meldungen: Snapshots kommen ins
+        run_log, vom Fortschritt wird nur die letzte Meldung angezeigt.
+        """
+        latest = None
+        done = None
+        while True:
+            try:
+                latest = progress_queue.get_nowait()
+            except queue.Empty:
+                break
+        while done is None:
+            try:
+                message = snapshot_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "done":
+                done = message
+            else:
+                _, solution, label = message
+                run_log.append(solution, label)
+        if latest is not None and self.progress_toplevel:
+            _, iteration, val, elapsed = latest
+            self.progress_var.set(min(100, (elapsed/max_time)*100))
+            self.progress_label.config(text=f"Iter {iteration}: val={val}")
+        if done is not None:
+            _, best_sol = done
+            self.snapshots = run_log
+            self.local_search_done(best_sol)
+        else:
+            self.root.after(PROGRESS_POLL_MS, self.poll_progress, progress_queue, snapshot_queue, run_log, max_time)
+
     def local_search_done(self, best_sol):
         if self.progress_toplevel:
             self.progress_toplevel.destroy()
@@ -233,8 +336,7 @@ class PackingGUI:
         self.show_snapshot()
 
     def add_snapshot(self, solution, label):
-        import copy
-        self.snapshots.append((copy.deepcopy(solution), label))
+        self.snapshots.append(solution, label)
 
     def show_snapshot(self):
         if not self.snapshots:
@@ -254,41 +356,9 @@ class PackingGUI:
             self.show_snapshot()
 
     def draw_solution(self, solution, info_text):
-        self.canvas.delete("all")
-        self.canvas.create_text(10, 10, text=info_text, anchor="nw", font=("Arial", 12, "bold"))
         if not self.current_problem:
             return
-        L = self.current_problem.L
-        box_size = 200
-        margin = 20
-        xstart = margin
-        ystart = 40
-        max_x = xstart
-        max_y = ystart
-        for box_index, box_content in enumerate(solution.boxes):
-            self.canvas.create_rectangle(xstart, ystart, xstart+box_size, ystart+box_size,
-                                         outline="gray", width=2)
-            for r_index, (rect, (rx, ry), rot) in enumerate(box_content):
-                w = rect.width if not rot else rect.height
-                h = rect.height if not rot else rect.width
-                scale = box_size / float(L)
-                sx = rx * scale
-                sy = ry * scale
-                sw = w * scale
-                sh = h * scale
-                fill_color = "#1E90FF" if (r_index % 2) == 0 else "#FFD700"
-                self.canvas.create_rectangle(
-                    xstart+sx, ystart+sy,
-                    xstart+sx+sw, ystart+sy+sh,
-                    outline="black", width=1, fill=fill_color
-                )
-            xstart += box_size + margin
-            if xstart+box_size > self.canvas.winfo_width()-margin:
-                xstart = margin
-                ystart += box_size + margin
-            max_x = max(max_x, xstart+box_size)
-            max_y = max(max_y, ystart+box_size)
-        self.canvas.config(scrollregion=(0, 0, max_x + margin, max_y + margin))
+        self.renderer.draw(solution, self.current_problem.L, info_text)
 
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,86 @@
+"""
+Snapshot-Log für die Visualisierung: statt einer tiefen Kopie pro Schritt wird
+nur festgehalten, welche Boxen sich gegenüber dem vorherigen Snapshot geändert
+haben (Box-Inhalt als Tupel der Platzierungen, die Rectangle-Objekte werden
+geteilt). Geänderte Boxen werden über ihren Hash (problem.zobrist, an der Box
+gecacht) erkannt; ein Snapshot kostet daher O(Boxen + geänderte Platzierungen).
+Tauschen nur gleich große Rechtecke die Plätze, gilt die Box als unverändert
+(das Bild ist dasselbe).
+Alle keyframe_interval Snapshots wird der komplette Zustand (Liste der Box-Tupel,
+ebenfalls geteilt) abgelegt, sodass jeder Schritt aus dem letzten Keyframe und
+höchstens keyframe_interval - 1 Deltas rekonstruiert wird.
+"""
+from problem.rectangle_packing_problem import RectangleSolution
+from problem.zobrist import box_hash
+
+
+class SnapshotLog:
+
+    def __init__(self, keyframe_interval=32):
+        self.keyframe_interval = keyframe_interval
+        self._entries = []     # (Keyframe: Liste der Box-Tupel oder None, Delta, Beschriftung)
+        self._hashes = []      # Box-Hashes des letzten Snapshots
+        self._last_state = []  # Box-Tupel des letzten Snapshots
+        self._cursor = None    # (Index, Zustand) des zuletzt rekonstruierten Schritts
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._hashes = []
+        self._last_state = []
+        self._cursor = None
+
+    def append(self, solution, label):
+        """
+        Hält den aktuellen Zustand von solution fest. Delta = (Anzahl Boxen,
+        {Box-Index: Tupel der Platzierungen}) gegenüber dem vorherigen Snapshot.
+        """
+        hashes = [box_hash(box_content) for box_content in solution.boxes]
+        state = self._last_state[:len(hashes)]
+        changed = {}
+        for b_idx, value in enumerate(hashes):
+            if b_idx >= len(self._hashes) or self._hashes[b_idx] != value:
+                changed[b_idx] = tuple(solution.boxes[b_idx])
+                if b_idx < len(state):
+                    state[b_idx] = changed[b_idx]
+                else:
+                    state.append(changed[b_idx])
+        keyframe = state if len(self._entries) % self.keyframe_interval == 0 else None
+        self._entries.append((keyframe, (len(hashes), changed), label))
+        self._hashes = hashes
+        self._last_state = state
+
+    def __getitem__(self, idx):
+        """(Lösung zum Anzeigen, Beschriftung) von Schritt idx."""
+        if idx < 0:
+            idx += len(self._entries)
+        if not 0 <= idx < len(self._entries):
+            raise IndexError(idx)
+        state = self._state(idx)
+        solution = RectangleSolution()
+        solution.boxes = state
+        return solution, self._entries[idx][2]
+
+    def _state(self, idx):
+        if self._cursor is not None and self._cursor[0] <= idx and \
+                idx - self._cursor[0] < self.keyframe_interval:
+            start, state = self._cursor
+            state = list(state)
+        else:
+            start = idx - idx % self.keyframe_interval
+            state = list(self._entries[start][0])
+        for i in range(start + 1, idx + 1):
+            box_count, changed = self._entries[i][1]
+            del state[box_count:]
+            for b_idx, placements in changed.items():
+                if b_idx < len(state):
+                    state[b_idx] = placements
+                else:
+                    state.append(placements)
+        self._cursor = (idx, tuple(state))
+        return state
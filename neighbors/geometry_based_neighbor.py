@@ -1,6 +1,10 @@
-from copy import deepcopy
+from copy import copy
 import random
 
+from problem.rectangle_packing_problem import Box
+from problem.spatial_index import box_index, uses_index
+from .moves import ShiftMove, RotateMove, BoxMove, DissolveBoxMove, PairMergeMove
+
 class GeometryBasedNeighbor:
     """
     Verbesserte geometriebasierte Nachbarschaft:
@@ -34,39 +38,60 @@ class GeometryBasedNeighbor:
         nbrs = self._create_neighbors(problem, solution, all_rects=False, sample_size=sample_size)
         return nbrs
 
+    def get_moves(self, problem, solution):
+        # Wie get_neighbors, aber als Move-Objekte (siehe neighbors.moves)
+        return self._create_moves(problem, solution, all_rects=True, sample_size=0)
+
+    def get_moves_subset(self, problem, solution, sample_size):
+        return self._create_moves(problem, solution, all_rects=False, sample_size=sample_size)
+
+    def iter_neighbors(self, problem, solution, sample_size=0):
+        """Wie get_neighbors(_subset), aber lazy: jeder Nachbar entsteht erst beim Iterieren."""
+        return (move.materialize(solution) for move in self.iter_moves(problem, solution, sample_size))
+
+    def iter_moves(self, problem, solution, sample_size=0):
+        """
+        Erzeugt die Züge lazy (Generator); sample_size <= 0 bedeutet alle Rechtecke.
+        Bricht der Aufrufer früh ab, werden die restlichen Züge nie gebaut.
+        """
+        return self._iter_moves(problem, solution, all_rects=sample_size <= 0, sample_size=sample_size)
+
     # --------------------------------------------------------------------------
     #   Kernmethode
     # --------------------------------------------------------------------------
 
     def _create_neighbors(self, problem, solution, all_rects, sample_size):
-        neighbors = []
+        moves = self._create_moves(problem, solution, all_rects, sample_size)
+        return [move.materialize(solution) for move in moves]
+
+    def _create_moves(self, problem, solution, all_rects, sample_size):
+        return list(self._iter_moves(problem, solution, all_rects, sample_size))
+
+    def _iter_moves(self, problem, solution, all_rects, sample_size):
         if not solution.boxes:
-            return neighbors
+            return
 
         # 1) SHIFT/ROTATE/BOXMOVE einzelner Rechtecke
-        neighbors += self._rect_based_moves(problem, solution, all_rects, sample_size)
+        yield from self._rect_based_moves(problem, solution, all_rects, sample_size)
 
         # 2) Auflösen fast leerer Boxen
-        neighbors += self._try_merge_small_boxes(problem, solution)
+        yield from self._try_merge_small_boxes(problem, solution)
 
         # 3) Box-Paar-Merging (reduziert die Boxenanzahl oft stark!)
-        neighbors += self._try_merge_box_pairs(problem, solution)
-
-        return neighbors
+        yield from self._try_merge_box_pairs(problem, solution)
 
     # --------------------------------------------------------------------------
     #   1) SHIFT/ROTATE/BOXMOVE einzelner Rechtecke
     # --------------------------------------------------------------------------
 
     def _rect_based_moves(self, problem, solution, all_rects, sample_size):
-        neighbors = []
         all_items = []
         for b_idx, box_content in enumerate(solution.boxes):
             for r_idx, _ in enumerate(box_content):
                 all_items.append((b_idx, r_idx))
 
         if not all_items:
-            return neighbors
+            return
 
         # Falls sample_size > 0, wähle Zufallsmenge
         if all_rects:
@@ -80,7 +105,8 @@ class GeometryBasedNeighbor:
             if box_idx >= len(solution.boxes) or rect_idx >= len(solution.boxes[box_idx]):
                 continue
 
-            rect, (x, y), rotated = solution.boxes[box_idx][rect_idx]
+            box_content = solution.boxes[box_idx]
+            rect, (x, y), rotated = box_content[rect_idx]
 
             # SHIFT
             for _ in range(self.neighbor_count):
@@ -89,43 +115,45 @@ class GeometryBasedNeighbor:
                 if dx == 0 and dy == 0:
                     continue
 
-                new_sol = deepcopy(solution)
                 w = rect.width if not rotated else rect.height
                 h = rect.height if not rotated else rect.width
 
                 new_x = max(0, min(problem.L - w, x + dx))
                 new_y = max(0, min(problem.L - h, y + dy))
 
-                new_sol.boxes[box_idx][rect_idx] = (rect, (new_x, new_y), rotated)
-
-                if self._is_valid_position(problem, new_sol, box_idx, rect_idx):
-                    neighbors.append(new_sol)
+                if self._is_valid_position(problem, box_content, rect_idx, (rect, (new_x, new_y), rotated)):
+                    new_box = copy(box_content)
+                    new_box[rect_idx] = (rect, (new_x, new_y), rotated)
+                    yield ShiftMove(box_idx, rect_idx, new_box)
 
             # ROTATE
             new_rot = not rotated
             w = rect.width if not new_rot else rect.height
             h = rect.height if not new_rot else rect.width
             if x + w <= problem.L and y + h <= problem.L:
-                new_sol = deepcopy(solution)
-                new_sol.boxes[box_idx][rect_idx] = (rect, (x, y), new_rot)
-                if self._is_valid_position(problem, new_sol, box_idx, rect_idx):
-                    neighbors.append(new_sol)
+                if self._is_valid_position(problem, box_content, rect_idx, (rect, (x, y), new_rot)):
+                    new_box = copy(box_content)
+                    new_box[rect_idx] = (rect, (x, y), new_rot)
+                    yield RotateMove(box_idx, rect_idx, new_box)
 
             # BOXMOVE (mit Bottom-Left-Platzierung)
             if len(solution.boxes) > 1:
+                # Quellbox ohne das Rechteck; leere Box wird gelöscht
+                source_box = copy(box_content)
+                del source_box[rect_idx]
+                if not source_box:
+                    source_box = None
                 for target_box_idx in range(len(solution.boxes)):
                     if target_box_idx == box_idx:
                         continue
-                    new_sol = deepcopy(solution)
-                    # Rechteck entfernen
-                    del new_sol.boxes[box_idx][rect_idx]
                     # Versuchen, in target_box_idx per Bottom-Left einzufügen
-                    if self._try_bottom_left_placement(problem, new_sol, target_box_idx, rect, consider_rotation=True):
-                        # Box ggf. leeren -> löschen
-                        new_sol.boxes = [b for b in new_sol.boxes if len(b) > 0]
-                        neighbors.append(new_sol)
-
-        return neighbors
+                    target_box = solution.boxes[target_box_idx]
+                    placement = self._find_bottom_left_position(rect, target_box, problem.L, True)
+                    if placement is not None:
+                        new_target = copy(target_box)
+                        new_target.append(placement)
+                        yield BoxMove(box_idx, rect_idx,
+                                      {box_idx: source_box, target_box_idx: new_target})
 
     # --------------------------------------------------------------------------
     #   2) (Fast) leere Boxen komplett auflösen
@@ -137,34 +165,52 @@ class GeometryBasedNeighbor:
         indem man alle Rechtecke in andere Boxen einfügt (via Bottom-Left).
         Gelingt das, wird die Box gelöscht.
         """
-        neighbors = []
+        L = problem.L
+        free_total = None
         for b_idx, box_content in enumerate(solution.boxes):
             if len(box_content) <= threshold and len(solution.boxes) > 1:
-                new_sol = deepcopy(solution)
-                rects_to_move = new_sol.boxes[b_idx][:]
-                new_sol.boxes[b_idx].clear()
+                # Reicht die freie Fläche aller anderen Boxen zusammen nicht, braucht die
+                # Auflösung einer gültigen Box eine neue Box und kann nicht verbessern
+                if free_total is None:
+                    free_total = sum(L*L - _used_area(b) for b in solution.boxes)
+                own_area = _used_area(box_content)
+                if free_total - (L*L - own_area) < own_area and problem.box_penalty(box_content) == 0:
+                    continue
+                # Veränderte Zielboxen (Kopien) und neu angelegte Boxen
+                changed = {}
+                added = []
 
                 moved_all = True
-                for (r, (ox, oy), rot) in rects_to_move:
+                for (r, (ox, oy), rot) in box_content:
                     placed = False
-                    for tb_idx in range(len(new_sol.boxes)):
+                    for tb_idx in range(len(solution.boxes)):
                         if tb_idx == b_idx:
                             continue
-                        if self._try_bottom_left_placement(problem, new_sol, tb_idx, r, consider_rotation=True):
+                        target_box = changed.get(tb_idx, solution.boxes[tb_idx])
+                        placement = self._find_bottom_left_position(r, target_box, problem.L, True)
+                        if placement is not None:
+                            if tb_idx not in changed:
+                                target_box = copy(target_box)
+                                changed[tb_idx] = target_box
+                            target_box.append(placement)
                             placed = True
                             break
+                    if not placed:
+                        for new_box in added:
+                            if self._try_bottom_left_placement_single_extended(r, new_box, problem.L, True):
+                                placed = True
+                                break
                     # Falls nirgends Platz, neue Box
                     if not placed:
-                        new_sol.boxes.append([])
-                        nb_idx = len(new_sol.boxes) - 1
-                        if not self._try_bottom_left_placement(problem, new_sol, nb_idx, r, consider_rotation=True):
+                        new_box = Box()
+                        added.append(new_box)
+                        if not self._try_bottom_left_placement_single_extended(r, new_box, problem.L, True):
                             moved_all = False
                             break
                 if moved_all:
-                    # Lösche leere Boxen
-                    new_sol.boxes = [b for b in new_sol.boxes if len(b) > 0]
-                    neighbors.append(new_sol)
-        return neighbors
+                    # Die aufgelöste Box wird gelöscht
+                    changed[b_idx] = None
+                    yield DissolveBoxMove(b_idx, changed, added)
 
     # --------------------------------------------------------------------------
     #   3) Box-Paar-Merging
@@ -175,10 +221,9 @@ class GeometryBasedNeighbor:
         Versucht, einige Paare von Boxen auszuwählen und deren Inhalt
         gemeinsam (neu) zu packen, um ggf. eine Box einzusparen.
         """
-        neighbors = []
         box_count = len(solution.boxes)
         if box_count < 2:
-            return neighbors
+            return
 
         # Falls wir sehr viele Boxen haben, wählen wir nur einige zufällige Paare aus
         pairs = []
@@ -193,18 +238,16 @@ class GeometryBasedNeighbor:
         pairs = all_pairs[:max_pairs]
 
         for (i, j) in pairs:
-            new_sol = self._merge_two_boxes(problem, solution, i, j)
-            if new_sol is not None:
-                neighbors.append(new_sol)
-
-        return neighbors
+            move = self._merge_two_boxes(problem, solution, i, j)
+            if move is not None:
+                yield move
 
     def _merge_two_boxes(self, problem, solution, box_idx1, box_idx2):
         """
         Nimmt die beiden Boxen box_idx1 und box_idx2, kombiniert alle Rechtecke,
         versucht sie in EINE Box (via Bottom-Left) zu packen. Gelingt das nicht,
         wird versucht, sie so kompakt wie möglich in ZWEI Boxen zu verteilen.
-        Gibt ggf. eine neue Solution zurück oder None, falls keine Verbesserung.
+        Gibt ggf. einen PairMergeMove zurück oder None, falls keine Verbesserung.
         """
         if box_idx1 >= len(solution.boxes) or box_idx2 >= len(solution.boxes):
             return None
@@ -213,9 +256,6 @@ class GeometryBasedNeighbor:
         if box_idx1 == box_idx2:
             return None
 
-        # Kopie der Lösung
-        new_sol = deepcopy(solution)
-
         # Sortiere Indizes absteigend, damit wir beim Entfernen keinen Indexshift kriegen
         if box_idx1 < box_idx2:
             i1, i2 = box_idx2, box_idx1
@@ -223,47 +263,42 @@ class GeometryBasedNeighbor:
             i1, i2 = box_idx1, box_idx2
 
         # Hole alle Rechtecke aus den beiden Boxen
-        boxA = new_sol.boxes[i1]
-        boxB = new_sol.boxes[i2]
+        boxA = solution.boxes[i1]
+        boxB = solution.boxes[i2]
         combined_rects = []
         for (r, _, _) in boxA:
             combined_rects.append(r)
         for (r, _, _) in boxB:
             combined_rects.append(r)
 
-        # Entferne die beiden Boxen aus new_sol
-        del new_sol.boxes[i1]
-        del new_sol.boxes[i2]
+        # Die beiden Boxen werden durch die neu gepackten ersetzt
 
         # --- 1) Versuche, alle combined_rects in EINE Box zu packen (Bottom-Left-Greedy) ---
-        one_box = []
+        one_box = Box()
         if self._try_pack_all_in_one_box(problem, combined_rects, one_box):
             # Hat geklappt -> wir haben 1 neue Box
-            new_sol.boxes.append(one_box)
+            new_boxes = [one_box]
         else:
             # --- 2) Packe die combined_rects so kompakt wie möglich in 2 Boxen ---
             # Einfache Variante: Sortiere die Rects absteigend nach Fläche und packe
             # nacheinander. Wenn sie nicht in Box1 passen, versuche Box2, ansonsten erstelle Box2.
             # (Man kann hier auch ein ausgefeilteres 2-Box-Packing machen, z.B. "erst
             #  versuchen in Box1 so viel wie möglich, Rest in Box2" etc.)
-            box1 = []
-            box2 = []
+            box1 = Box()
+            box2 = Box()
             for r in sorted(combined_rects, key=lambda rr: rr.width*rr.height, reverse=True):
-                if not self._try_bottom_left_placement(problem, new_sol, None, r, consider_rotation=True, custom_box=box1):
+                if not self._try_bottom_left_placement(problem, solution, None, r, consider_rotation=True, custom_box=box1):
                     # Falls in box1 nicht passt, versuche box2
-                    if not self._try_bottom_left_placement(problem, new_sol, None, r, consider_rotation=True, custom_box=box2):
+                    if not self._try_bottom_left_placement(problem, solution, None, r, consider_rotation=True, custom_box=box2):
                         # Falls auch in box2 nicht passt, wir brauchen 3. Box => Abbruch
                         return None
-            # Box1 & Box2 an new_sol anhängen
-            if box1:
-                new_sol.boxes.append(box1)
-            if box2:
-                new_sol.boxes.append(box2)
-
-        # Fertig. Wir geben new_sol zurück, *wenn* sich dadurch überhaupt was ändern kann.
-        # (Man könnte hier noch checken, ob new_sol wirklich weniger Boxen hat, oder
+            # Box1 & Box2 anhängen
+            new_boxes = [b for b in (box1, box2) if b]
+
+        # Fertig. Wir geben den Zug zurück, *wenn* sich dadurch überhaupt was ändern kann.
+        # (Man könnte hier noch checken, ob der Zug wirklich weniger Boxen liefert, oder
         #  ob die Overlaps / Strafen besser sind.)
-        return new_sol
+        return PairMergeMove(i1, i2, new_boxes)
 
     def _try_pack_all_in_one_box(self, problem, rects, target_box):
         """
@@ -300,7 +335,7 @@ class GeometryBasedNeighbor:
             for (cx, cy) in candidates:
                 if cx + w <= L and cy + h <= L:
                     # Overlap-Check
-                    if not self._overlaps_any(cx, cy, w, h, box):
+                    if not self._overlaps_any(cx, cy, w, h, box, L):
                         box.append((rect, (cx, cy), rot_flag))
                         return True
         return False
@@ -320,15 +355,34 @@ class GeometryBasedNeighbor:
             # Platzierung in gegebener Box-Liste (z.B. beim 2-Box-Merge)
             return self._try_bottom_left_placement_single_extended(rect, custom_box, problem.L, consider_rotation)
         else:
-            # Platzierung in solution.boxes[box_idx]
+            # Platzierung in solution.boxes[box_idx], die Box wird erst beim Schreiben kopiert
             if box_idx is None or box_idx >= len(solution.boxes):
                 return False
-            return self._try_bottom_left_placement_single_extended(rect, solution.boxes[box_idx], problem.L, consider_rotation)
+            placement = self._find_bottom_left_position(rect, solution.boxes[box_idx], problem.L, consider_rotation)
+            if placement is None:
+                return False
+            solution.writable_box(box_idx).append(placement)
+            return True
 
     def _try_bottom_left_placement_single_extended(self, rect, box_list, L, consider_rotation):
         """
         Erweiterte Variante, testet ggf. Rotation.
         """
+        placement = self._find_bottom_left_position(rect, box_list, L, consider_rotation)
+        if placement is None:
+            return False
+        box_list.append(placement)
+        return True
+
+    def _find_bottom_left_position(self, rect, box_list, L, consider_rotation):
+        """
+        Sucht die Bottom-Left-Position für rect in box_list, ohne die Box zu verändern.
+        Gibt (rect, (x,y), rotated) zurück oder None.
+        """
+        # O(1)-Vorabtest über die belegte Fläche (gecacht an der Box); für überlappungs-
+        # freie Boxen exakt, überladene Boxen mit Overlaps werden ebenfalls übersprungen
+        if isinstance(box_list, Box) and box_list.used_area() + rect.width*rect.height > L*L:
+            return None
         candidates = [(0, 0)]
         for (r2, (rx, ry), rot2) in box_list:
             rw = r2.width if not rot2 else r2.height
@@ -346,13 +400,14 @@ class GeometryBasedNeighbor:
         for (rot_flag, w, h) in orientations:
             for (cx, cy) in candidates:
                 if cx + w <= L and cy + h <= L:
-                    if not self._overlaps_any(cx, cy, w, h, box_list):
-                        box_list.append((rect, (cx, cy), rot_flag))
-                        return True
-        return False
+                    if not self._overlaps_any(cx, cy, w, h, box_list, L):
+                        return (rect, (cx, cy), rot_flag)
+        return None
 
-    def _overlaps_any(self, x, y, w, h, box_list):
+    def _overlaps_any(self, x, y, w, h, box_list, L):
         """Prüft, ob (x,y,w,h) mit irgendeinem Rechteck in box_list überlappt."""
+        if uses_index(box_list):
+            return box_index(box_list, L).overlaps_any(x, y, w, h)
         for (r, (rx, ry), rot) in box_list:
             rw = r.width if not rot else r.height
             rh = r.height if not rot else r.width
@@ -362,15 +417,15 @@ class GeometryBasedNeighbor:
                 return True
         return False
 
-    def _is_valid_position(self, problem, solution, box_idx, rect_idx):
+    def _is_valid_position(self, problem, box_content, rect_idx, placement):
         """
-        Prüft, ob das Rechteck solution.boxes[box_idx][rect_idx] noch
-        innerhalb der Box LxL liegt und keine Overlaps in box_idx verursacht.
+        Prüft, ob placement (anstelle von box_content[rect_idx]) noch
+        innerhalb der Box LxL liegt und keine Overlaps in der Box verursacht.
         """
-        if box_idx >= len(solution.boxes) or rect_idx >= len(solution.boxes[box_idx]):
+        if rect_idx >= len(box_content):
             return False
 
-        rect, (x, y), rotated = solution.boxes[box_idx][rect_idx]
+        rect, (x, y), rotated = placement
         w = rect.width if not rotated else rect.height
         h = rect.height if not rotated else rect.width
 
@@ -379,7 +434,9 @@ class GeometryBasedNeighbor:
             return False
 
         # Overlaps
-        for i, (r2, (rx, ry), rot2) in enumerate(solution.boxes[box_idx]):
+        if uses_index(box_content):
+            return not box_index(box_content, problem.L).overlaps_any(x, y, w, h, exclude=box_content[rect_idx])
+        for i, (r2, (rx, ry), rot2) in enumerate(box_content):
             if i == rect_idx:
                 continue
             rw = r2.width if not rot2 else r2.height
@@ -388,3 +445,9 @@ class GeometryBasedNeighbor:
                 return False
 
         return True
+
+
+def _used_area(box_content):
+    if isinstance(box_content, Box):
+        return box_content.used_area()
+    return sum(r.width*r.height for (r, _, _) in box_content)
@@ -0,0 +1,173 @@
+from problem.zobrist import MASK, box_contribution
+
+
+class Move:
+    """
+    Ein Nachbarschaftszug, der nur die betroffenen Boxen kennt:
+      - replaced: dict box_idx -> neue Box (None = Box wird entfernt)
+      - added:    Liste neuer Boxen, die hinten angehängt werden
+    Die neuen Boxen werden beim Erzeugen des Zugs schon fertig gebaut, daher
+    kostet delta() nur die Bewertung der betroffenen Boxen und apply()/undo()
+    nur das Umhängen der Box-Referenzen.
+    """
+    kind = "move"
+
+    def __init__(self, replaced=None, added=None):
+        self.replaced = replaced if replaced is not None else {}
+        self.added = added if added is not None else []
+        self._undo_info = None
+
+    def delta(self, problem, solution):
+        """Änderung des Zielfunktionswerts, wenn der Zug auf solution angewendet wird."""
+        old_penalty = 0
+        new_penalty = 0
+        removed = 0
+        for box_idx, new_box in self.replaced.items():
+            old_penalty += problem.box_penalty(solution.boxes[box_idx])
+            if new_box is None:
+                removed += 1
+            else:
+                new_penalty += problem.box_penalty(new_box)
+        for new_box in self.added:
+            new_penalty += problem.box_penalty(new_box)
+        return (len(self.added) - removed)*problem.BOX_COST + new_penalty - old_penalty
+
+    def result_hash(self, solution, solution_hash):
+        """
+        Hash (problem.zobrist) der Lösung nach dem Zug, inkrementell aus dem Hash
+        solution_hash der aktuellen Lösung; None, wenn er nicht billig bestimmbar ist.
+        """
+        value = solution_hash
+        for box_idx, new_box in self.replaced.items():
+            value -= box_contribution(solution.boxes[box_idx])
+            if new_box is not None:
+                value += box_contribution(new_box)
+        for new_box in self.added:
+            value += box_contribution(new_box)
+        return value & MASK
+
+    def apply(self, solution):
+        """Wendet den Zug in-place auf solution an (undo() macht ihn rückgängig)."""
+        replaced_old = []
+        removed_old = []
+        for box_idx, new_box in self.replaced.items():
+            replaced_old.append((box_idx, solution.boxes[box_idx]))
+            if new_box is not None:
+                solution.boxes[box_idx] = new_box
+        # Entfernen von hinten nach vorne, damit die Indizes gültig bleiben
+        for box_idx in sorted((i for i, b in self.replaced.items() if b is None), reverse=True):
+            removed_old.append(box_idx)
+            del solution.boxes[box_idx]
+        solution.boxes.extend(self.added)
+        self._undo_info = (replaced_old, removed_old)
+        return solution
+
+    def undo(self, solution):
+        """Macht den zuletzt angewendeten Zug auf solution rückgängig."""
+        if self._undo_info is None:
+            raise RuntimeError("undo() ohne vorheriges apply()")
+        replaced_old, removed_old = self._undo_info
+        if self.added:
+            del solution.boxes[-len(self.added):]
+        for box_idx in reversed(removed_old):
+            solution.boxes.insert(box_idx, None)
+        for box_idx, old_box in replaced_old:
+            solution.boxes[box_idx] = old_box
+        self._undo_info = None
+        return solution
+
+    def materialize(self, solution):
+        """Erzeugt die Nachbarlösung als copy-on-write Kopie von solution."""
+        return self.apply(solution.copy())
+
+
+class ShiftMove(Move):
+    """Verschiebt ein Rechteck innerhalb seiner Box."""
+    kind = "shift"
+
+    def __init__(self, box_idx, rect_idx, new_box):
+        super().__init__(replaced={box_idx: new_box})
+        self.box_idx = box_idx
+        self.rect_idx = rect_idx
+
+
+class RotateMove(Move):
+    """Dreht ein Rechteck an seiner Position."""
+    kind = "rotate"
+
+    def __init__(self, box_idx, rect_idx, new_box):
+        super().__init__(replaced={box_idx: new_box})
+        self.box_idx = box_idx
+        self.rect_idx = rect_idx
+
+
+class BoxMove(Move):
+    """Verschiebt ein Rechteck in eine andere (ggf. neue) Box."""
+    kind = "boxmove"
+
+    def __init__(self, box_idx, rect_idx, replaced, added=None):
+        super().__init__(replaced=replaced, added=added)
+        self.box_idx = box_idx
+        self.rect_idx = rect_idx
+
+
+class DissolveBoxMove(Move):
+    """Löst eine Box auf und verteilt ihre Rechtecke auf andere Boxen."""
+    kind = "dissolve"
+
+    def __init__(self, box_idx, replaced, added=None):
+        super().__init__(replaced=replaced, added=added)
+        self.box_idx = box_idx
+
+
+class PairMergeMove(Move):
+    """Packt den Inhalt zweier Boxen gemeinsam neu (in eine oder zwei Boxen)."""
+    kind = "pair-merge"
+
+    def __init__(self, box_idx1, box_idx2, new_boxes):
+        super().__init__(replaced={box_idx1: None, box_idx2: None}, added=new_boxes)
+        self.box_idx1 = box_idx1
+        self.box_idx2 = box_idx2
+
+
+class RepackMove(Move):
+    """Ersetzt die komplette Lösung (z.B. neu gepackte Permutation)."""
+    kind = "repack"
+
+    def __init__(self, box_count, new_boxes):
+        super().__init__(replaced={i: None for i in range(box_count)}, added=new_boxes)
+
+
+class DecodedRepackMove(RepackMove):
+    """
+    RepackMove für eine nur dekodierte Permutation: delta() braucht lediglich die
+    neue Box-Anzahl (Shelf-Packungen sind strafenfrei), die Boxen werden erst beim
+    ersten Zugriff auf added (apply/materialize) über build_boxes() gebaut.
+    """
+
+    def __init__(self, box_count, new_box_count, build_boxes):
+        self._added = None
+        self._build_boxes = build_boxes
+        super().__init__(box_count, None)
+        self.new_box_count = new_box_count
+
+    @property
+    def added(self):
+        if self._added is None:
+            self._added = self._build_boxes()
+        return self._added
+
+    @added.setter
+    def added(self, boxes):
+        # Move.__init__ setzt eine leere Liste; die Boxen kommen lazy aus build_boxes
+        self._added = boxes or None
+
+    def delta(self, problem, solution):
+        old_penalty = 0
+        for box_idx in self.replaced:
+            old_penalty += problem.box_penalty(solution.boxes[box_idx])
+        return (self.new_box_count - len(self.replaced))*problem.BOX_COST - old_penalty
+
+    def result_hash(self, solution, solution_hash):
+        # würde die Boxen bauen, die delta() gerade vermeidet
+        return None
@@ -1,6 +1,10 @@
-from copy import deepcopy
+from copy import copy
 import random
 
+from problem.rectangle_packing_problem import Box
+from problem.shelf_packing import shelf_insert
+from .moves import ShiftMove, RotateMove, BoxMove
+
 class OverlappingNeighbor:
     """
     Overlapping: wir lassen Overlaps zu, werden in evaluate_solution bestraft.
@@ -24,10 +28,40 @@ class OverlappingNeighbor:
         self.overlap_ratio = max(0, self.overlap_ratio - self.decrement)
         return nbrs
 
+    def get_moves(self, problem, solution):
+        moves = self._create_moves(problem, solution, all_rects=True, sample_size=0)
+        self.overlap_ratio = max(0, self.overlap_ratio - self.decrement)
+        return moves
+
+    def get_moves_subset(self, problem, solution, sample_size):
+        moves = self._create_moves(problem, solution, all_rects=False, sample_size=sample_size)
+        self.overlap_ratio = max(0, self.overlap_ratio - self.decrement)
+        return moves
+
+    def iter_neighbors(self, problem, solution, sample_size=0):
+        """Wie get_neighbors(_subset), aber lazy: jeder Nachbar entsteht erst beim Iterieren."""
+        # iter_moves senkt die Overlap-Ratio sofort (wie get_neighbors)
+        return (move.materialize(solution) for move in self.iter_moves(problem, solution, sample_size))
+
+    def iter_moves(self, problem, solution, sample_size=0):
+        """
+        Erzeugt die Züge lazy (Generator); sample_size <= 0 bedeutet alle Rechtecke.
+        Die Overlap-Ratio sinkt wie bei get_moves einmal pro Aufruf.
+        """
+        moves = self._iter_moves(problem, solution, all_rects=sample_size <= 0, sample_size=sample_size)
+        self.overlap_ratio = max(0, self.overlap_ratio - self.decrement)
+        return moves
+
     def _create_neighbors(self, problem, solution, all_rects, sample_size):
-        neighbors = []
+        moves = self._create_moves(problem, solution, all_rects, sample_size)
+        return [move.materialize(solution) for move in moves]
+
+    def _create_moves(self, problem, solution, all_rects, sample_size):
+        return list(self._iter_moves(problem, solution, all_rects, sample_size))
+
+    def _iter_moves(self, problem, solution, all_rects, sample_size):
         if not solution.boxes:
-            return neighbors
+            return
 
         all_items = []
         for b_idx, box_content in enumerate(solution.boxes):
@@ -35,7 +69,7 @@ class OverlappingNeighbor:
                 all_items.append((b_idx, r_idx))
 
         if not all_items:
-            return neighbors
+            return
 
         if all_rects:
             chosen_items = all_items
@@ -50,7 +84,8 @@ class OverlappingNeighbor:
             if box_idx>=len(solution.boxes) or rect_idx>=len(solution.boxes[box_idx]):
                 continue
 
-            rect, (x,y), rotated = solution.boxes[box_idx][rect_idx]
+            box_content = solution.boxes[box_idx]
+            rect, (x,y), rotated = box_content[rect_idx]
 
             for _ in range(self.neighbor_count):
                 move_type = random.choice(["shift","rotate","boxmove"])
@@ -59,83 +94,32 @@ class OverlappingNeighbor:
                     dy = random.randint(-2,2)
                     if dx==0 and dy==0:
                         continue
-                    new_sol = deepcopy(solution)
                     w = rect.width if not rotated else rect.height
                     h = rect.height if not rotated else rect.width
                     new_x = max(0, min(problem.L-w, x+dx))
                     new_y = max(0, min(problem.L-h, y+dy))
-                    new_sol.boxes[box_idx][rect_idx] = (rect,(new_x,new_y),rotated)
-                    neighbors.append(new_sol)
+                    new_box = copy(box_content)
+                    new_box[rect_idx] = (rect,(new_x,new_y),rotated)
+                    yield ShiftMove(box_idx, rect_idx, new_box)
 
                 elif move_type=="rotate":
-                    new_sol = deepcopy(solution)
-                    new_sol.boxes[box_idx][rect_idx] = (rect,(x,y), not rotated)
-                    neighbors.append(new_sol)
+                    new_box = copy(box_content)
+                    new_box[rect_idx] = (rect,(x,y), not rotated)
+                    yield RotateMove(box_idx, rect_idx, new_box)
 
                 elif move_type=="boxmove" and len(solution.boxes)>1:
-                    new_sol = deepcopy(solution)
-                    del new_sol.boxes[box_idx][rect_idx]
-                    tgt = random.randrange(len(new_sol.boxes))
-                    rect_inserted = self._place_shelf_in_box(problem, new_sol.boxes[tgt], rect)
-                    if not rect_inserted:
-                        new_box = []
-                        new_sol.boxes.append(new_box)
-                        self._place_shelf_in_box(problem, new_box, rect)
-                    neighbors.append(new_sol)
-        return neighbors
-
-    def _place_shelf_in_box(self, problem, box_content, rect):
-        if not box_content:
-            if rect.width<=problem.L and rect.height<=problem.L:
-                box_content.append((rect,(0,0),False))
-                return True
-            elif rect.height<=problem.L and rect.width<=problem.L:
-                box_content.append((rect,(0,0),True))
-                return True
-            return False
-
-        placed = sorted(box_content, key=lambda x: x[1][1])
-        shelves = []
-        cy = None
-        ch = 0
-        cw = 0
-        for (r,(rx,ry),rot) in placed:
-            w = r.width if not rot else r.height
-            h = r.height if not rot else r.width
-            if cy is None:
-                cy = ry
-                ch = h
-                cw = w
-            else:
-                if abs(ry-cy)<1e-9:
-                    cw += w
-                    ch = max(ch,h)
-                else:
-                    shelves.append((cy,ch,cw))
-                    cy = ry
-                    ch = h
-                    cw = w
-        if cy is not None:
-            shelves.append((cy,ch,cw))
-
-        last_y, last_h, last_w = shelves[-1]
-        w,h = rect.width, rect.height
-        can_norm = (last_w+w<=problem.L) and (last_y+max(last_h,h)<=problem.L)
-        can_rot = (last_w+h<=problem.L) and (last_y+max(last_h,w)<=problem.L)
-        if can_norm:
-            box_content.append((rect,(last_w,last_y),False))
-            return True
-        elif can_rot:
-            box_content.append((rect,(last_w,last_y),True))
-            return True
-        else:
-            new_y = last_y+last_h
-            if new_y>=problem.L:
-                return False
-            if w<=problem.L and (new_y+h)<=problem.L:
-                box_content.append((rect,(0,new_y),False))
-                return True
-            if h<=problem.L and (new_y+w)<=problem.L:
-                box_content.append((rect,(0,new_y),True))
-                return True
-            return False
+                    # Quellbox bleibt (ggf. leer) erhalten
+                    source_box = copy(box_content)
+                    del source_box[rect_idx]
+                    replaced = {box_idx: source_box}
+                    added = []
+                    tgt = random.randrange(len(solution.boxes))
+                    target_box = source_box if tgt==box_idx else copy(solution.boxes[tgt])
+                    rect_inserted = shelf_insert(rect, target_box, problem.L)
+                    if rect_inserted:
+                        replaced[tgt] = target_box
+                    else:
+                        new_box = Box()
+                        added.append(new_box)
+                        shelf_insert(rect, new_box, problem.L)
+                    yield BoxMove(box_idx, rect_idx, replaced, added)
@@ -1,14 +1,47 @@
+from array import array
+from collections import OrderedDict
+from functools import partial
+from math import isqrt
 import random
 
+from problem.rectangle_packing_problem import Box
+from problem.shelf_packing import ShelfDecoder
+from .moves import DecodedRepackMove
+
 class RuleBasedNeighbor:
     """
     Regelbasierte Nachbarschaft mit Permutationsänderungen.
     Auch hier: wir implementieren get_neighbors() und get_neighbors_subset().
     Die Shelf-Platzierung passiert, indem wir alle Rechtecke in Reihenfolge packen.
+
+    Permutationen werden mit einem ShelfDecoder nur in flache int-Arrays dekodiert;
+    Boxen werden erst für den gewählten Nachbarn gebaut.
+
+    Prefix-Checkpoints: Beim Dekodieren einer Permutation wird alle checkpoint_interval
+    Positionen der Regal-Zustand festgehalten. Ist die aktuelle Lösung selbst eine so
+    gepackte Permutation (erkannt an ihren Box-Objekten), werden deren Nachbarn aus
+    dieser Permutation gebildet und ab dem letzten Checkpoint vor der ersten
+    geänderten Position weitergepackt statt von vorne. Die materialisierten Packungen
+    liegen in einem LRU-Cache mit höchstens checkpoint_cache_size Einträgen.
     """
 
-    def __init__(self, swaps_per_call=5):
+    def __init__(self, swaps_per_call=5, checkpoint_interval=None, checkpoint_cache_size=32):
+        """
+        :param checkpoint_interval: Abstand der Checkpoints (None = ca. Wurzel aus n).
+        :param checkpoint_cache_size: Anzahl gemerkter Packungen (0 = ohne Checkpoints).
+        """
         self.swaps_per_call = swaps_per_call
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_cache_size = checkpoint_cache_size
+        self._packings = OrderedDict()  # Box-IDs der Packung -> _Packing
+        self._shelf_decoder = None
+
+    def __getstate__(self):
+        # Der Cache ist prozesslokal (z.B. für die parallele Bewertung nicht mitschicken)
+        state = self.__dict__.copy()
+        state['_packings'] = OrderedDict()
+        state['_shelf_decoder'] = None
+        return state
 
     def get_neighbors(self, problem, solution):
         return self._create_neighbors(problem, solution, all_rects=True, sample_size=0)
@@ -16,15 +49,53 @@ class RuleBasedNeighbor:
     def get_neighbors_subset(self, problem, solution, sample_size):
         return self._create_neighbors(problem, solution, all_rects=False, sample_size=sample_size)
 
+    def get_moves(self, problem, solution):
+        return list(self.iter_moves(problem, solution))
+
+    def get_moves_subset(self, problem, solution, sample_size):
+        return list(self.iter_moves(problem, solution, sample_size))
+
+    def iter_neighbors(self, problem, solution, sample_size=0):
+        """Wie get_neighbors(_subset), aber lazy: jeder Nachbar entsteht erst beim Iterieren."""
+        return self._iter_neighbors(problem, solution, all_rects=sample_size <= 0, sample_size=sample_size)
+
+    def iter_moves(self, problem, solution, sample_size=0):
+        """
+        Erzeugt die Züge lazy (Generator); sample_size <= 0 bedeutet swaps_per_call
+        Permutationen. Jede neue Permutation ersetzt die komplette Lösung. Die
+        Permutationen werden nur dekodiert (DecodedRepackMove); Boxen entstehen erst
+        für den Zug, der tatsächlich angewendet wird.
+        """
+        decoder = self._decoder(problem)
+        box_count = len(solution.boxes)
+        for decoded in self._iter_decoded(problem, solution, all_rects=sample_size <= 0, sample_size=sample_size):
+            yield DecodedRepackMove(box_count, decoded.box_count,
+                                    partial(self._materialize_boxes, problem, decoder, decoded))
+
     def _create_neighbors(self, problem, solution, all_rects, sample_size):
-        neighbors = []
-        rect_list = []
-        for box in solution.boxes:
-            for (r,_,_) in box:
-                rect_list.append(r)
+        return list(self._iter_neighbors(problem, solution, all_rects, sample_size))
+
+    def _iter_neighbors(self, problem, solution, all_rects, sample_size):
+        decoder = self._decoder(problem)
+        for decoded in self._iter_decoded(problem, solution, all_rects, sample_size):
+            new_sol = problem.create_empty_solution()
+            boxes = self._materialize_boxes(problem, decoder, decoded)
+            for box_content in boxes:
+                box_content.cow_owner = new_sol._cow_token
+            new_sol.boxes.extend(boxes)
+            yield new_sol
+
+    def _iter_decoded(self, problem, solution, all_rects, sample_size):
+        decoder = self._decoder(problem)
+        parent = self._lookup_packing(problem, solution)
+        if parent is not None:
+            # Nachbarn der Permutation, aus der die aktuelle Lösung gepackt wurde
+            rect_list = parent.order
+        else:
+            rect_list = decoder.indices(r for box in solution.boxes for (r,_,_) in box)
         n = len(rect_list)
         if n<2:
-            return neighbors
+            return
 
         # Um partial sampling zu simulieren, können wir sample_size swaps generieren.
         # all_rects ignorieren wir hier, weil "regelbasiert" = wir behandeln immer
@@ -33,21 +104,73 @@ class RuleBasedNeighbor:
         if not all_rects:
             total_swaps = sample_size
 
+        interval = self.checkpoint_interval or max(16, isqrt(n))
         for _ in range(total_swaps):
             new_order = rect_list[:]
+            # bis zur ersten geänderten Position packt new_order wie rect_list
+            first_changed = n
             if random.random()<0.5:
                 i,j = random.sample(range(n),2)
                 new_order[i], new_order[j] = new_order[j], new_order[i]
+                first_changed = min(i, j)
             else:
                 i = random.randrange(n)
                 j = random.randrange(n)
                 if i!=j:
                     rtemp = new_order.pop(i)
                     new_order.insert(j, rtemp)
+                    first_changed = min(i, j)
 
-            new_sol = problem.create_empty_solution()
-            for r in new_order:
-                problem.place_rectangle_shelf(r, new_sol)
-            neighbors.append(new_sol)
+            yield decoder.decode(new_order, interval, parent, first_changed)
+
+    # --------------------------------------------------------------------------
+    #   Dekodieren mit Prefix-Checkpoints
+    # --------------------------------------------------------------------------
+
+    def _decoder(self, problem):
+        decoder = self._shelf_decoder
+        if decoder is None or decoder.rectangles is not problem.rectangles or decoder.L != problem.L:
+            decoder = ShelfDecoder(problem.rectangles, problem.L)
+            self._shelf_decoder = decoder
+        return decoder
+
+    def _materialize_boxes(self, problem, decoder, decoded):
+        """Baut die Boxen einer dekodierten Packung und merkt sie sich als Eltern-Packung."""
+        boxes = decoder.materialize(decoded, Box)
+        self._remember_packing(problem, boxes, decoded)
+        return boxes
+
+    def _remember_packing(self, problem, boxes, decoded):
+        if self.checkpoint_cache_size <= 0:
+            return
+        key = tuple(map(id, boxes))
+        self._packings[key] = _Packing(problem.L, boxes, decoded)
+        self._packings.move_to_end(key)
+        while len(self._packings) > self.checkpoint_cache_size:
+            self._packings.popitem(last=False)
+
+    def _lookup_packing(self, problem, solution):
+        """Dekodierte Packung, deren Boxen (unverändert) die Boxen von solution sind, sonst None."""
+        if not self._packings:
+            return None
+        key = tuple(map(id, solution.boxes))
+        packing = self._packings.get(key)
+        if packing is None or packing.L != problem.L:
+            return None
+        if any(len(box_content) != length for box_content, length in zip(packing.boxes, packing.lengths)):
+            # Boxen wurden nach dem Packen verändert
+            del self._packings[key]
+            return None
+        self._packings.move_to_end(key)
+        return packing.decoded
+
+
+class _Packing:
+    """Materialisierte Packung: ihre Boxen (zur Wiedererkennung) und die dekodierten Spalten."""
+    __slots__ = ('L', 'boxes', 'lengths', 'decoded')
 
-        return neighbors
+    def __init__(self, L, boxes, decoded):
+        self.L = L
+        self.boxes = boxes
+        self.lengths = array('i', map(len, boxes))
+        self.decoded = decoded
@@ -0,0 +1,98 @@
+"""
+Gebündelte Bewertung einer ganzen Nachbarschaft in einem Aufruf.
+
+Alle Boxen, deren Strafe noch nicht gecacht ist, werden über sämtliche Lösungen
+hinweg eingesammelt (gemeinsame Box-Objekte nur einmal) und in einem Durchgang
+bewertet. Ist numpy installiert, laufen Bounds- und Overlap-Tests vektorisiert
+über alle Rechteck-Paare derselben Box; sonst wird pro Box in Python geprüft.
+"""
+try:
+    import numpy as np
+except ImportError:  # numpy ist optional
+    np = None
+
+from .rectangle_packing_problem import Box
+
+# Unterhalb dieser Anzahl an Platzierungen lohnt sich der numpy-Overhead nicht
+NUMPY_MIN_PLACEMENTS = 200
+
+
+def evaluate_solutions(problem, solutions):
+    """
+    Liefert die Zielfunktionswerte für alle solutions (gleiche Reihenfolge).
+    Ergebnisse werden im Penalty-Cache der Boxen abgelegt.
+    """
+    L = problem.L
+    dirty = []
+    seen = set()
+    for sol in solutions:
+        for box_content in sol.boxes:
+            cached = getattr(box_content, 'cached_penalty', None)
+            if cached is not None and cached[0] == L:
+                continue
+            if id(box_content) not in seen:
+                seen.add(id(box_content))
+                dirty.append(box_content)
+
+    # Strafen für einfache Listen (ohne Cache) nur für diesen Aufruf merken
+    uncached = {}
+    if dirty:
+        placements = sum(len(b) for b in dirty)
+        if np is not None and placements >= NUMPY_MIN_PLACEMENTS:
+            values = _box_penalties_numpy(dirty, L, problem.VIOLATION_PENALTY)
+        else:
+            values = [problem._compute_box_penalty(b) for b in dirty]
+        for box_content, value in zip(dirty, values):
+            if isinstance(box_content, Box):
+                box_content.cached_penalty = (L, value)
+            else:
+                uncached[id(box_content)] = value
+
+    results = []
+    for sol in solutions:
+        total = len(sol.boxes)*problem.BOX_COST
+        for box_content in sol.boxes:
+            if id(box_content) in uncached:
+                total += uncached[id(box_content)]
+            else:
+                total += problem.box_penalty(box_content)
+        results.append(total)
+    return results
+
+
+def _box_penalties_numpy(boxes, L, violation_penalty):
+    """
+    Vektorisierte Strafe für eine Liste von Boxen.
+    Koordinaten/Größen aller Platzierungen liegen in einem flachen Array,
+    die Overlap-Paare werden je Boxgröße k per triu_indices gebroadcastet.
+    """
+    sizes = np.fromiter((len(b) for b in boxes), dtype=np.int64, count=len(boxes))
+    flat = []
+    for box_content in boxes:
+        for (r, (x, y), rot) in box_content:
+            if rot:
+                flat.append((x, y, r.height, r.width))
+            else:
+                flat.append((x, y, r.width, r.height))
+    if not flat:
+        return [0]*len(boxes)
+    arr = np.asarray(flat)
+    x, y, w, h = arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3]
+    box_of = np.repeat(np.arange(len(boxes)), sizes)
+
+    # boundary
+    out = (x < 0) | (y < 0) | (x + w > L) | (y + h > L)
+    violations = np.bincount(box_of, weights=out, minlength=len(boxes))
+
+    # overlap check, gruppiert nach Boxgröße
+    offsets = np.cumsum(sizes) - sizes
+    for k in np.unique(sizes[sizes >= 2]):
+        sel = offsets[sizes == k]
+        iu, ju = np.triu_indices(int(k), 1)
+        i = (sel[:, None] + iu[None, :]).ravel()
+        j = (sel[:, None] + ju[None, :]).ravel()
+        overlap = ~((x[j] + w[j] <= x[i]) | (x[j] >= x[i] + w[i]) |
+                    (y[j] + h[j] <= y[i]) | (y[j] >= y[i] + h[i]))
+        violations += np.bincount(box_of[i], weights=overlap, minlength=len(boxes))
+
+    return [int(round(v))*violation_penalty for v in violations]
@@ -0,0 +1,122 @@
+"""
+Gemeinsame Bausteine der Binärformate (problem.instance_file, problem.serialization).
+
+BinaryWriter schreibt streamend in path + ".tmp" und benennt die Datei beim
+Schließen atomar um (vorher wird der Header mit den endgültigen Zählern neu
+geschrieben). MappedBinaryFile mappt eine Datei, prüft Magic und Version und
+verwaltet die daraus erzeugten Sichten. Alle Records sind little-endian.
+"""
+import mmap
+import os
+import sys
+
+
+class BinaryWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(self._header())
+
+    def _header(self):
+        """Header mit den aktuellen Zählern (in Unterklassen)."""
+        raise NotImplementedError
+
+    def _finish(self):
+        """Schreibt Daten hinter den Records (z.B. einen Index); optional."""
+
+    def _write(self, values):
+        """Schreibt ein array (wird auf big-endian Systemen vorher gedreht)."""
+        if sys.byteorder != "little":
+            values.byteswap()
+        values.tofile(self._file)
+
+    def close(self):
+        if self._file is None:
+            return
+        self._finish()
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Verwirft die bisher geschriebenen Daten."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class MappedBinaryFile:
+    """
+    Liest den Header (struct.Struct header) einer gemappten Datei. Sichten aus
+    _view() bleiben gültig, solange der Aufrufer sie hält: close() gibt die eigenen
+    Sichten frei, das Mapping selbst wird erst aufgehoben, wenn keine Sicht (z.B.
+    ein numpy-Array aus arrays()) mehr existiert.
+    """
+
+    def __init__(self, path, header, magic, version, kind):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            if len(self._mmap) < header.size:
+                raise ValueError(f"Keine {kind}: {path}")
+            fields = header.unpack_from(self._mmap)
+            if fields[0] != magic:
+                raise ValueError(f"Keine {kind}: {path}")
+            if fields[1] != version:
+                raise ValueError(f"Nicht unterstützte Version der {kind}: {fields[1]}")
+            if sys.byteorder != "little":
+                raise ValueError(f"{kind} kann nur auf little-endian Systemen gemappt werden")
+        except ValueError:
+            self.close()
+            raise
+        self.header_fields = fields[2:]
+
+    @property
+    def closed(self):
+        return self._mmap is None
+
+    def _view(self, start, end, fmt):
+        view = memoryview(self._mmap)[start:end].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def _check_open(self):
+        if self._mmap is None:
+            raise ValueError("Datei ist geschlossen")
+
+    def close(self):
+        if self._mmap is None:
+            return
+        for view in self._views:
+            try:
+                view.release()
+            except BufferError:
+                pass  # wird mit der letzten abgeleiteten Sicht freigegeben
+        self._views.clear()
+        mapping, self._mmap = self._mmap, None
+        try:
+            mapping.close()
+        except BufferError:
+            # noch Sichten beim Aufrufer: das Mapping endet mit der letzten davon
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,64 @@
+"""
+Untere Schranken für die Anzahl Boxen (2D-Bin-Packing mit Rotation, Box L x L).
+
+- continuous_bound: ceil(Summe der Flächen / L²)
+- large_item_bound: Schranke nach dem Muster von Martello & Vigo, symmetrisch in
+  Breite/Höhe formuliert und damit auch mit Rotation gültig:
+    * "große" Rechtecke (kürzere Seite > L/2) passen paarweise nicht in eine Box,
+      jedes braucht eine eigene Box;
+    * für jede Schwelle q <= L/2 müssen die übrigen Rechtecke mit kürzerer Seite >= q
+      in die Restfläche dieser Boxen oder in weitere Boxen. Neben einem großen
+      Rechteck mit kürzerer Seite > L - q ist für sie kein Platz (jeder Randstreifen
+      ist schmaler als q), sonst zählt höchstens dessen Restfläche L² - Fläche.
+lower_bound ist das Maximum beider Schranken.
+"""
+from math import ceil
+
+
+def continuous_bound(L, rectangles):
+    total_area = sum(r.width*r.height for r in rectangles)
+    return -(-total_area // (L*L))
+
+
+def large_item_bound(L, rectangles):
+    box_area = L*L
+    half = L / 2
+    big = []     # (kürzere Seite, Fläche) der großen Rechtecke
+    medium = []  # (kürzere Seite, Fläche) der übrigen
+    for r in rectangles:
+        short_side = min(r.width, r.height)
+        if short_side > half:
+            big.append((short_side, r.width*r.height))
+        else:
+            medium.append((short_side, r.width*r.height))
+    if not medium:
+        return len(big)
+
+    # Restfläche eines großen Rechtecks ist für Schwelle q nutzbar, solange L - kurz >= q
+    big.sort(key=lambda item: L - item[0], reverse=True)
+    medium.sort(reverse=True)
+    best = len(big)
+    medium_area = 0   # Fläche der übrigen Rechtecke mit kürzerer Seite >= q
+    usable_area = 0   # nutzbare Restfläche in den Boxen der großen Rechtecke
+    usable_count = 0
+    i = 0
+    # q absteigend über alle vorkommenden kürzeren Seiten der übrigen Rechtecke
+    while i < len(medium):
+        q = medium[i][0]
+        while i < len(medium) and medium[i][0] == q:
+            medium_area += medium[i][1]
+            i += 1
+        while usable_count < len(big) and L - big[usable_count][0] >= q:
+            usable_area += box_area - big[usable_count][1]
+            usable_count += 1
+        leftover = medium_area - usable_area
+        if leftover > 0:
+            best = max(best, len(big) + ceil(leftover / box_area))
+    return best
+
+
+def lower_bound(L, rectangles):
+    """Mindestanzahl Boxen für eine zulässige Lösung."""
+    if not rectangles:
+        return 0
+    return max(continuous_bound(L, rectangles), large_item_bound(L, rectangles))
@@ -0,0 +1,189 @@
+from array import array
+from copy import deepcopy
+
+from .rectangle_packing_problem import Box, RectangleSolution
+
+class CompactRectangleSolution(RectangleSolution):
+    """
+    Structure-of-arrays Variante von RectangleSolution.
+
+    Gespeichert werden int32-Spalten rect_id, x, y, rotated und box_id
+    (rect_id = Index in rectangles) sowie pro Box die gecachte Strafe (-1 = unbekannt).
+    Über .boxes steht dieselbe Listen-Sicht wie bei RectangleSolution zur Verfügung:
+    beim ersten Zugriff wird sie aus den Spalten aufgebaut ("auftauen"), freeze()
+    schreibt sie wieder in die Spalten zurück. Kopien (copy/deepcopy) kopieren
+    nur die Spalten, die Rectangle-Objekte werden geteilt.
+    """
+
+    def __init__(self, rectangles, L=None):
+        self.rectangles = rectangles
+        self.L = L
+        self._rect_ids = None  # id(Rectangle) -> rect_id, wird von Kopien geteilt
+        self.rect_id = array('i')
+        self.x = array('i')
+        self.y = array('i')
+        self.rotated = array('i')
+        self.box_id = array('i')
+        self.box_penalties = array('q')  # Anzahl Boxen = len(box_penalties)
+        self._boxes = None
+        super().__init__()
+
+    # --------------------------------------------------------------------------
+    #   Listen-Sicht (gleiche Schnittstelle wie RectangleSolution)
+    # --------------------------------------------------------------------------
+
+    @property
+    def boxes(self):
+        if self._boxes is None:
+            self._boxes = self._decode()
+        return self._boxes
+
+    @boxes.setter
+    def boxes(self, value):
+        self._boxes = value
+
+    @property
+    def is_frozen(self):
+        return self._boxes is None
+
+    def freeze(self):
+        """Schreibt die Listen-Sicht in die Spalten zurück und verwirft sie."""
+        if self._boxes is not None:
+            self._encode(self._boxes)
+            self._boxes = None
+        return self
+
+    def nbytes(self):
+        """Speicherbedarf der Spalten in Bytes."""
+        return sum(col.itemsize*len(col) for col in self._columns()) + \
+            self.box_penalties.itemsize*len(self.box_penalties)
+
+    # --------------------------------------------------------------------------
+    #   Konvertierung
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def from_solution(cls, solution, problem):
+        """Erzeugt eine kompakte Kopie einer beliebigen RectangleSolution."""
+        compact = cls(problem.rectangles, problem.L)
+        compact._encode(solution.boxes)
+        compact._boxes = None  # __init__ legt eine leere Listen-Sicht an
+        compact._copy_extra_attributes(solution, {}, skip=cls._OWN_ATTRIBUTES)
+        return compact
+
+    def to_solution(self):
+        """Erzeugt eine gewöhnliche RectangleSolution mit eigenen Box-Listen."""
+        solution = RectangleSolution()
+        solution.boxes = self._decode() if self._boxes is None else deepcopy(self._boxes, {id(r): r for r in self.rectangles})
+        return solution
+
+    # --------------------------------------------------------------------------
+    #   Kopieren
+    # --------------------------------------------------------------------------
+
+    def copy(self):
+        """
+        Eingefroren: reine Array-Kopie. Aufgetaut: copy-on-write Kopie der
+        Listen-Sicht wie bei RectangleSolution.copy().
+        """
+        if self._boxes is None:
+            new_sol = self._copy_frozen()
+            new_sol._copy_extra_attributes(self, {}, skip=self._OWN_ATTRIBUTES, share=True)
+            return new_sol
+        new_sol = self._new_sharing_rectangles()
+        new_sol._boxes = list(self._boxes)
+        new_sol._copy_extra_attributes(self, {}, skip=self._OWN_ATTRIBUTES, share=True)
+        self._cow_token = object()
+        return new_sol
+
+    def __copy__(self):
+        return self.__deepcopy__({})
+
+    def __deepcopy__(self, memo):
+        if self._boxes is None:
+            new_sol = self._copy_frozen()
+            memo[id(self)] = new_sol
+        else:
+            # aufgetaut: Listen-Sicht direkt in die Spalten der Kopie schreiben
+            new_sol = self._new_sharing_rectangles()
+            memo[id(self)] = new_sol
+            new_sol._boxes = None
+            new_sol._encode(self._boxes)
+            self._rect_ids = new_sol._rect_ids
+        new_sol._copy_extra_attributes(self, memo, skip=self._OWN_ATTRIBUTES)
+        return new_sol
+
+    def _copy_frozen(self):
+        """Eingefroren: reine Array-Kopien der Spalten."""
+        new_sol = self._new_sharing_rectangles()
+        new_sol._boxes = None
+        new_sol.rect_id = self.rect_id[:]
+        new_sol.x = self.x[:]
+        new_sol.y = self.y[:]
+        new_sol.rotated = self.rotated[:]
+        new_sol.box_id = self.box_id[:]
+        new_sol.box_penalties = self.box_penalties[:]
+        return new_sol
+
+    def __getstate__(self):
+        # id()-Map ist prozesslokal, nach dem Entpickeln neu aufbauen
+        state = self.__dict__.copy()
+        state['_rect_ids'] = None
+        return state
+
+    def _new_sharing_rectangles(self):
+        new_sol = CompactRectangleSolution.__new__(CompactRectangleSolution)
+        new_sol.rectangles = self.rectangles
+        new_sol.L = self.L
+        new_sol._rect_ids = self._rect_ids
+        new_sol._cow_token = object()
+        new_sol.rect_id, new_sol.x, new_sol.y, new_sol.rotated, new_sol.box_id = (array('i') for _ in range(5))
+        new_sol.box_penalties = array('q')
+        return new_sol
+
+    # --------------------------------------------------------------------------
+    #   Interna
+    # --------------------------------------------------------------------------
+
+    _OWN_ATTRIBUTES = ('rectangles', 'L', '_rect_ids', 'rect_id', 'x', 'y', 'rotated',
+                       'box_id', 'box_penalties', '_boxes', '_cow_token', 'boxes')
+
+    def _columns(self):
+        return (self.rect_id, self.x, self.y, self.rotated, self.box_id)
+
+    def _rect_id_map(self):
+        if self._rect_ids is None:
+            self._rect_ids = {id(r): i for i, r in enumerate(self.rectangles)}
+        return self._rect_ids
+
+    def _encode(self, boxes):
+        ids = self._rect_id_map()
+        rect_id, xs, ys, rotated, box_id = (array('i') for _ in range(5))
+        penalties = array('q')
+        for b_idx, box_content in enumerate(boxes):
+            for (r, (x, y), rot) in box_content:
+                rid = ids.get(id(r))
+                if rid is None:
+                    raise ValueError("Rechteck gehört nicht zu den Rechtecken dieser Lösung")
+                rect_id.append(rid)
+                xs.append(x)
+                ys.append(y)
+                rotated.append(1 if rot else 0)
+                box_id.append(b_idx)
+            cached = getattr(box_content, 'cached_penalty', None)
+            if cached is not None and cached[0] == self.L:
+                penalties.append(cached[1])
+            else:
+                penalties.append(-1)
+        self.rect_id, self.x, self.y, self.rotated, self.box_id = rect_id, xs, ys, rotated, box_id
+        self.box_penalties = penalties
+
+    def _decode(self):
+        rects = self.rectangles
+        boxes = [Box() for _ in range(len(self.box_penalties))]
+        for rid, x, y, rot, b_idx in zip(self.rect_id, self.x, self.y, self.rotated, self.box_id):
+            list.append(boxes[b_idx], (rects[rid], (x, y), bool(rot)))
+        for box_content, penalty in zip(boxes, self.box_penalties):
+            if penalty >= 0:
+                box_content.cached_penalty = (self.L, penalty)
+        return boxes
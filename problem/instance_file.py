@@ -0,0 +1,131 @@
+"""
+Kompaktes Binärformat für große Instanzmengen (alle Instanzen mit derselben Boxgröße L).
+
+Aufbau (little-endian):
+  Header:  Magic b"RPIN", Version (uint8), 3 Byte Füllung, L (int32),
+           Anzahl Instanzen (uint64), Anzahl Rechtecke (uint64), Offset des Index (uint64)
+  Daten:   pro Rechteck ein Record (Breite int32, Höhe int32), Instanzen hintereinander
+  Index:   Anzahl+1 Record-Offsets (uint64), Instanz i = Records index[i]..index[i+1]
+
+Geschrieben wird streamend (der Index entsteht erst am Ende) in eine temporäre Datei,
+die beim Schließen atomar umbenannt wird (problem.binary_file). InstanceFile liest
+per mmap: records(i) ist eine Sicht ohne Kopie, Rectangle-Objekte entstehen erst
+mit rectangles(i).
+"""
+import struct
+from array import array
+
+from .binary_file import BinaryWriter, MappedBinaryFile
+from .rectangle_packing_problem import Rectangle, RectanglePackingProblem
+
+INSTANCE_MAGIC = b"RPIN"
+INSTANCE_VERSION = 1
+_HEADER = struct.Struct("<4sB3xiQQQ")
+_RECORD_SIZE = 8
+
+
+class InstanceFileWriter(BinaryWriter):
+    """
+    Schreibt Instanzen nacheinander in path:
+        with InstanceFileWriter(path, L) as writer:
+            writer.add(rects)
+    """
+
+    def __init__(self, path, L):
+        self.L = L
+        self.count = 0
+        self._offsets = array('Q', [0])
+        self._index_offset = 0
+        super().__init__(path)
+
+    def _header(self):
+        return _HEADER.pack(INSTANCE_MAGIC, INSTANCE_VERSION, self.L, self.count,
+                            self._offsets[-1], self._index_offset)
+
+    def add(self, rects):
+        """Fügt eine Instanz aus Rectangle-Objekten an."""
+        records = array('i')
+        for r in rects:
+            records.append(r.width)
+            records.append(r.height)
+        self._add_records(records)
+
+    def add_arrays(self, widths, heights):
+        """Fügt eine Instanz aus Breiten/Höhen (Sequenzen oder numpy-Arrays) an."""
+        if len(widths) != len(heights):
+            raise ValueError("widths und heights müssen gleich lang sein")
+        records = array('i', bytes(_RECORD_SIZE*len(widths)))
+        records[0::2] = array('i', _as_ints(widths))
+        records[1::2] = array('i', _as_ints(heights))
+        self._add_records(records)
+
+    def _add_records(self, records):
+        self._write(records)
+        self._offsets.append(self._offsets[-1] + len(records)//2)
+        self.count += 1
+
+    def _finish(self):
+        # Index hinter den Records, auf 8 Byte ausgerichtet
+        offset = self._file.tell()
+        padding = -offset % 8
+        self._file.write(bytes(padding))
+        self._index_offset = offset + padding
+        self._write(array('Q', self._offsets))
+
+
+class InstanceFile(MappedBinaryFile):
+    """
+    Liest eine Instanzdatei per mmap (nur auf little-endian Systemen). Sichten aus
+    records()/arrays() bleiben auch nach close() gültig, solange sie gehalten werden.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, _HEADER, INSTANCE_MAGIC, INSTANCE_VERSION, "Instanzdatei")
+        self.L, self.count, self.rect_count, index_offset = self.header_fields
+        self._records = self._view(_HEADER.size, _HEADER.size + self.rect_count*_RECORD_SIZE, 'i')
+        self._index = self._view(index_offset, index_offset + (self.count + 1)*8, 'Q')
+
+    def __len__(self):
+        return self.count
+
+    def size(self, i):
+        """Anzahl Rechtecke von Instanz i."""
+        self._check_open()
+        return self._index[i + 1] - self._index[i]
+
+    def records(self, i):
+        """Flache int32-Sicht [w0, h0, w1, h1, ...] auf Instanz i (ohne Kopie)."""
+        self._check_open()
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self._records[2*self._index[i]:2*self._index[i + 1]]
+
+    def arrays(self, i):
+        """(widths, heights) von Instanz i; mit numpy als Sichten ohne Kopie."""
+        records = self.records(i)
+        try:
+            import numpy as np
+        except ImportError:
+            return records[0::2].tolist(), records[1::2].tolist()
+        pairs = np.frombuffer(records, dtype="<i4").reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def rectangles(self, i):
+        records = self.records(i)
+        return [Rectangle(w, h) for w, h in zip(records[0::2].tolist(), records[1::2].tolist())]
+
+    def problem(self, i, **kwargs):
+        return RectanglePackingProblem(self.L, self.rectangles(i), **kwargs)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        return self.rectangles(i)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.rectangles(i)
+
+
+def _as_ints(values):
+    return values.tolist() if hasattr(values, "tolist") else values
@@ -1,6 +1,32 @@
+"""
+Erzeugung von Probleminstanzen.
+
+generate_instances zieht mit dem globalen random-Modul (wie bisher, z.B. für die
+GUI). iter_instances/iter_instance_arrays sind reproduzierbar: Instanz i hängt
+nur von (seed, i) ab, wird erst beim Iterieren erzeugt und mit numpy (falls
+installiert) vektorisiert gezogen. Mit und ohne numpy entstehen für denselben
+Seed unterschiedliche, jeweils reproduzierbare Instanzen. Große Instanzmengen
+lassen sich mit write_instances (siehe problem.instance_file) kompakt speichern.
+
+Verteilungen der Seitenlängen (jeweils auf [min, max] und L beschnitten):
+  uniform:     gleichverteilt
+  normal:      Mittelwert (min+max)/2, Standardabweichung (max-min)/6
+  exponential: viele kleine Seiten, Skala (max-min)/4 ab min
+  bimodal:     je zur Hälfte aus dem unteren bzw. oberen Viertel von [min, max]
+"""
 import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy ist optional
+    np = None
+
 from .rectangle_packing_problem import Rectangle
 
+DISTRIBUTIONS = ("uniform", "normal", "exponential", "bimodal")
+
+
 def generate_instances(count, num_rectangles, min_side1, max_side1, min_side2, max_side2, L):
     instances = []
     for _ in range(count):
@@ -13,3 +39,82 @@ def generate_instances(count, num_rectangles, min_side1, max_side1, min_side2, m
             rects.append(Rectangle(w,h))
         instances.append(rects)
     return instances
+
+
+def iter_instances(count, num_rectangles, min_side1, max_side1, min_side2, max_side2, L, seed=0,
+                   distribution="uniform"):
+    """Wie generate_instances, aber seeded und lazy: liefert nacheinander Listen von Rectangle."""
+    for widths, heights in iter_instance_arrays(count, num_rectangles, min_side1, max_side1,
+                                                min_side2, max_side2, L, seed, distribution):
+        yield [Rectangle(w, h) for w, h in zip(widths.tolist(), heights.tolist())]
+
+
+def iter_instance_arrays(count, num_rectangles, min_side1, max_side1, min_side2, max_side2, L, seed=0,
+                         distribution="uniform"):
+    """
+    Liefert pro Instanz (widths, heights) als int-Arrays (numpy bzw. array('i')),
+    ohne Rectangle-Objekte anzulegen.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unbekannte Verteilung: {distribution}")
+    for index in range(count):
+        if np is not None:
+            rng = np.random.default_rng([seed, index])
+            widths = _draw_numpy(rng, distribution, num_rectangles, min_side1, min(max_side1, L))
+            heights = _draw_numpy(rng, distribution, num_rectangles, min_side2, min(max_side2, L))
+        else:
+            rng = random.Random(f"{seed}:{index}")
+            widths = _draw_python(rng, distribution, num_rectangles, min_side1, min(max_side1, L))
+            heights = _draw_python(rng, distribution, num_rectangles, min_side2, min(max_side2, L))
+        yield widths, heights
+
+
+def write_instances(path, L, instances):
+    """
+    Schreibt Instanzen (Listen von Rectangle oder (widths, heights)-Paare, z.B. aus
+    iter_instance_arrays) streamend in eine Instanzdatei (problem.instance_file).
+    :return: Anzahl geschriebener Instanzen
+    """
+    from .instance_file import InstanceFileWriter
+    with InstanceFileWriter(path, L) as writer:
+        for instance in instances:
+            if isinstance(instance, tuple):
+                writer.add_arrays(*instance)
+            else:
+                writer.add(instance)
+        return writer.count
+
+
+def _draw_numpy(rng, distribution, n, lo, hi):
+    lo = min(lo, hi)
+    if distribution == "uniform":
+        values = rng.integers(lo, hi + 1, size=n)
+    elif distribution == "normal":
+        values = np.rint(rng.normal((lo + hi) / 2, max((hi - lo) / 6, 1e-9), size=n))
+    elif distribution == "exponential":
+        values = lo + np.floor(rng.exponential(max((hi - lo) / 4, 1e-9), size=n))
+    else:
+        quarter = max((hi - lo) // 4, 0)
+        large = rng.random(size=n) < 0.5
+        values = np.where(large, rng.integers(hi - quarter, hi + 1, size=n),
+                          rng.integers(lo, lo + quarter + 1, size=n))
+    return np.clip(values, lo, hi).astype(np.int32)
+
+
+def _draw_python(rng, distribution, n, lo, hi):
+    lo = min(lo, hi)
+    values = array('i')
+    quarter = max((hi - lo) // 4, 0)
+    for _ in range(n):
+        if distribution == "uniform":
+            value = rng.randint(lo, hi)
+        elif distribution == "normal":
+            value = round(rng.gauss((lo + hi) / 2, max((hi - lo) / 6, 1e-9)))
+        elif distribution == "exponential":
+            value = lo + int(rng.expovariate(1 / max((hi - lo) / 4, 1e-9)))
+        elif rng.random() < 0.5:
+            value = rng.randint(hi - quarter, hi)
+        else:
+            value = rng.randint(lo, lo + quarter)
+        values.append(min(max(value, lo), hi))
+    return values
@@ -5,6 +5,18 @@ class OptimizationProblem(ABC):
     def evaluate_solution(self, solution):
         pass
 
+    def evaluate_solutions(self, solutions):
+        """Bewertet mehrere Lösungen auf einmal (Standard: einzeln nacheinander)."""
+        return [self.evaluate_solution(s) for s in solutions]
+
+    def objective_lower_bound(self):
+        """Untere Schranke für den Zielfunktionswert zulässiger Lösungen (None = keine bekannt)."""
+        return None
+
+    def solution_penalty(self, solution):
+        """Strafanteil des Zielfunktionswerts (0 = zulässig); Standard: keine Strafterme."""
+        return 0
+
     @abstractmethod
     def create_empty_solution(self):
         pass
@@ -1,43 +1,261 @@
+from copy import copy, deepcopy
+
+from .bounds import lower_bound
 from .interfaces import OptimizationProblem
+from .shelf_packing import shelf_insert, shelf_placement
+from .zobrist import MASK, placement_key
 
 class Rectangle:
     def __init__(self, width, height):
         self.width = width
         self.height = height
 
+class Box(list):
+    """
+    Inhalt einer Box: list of (Rectangle,(x,y),rotated).
+    Die Box merkt sich ihre zuletzt berechnete Strafe (cached_penalty = (L, strafe)).
+    Jede Änderung an der Liste verwirft den Cache, d.h. nach einem deepcopy
+    müssen nur die Boxen neu bewertet werden, die ein Nachbar tatsächlich verändert hat.
+    Ein ggf. vorhandener räumlicher Index (problem.spatial_index), der Regal-Zustand
+    (problem.shelf_packing), die belegte Fläche und der Hash (problem.zobrist) werden bei append
+    fortgeschrieben und bei allen anderen Änderungen verworfen.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.cached_penalty = None
+        self.spatial_index = None
+        self.shelf_state = None
+        self._used_area = None
+        self._zobrist = None
+        self.cow_owner = None  # Token der Lösung, die diese Box exklusiv besitzt
+
+    def used_area(self):
+        """Summe der Rechteckflächen in der Box (gecacht)."""
+        if self._used_area is None:
+            self._used_area = sum(r.width*r.height for (r, _, _) in self)
+        return self._used_area
+
+    def _touch(self):
+        self.cached_penalty = None
+        self.spatial_index = None
+        self.shelf_state = None
+        self._used_area = None
+        self._zobrist = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touch()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._touch()
+        return result
+
+    def __imul__(self, n):
+        result = super().__imul__(n)
+        self._touch()
+        return result
+
+    def append(self, item):
+        super().append(item)
+        self.cached_penalty = None
+        if self._used_area is not None:
+            self._used_area += item[0].width*item[0].height
+        if self._zobrist is not None:
+            self._zobrist = (self._zobrist + placement_key(item)) & MASK
+        if self.spatial_index is not None:
+            self.spatial_index.insert_placement(item)
+        if self.shelf_state is not None:
+            self.shelf_state.add_placement(item)
+
+    def extend(self, items):
+        super().extend(items)
+        self._touch()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._touch()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._touch()
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+        self._touch()
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._touch()
+
+    def reverse(self):
+        super().reverse()
+        self._touch()
+
+    def __copy__(self):
+        new_box = Box(self)
+        new_box.cached_penalty = self.cached_penalty
+        new_box._used_area = self._used_area
+        new_box._zobrist = self._zobrist
+        if self.shelf_state is not None:
+            new_box.shelf_state = copy(self.shelf_state)
+        return new_box
+
+    def __deepcopy__(self, memo):
+        new_box = Box()
+        memo[id(self)] = new_box
+        list.extend(new_box, (deepcopy(item, memo) for item in self))
+        new_box.cached_penalty = self.cached_penalty
+        new_box._used_area = self._used_area
+        new_box._zobrist = self._zobrist
+        if self.shelf_state is not None:
+            new_box.shelf_state = copy(self.shelf_state)
+        return new_box
+
 class RectangleSolution:
     def __init__(self):
-        self.boxes = []  # list of list of (Rectangle,(x,y),rotated)
+        self.boxes = []  # list of Box (list of (Rectangle,(x,y),rotated))
+        self._cow_token = object()
+
+    def copy(self):
+        """
+        Copy-on-write Kopie: nur die äußere Box-Liste wird kopiert, alle Boxen
+        werden mit dieser Lösung geteilt. Änderungen an einer Box müssen über
+        writable_box(idx) laufen, das eine geteilte Box einmalig kopiert.
+        Zusatzattribute (z.B. guillotine_data) werden per Referenz geteilt, siehe
+        _copy_extra_attributes.
+        """
+        new_sol = object.__new__(type(self))
+        new_sol._copy_extra_attributes(self, {}, skip=('boxes', '_cow_token'), share=True)
+        new_sol.boxes = list(self.boxes)
+        new_sol._cow_token = object()
+        # Ab jetzt gehören die bisherigen Boxen keiner der beiden Lösungen mehr allein
+        self._cow_token = object()
+        return new_sol
+
+    def writable_box(self, box_idx):
+        """
+        Liefert solution.boxes[box_idx] zum Verändern. Ist die Box mit einer
+        anderen Lösung geteilt, wird sie vorher kopiert (Penalty-Cache bleibt erhalten).
+        """
+        box_content = self.boxes[box_idx]
+        if getattr(box_content, 'cow_owner', None) is not self._cow_token:
+            box_content = copy(box_content) if isinstance(box_content, Box) else Box(box_content)
+            box_content.cow_owner = self._cow_token
+            self.boxes[box_idx] = box_content
+        return box_content
+
+    def _copy_extra_attributes(self, source, memo, skip=(), share=False):
+        """
+        Übernimmt die übrigen Attribute von source, z.B. guillotine_data der Strategien.
+        Mit share=True (copy()) werden sie nicht kopiert: sie beschreiben nur den
+        Aufbau der Lösung, Moves lesen und ändern sie nicht. Wer auf zwei Kopien
+        weiter Rechtecke platzieren will, muss deepcopy verwenden.
+        """
+        for key, value in vars(source).items():
+            if key not in skip:
+                setattr(self, key, value if share else deepcopy(value, memo))
 
 class RectanglePackingProblem(OptimizationProblem):
-    def __init__(self, L, rectangles):
+    BOX_COST = 1000
+    VIOLATION_PENALTY = 100000
+
+    def __init__(self, L, rectangles, compact=False):
+        """
+        :param compact: Wenn True, liefert create_empty_solution eine
+                        CompactRectangleSolution (int32-Spalten statt Tupel-Listen).
+        """
         self.L = L
         self.rectangles = rectangles
+        self.compact = compact
+        self._lower_bound = None  # (L, Anzahl Rechtecke, Schranke)
 
     def evaluate_solution(self, solution):
         """
         Minimierungsziel: #Boxen * 1000 + Strafe pro Overlap + out-of-bounds
+        Die Strafe wird pro Box gecacht, unveränderte Boxen werden nicht neu geprüft.
         """
         box_count = len(solution.boxes)
         penalty = 0
         for box_content in solution.boxes:
-            for i in range(len(box_content)):
-                r_i, (x_i,y_i), rot_i = box_content[i]
-                w_i = r_i.width if not rot_i else r_i.height
-                h_i = r_i.height if not rot_i else r_i.width
-                # boundary
-                if x_i<0 or y_i<0 or (x_i+w_i)>self.L or (y_i+h_i)>self.L:
-                    penalty += 100000
-                for j in range(i+1, len(box_content)):
-                    r_j, (x_j,y_j), rot_j = box_content[j]
-                    w_j = r_j.width if not rot_j else r_j.height
-                    h_j = r_j.height if not rot_j else r_j.width
-                    # overlap check
-                    if not( (x_j+w_j)<=x_i or x_j>=(x_i+w_i) or (y_j+h_j)<=y_i or y_j>=(y_i+h_i) ):
-                        penalty += 100000
-        return box_count*1000 + penalty
+            penalty += self.box_penalty(box_content)
+        return box_count*self.BOX_COST + penalty
+
+    def box_lower_bound(self):
+        """Mindestanzahl Boxen (siehe problem.bounds), gecacht."""
+        cached = self._lower_bound
+        if cached is None or cached[0] != self.L or cached[1] != len(self.rectangles):
+            cached = (self.L, len(self.rectangles), lower_bound(self.L, self.rectangles))
+            self._lower_bound = cached
+        return cached[2]
+
+    def objective_lower_bound(self):
+        """
+        Jede zulässige Lösung hat mindestens box_lower_bound() Boxen, ihr Wert liegt also
+        nicht unter dieser Schranke. Für unzulässige Lösungen gilt das nicht: sobald
+        box_lower_bound()*BOX_COST >= VIOLATION_PENALTY (ab 100 Boxen), ist z.B. eine Box
+        weniger mit einer Verletzung billiger. Optimal ist ein Wert <= Schranke daher nur,
+        wenn zusätzlich solution_penalty() == 0 ist.
+        """
+        return self.box_lower_bound()*self.BOX_COST
+
+    def solution_penalty(self, solution):
+        """Summe der Box-Strafen (Overlaps + out-of-bounds), 0 = zulässig."""
+        return sum(self.box_penalty(box_content) for box_content in solution.boxes)
+
+    def evaluate_solutions(self, solutions):
+        """
+        Bewertet eine ganze Nachbarschaft in einem Durchgang
+        (siehe problem.batch_evaluation).
+        """
+        from .batch_evaluation import evaluate_solutions
+        return evaluate_solutions(self, solutions)
+
+    def box_penalty(self, box_content):
+        """
+        Strafe (Overlaps + out-of-bounds) einer einzelnen Box.
+        Für Box-Objekte wird das Ergebnis bis zur nächsten Änderung gecacht.
+        """
+        cached = getattr(box_content, 'cached_penalty', None)
+        if cached is not None and cached[0] == self.L:
+            return cached[1]
+        penalty = self._compute_box_penalty(box_content)
+        if isinstance(box_content, Box):
+            box_content.cached_penalty = (self.L, penalty)
+        return penalty
+
+    def _compute_box_penalty(self, box_content):
+        penalty = 0
+        for i in range(len(box_content)):
+            r_i, (x_i,y_i), rot_i = box_content[i]
+            w_i = r_i.width if not rot_i else r_i.height
+            h_i = r_i.height if not rot_i else r_i.width
+            # boundary
+            if x_i<0 or y_i<0 or (x_i+w_i)>self.L or (y_i+h_i)>self.L:
+                penalty += self.VIOLATION_PENALTY
+            for j in range(i+1, len(box_content)):
+                r_j, (x_j,y_j), rot_j = box_content[j]
+                w_j = r_j.width if not rot_j else r_j.height
+                h_j = r_j.height if not rot_j else r_j.width
+                # overlap check
+                if not( (x_j+w_j)<=x_i or x_j>=(x_i+w_i) or (y_j+h_j)<=y_i or y_j>=(y_i+h_i) ):
+                    penalty += self.VIOLATION_PENALTY
+        return penalty
 
     def create_empty_solution(self):
+        if self.compact:
+            from .compact_solution import CompactRectangleSolution
+            return CompactRectangleSolution(self.rectangles, self.L)
         return RectangleSolution()
 
     def place_rectangle_shelf(self, rect, solution):
@@ -45,74 +263,17 @@ class RectanglePackingProblem(OptimizationProblem):
         Einfaches Shelf-Verfahren:
         - Probiere existierende Boxen
         - Falls nicht reinpasst, neue Box
+        Der Regal-Zustand jeder Box wird an der Box gehalten (siehe problem.shelf_packing),
+        ein Versuch pro Box kostet daher O(1).
         """
-        for box_content in solution.boxes:
-            if self._try_shelf_insert(rect, box_content):
+        for b_idx, box_content in enumerate(solution.boxes):
+            placement = shelf_placement(rect, box_content, self.L)
+            if placement is not None:
+                solution.writable_box(b_idx).append(placement)
                 return solution
-        # neue Box
-        new_box = []
+        # neue Box (gehört direkt dieser Lösung)
+        new_box = Box()
+        new_box.cow_owner = solution._cow_token
         solution.boxes.append(new_box)
-        self._try_shelf_insert(rect, new_box)  # passt (lt. Aufgabe)
+        shelf_insert(rect, new_box, self.L)  # passt (lt. Aufgabe)
         return solution
-
-    def _try_shelf_insert(self, rect, box_content):
-        if not box_content:
-            # leer
-            if rect.width<=self.L and rect.height<=self.L:
-                box_content.append((rect,(0,0),False))
-                return True
-            if rect.height<=self.L and rect.width<=self.L:
-                box_content.append((rect,(0,0),True))
-                return True
-            return False
-
-        # baue shelves
-        placed = sorted(box_content, key=lambda x: x[1][1])
-        shelves = []
-        cy=None
-        ch=0
-        cw=0
-        for (r,(rx,ry),rot) in placed:
-            w = r.width if not rot else r.height
-            h = r.height if not rot else r.width
-            if cy is None:
-                cy=ry
-                ch=h
-                cw=w
-            else:
-                if abs(ry-cy)<1e-9:
-                    # selbe Zeile
-                    cw+=w
-                    ch = max(ch,h)
-                else:
-                    shelves.append((cy,ch,cw))
-                    cy=ry
-                    ch=h
-                    cw=w
-        if cy is not None:
-            shelves.append((cy,ch,cw))
-
-        # versuche in letzter Zeile
-        last_y,last_h,last_w = shelves[-1]
-        w=rect.width
-        h=rect.height
-        # normal
-        can_norm = (last_w + w <= self.L) and (last_y+max(last_h,h)<=self.L)
-        can_rot = (last_w + h <= self.L) and (last_y+max(last_h,w)<=self.L)
-        if can_norm:
-            box_content.append((rect,(last_w,last_y),False))
-            return True
-        if can_rot:
-            box_content.append((rect,(last_w,last_y),True))
-            return True
-        # neue Zeile
-        new_y = last_y+last_h
-        if new_y>=self.L:
-            return False
-        if w<=self.L and (new_y+h)<=self.L:
-            box_content.append((rect,(0,new_y),False))
-            return True
-        if h<=self.L and (new_y+w)<=self.L:
-            box_content.append((rect,(0,new_y),True))
-            return True
-        return False
@@ -0,0 +1,188 @@
+"""
+Versioniertes Binärformat für Probleme und Lösungen (Datei mit Endung z.B. .rps).
+
+Aufbau (little-endian, feste Record-Breiten):
+  Header:      Magic b"RPSF", Version (uint8), 3 Byte Füllung, L (int32),
+               Anzahl Rechtecke, Anzahl Boxen, Anzahl Platzierungen (je uint64), 4 Byte Füllung
+  Rechtecke:   pro Rechteck (Breite int32, Höhe int32), Index = rect_id
+  Platzierung: pro Platzierung (rect_id, x, y, rotated, box_id) als int32
+               (dieselben Spalten wie CompactRectangleSolution)
+Eine Datei ohne Platzierungen und Boxen beschreibt nur das Problem.
+
+SolutionWriter schreibt streamend (Box für Box oder spaltenweise) in eine temporäre
+Datei und benennt sie beim Schließen atomar um (problem.binary_file). SolutionFile liest per mmap, die
+Spalten sind Sichten ohne Kopie; Python-Objekte entstehen erst mit problem()
+bzw. solution(). diff_solutions vergleicht zwei Dateien direkt auf den Spalten.
+"""
+import struct
+from array import array
+
+from .binary_file import BinaryWriter, MappedBinaryFile
+from .rectangle_packing_problem import Box, Rectangle, RectanglePackingProblem
+
+SOLUTION_MAGIC = b"RPSF"
+SOLUTION_VERSION = 1
+_HEADER = struct.Struct("<4sB3xiQQQ4x")
+_PLACEMENT_FIELDS = ("rect_id", "x", "y", "rotated", "box_id")
+_CHUNK = 1 << 16
+
+
+class SolutionWriter(BinaryWriter):
+    """
+    Schreibt die Rechtecke von problem und danach beliebig viele Boxen:
+        with SolutionWriter(path, problem) as writer:
+            for box_content in boxes:
+                writer.add_box(box_content)
+    """
+
+    def __init__(self, path, problem):
+        self.L = problem.L
+        self.rect_count = len(problem.rectangles)
+        self.box_count = 0
+        self.placement_count = 0
+        self._rectangles = problem.rectangles
+        self._rect_ids = None
+        super().__init__(path)
+        for start in range(0, self.rect_count, _CHUNK):
+            records = array('i')
+            for r in problem.rectangles[start:start + _CHUNK]:
+                records.append(r.width)
+                records.append(r.height)
+            self._write(records)
+
+    def add_box(self, box_content):
+        """Hängt eine Box (list of (Rectangle,(x,y),rotated)) an."""
+        if self._rect_ids is None:
+            self._rect_ids = {id(r): i for i, r in enumerate(self._rectangles)}
+        records = array('i')
+        for (r, (x, y), rot) in box_content:
+            rid = self._rect_ids.get(id(r))
+            if rid is None:
+                raise ValueError("Rechteck gehört nicht zum Problem")
+            records.extend((rid, x, y, 1 if rot else 0, self.box_count))
+        self._write(records)
+        self.placement_count += len(box_content)
+        self.box_count += 1
+
+    def add_columns(self, rect_id, x, y, rotated, box_id, box_count):
+        """
+        Hängt box_count Boxen als Spalten an (box_id relativ zu den neuen Boxen,
+        z.B. die Spalten einer eingefrorenen CompactRectangleSolution).
+        """
+        n = len(rect_id)
+        records = array('i', bytes(4*len(_PLACEMENT_FIELDS)*n))
+        records[0::5] = _as_array(rect_id)
+        records[1::5] = _as_array(x)
+        records[2::5] = _as_array(y)
+        records[3::5] = _as_array(rotated)
+        box_ids = _as_array(box_id)
+        if self.box_count:
+            box_ids = array('i', (b + self.box_count for b in box_ids))
+        records[4::5] = box_ids
+        self._write(records)
+        self.placement_count += n
+        self.box_count += box_count
+
+    def _header(self):
+        return _HEADER.pack(SOLUTION_MAGIC, SOLUTION_VERSION, self.L, self.rect_count,
+                            self.box_count, self.placement_count)
+
+
+def save_problem(path, problem):
+    SolutionWriter(path, problem).close()
+
+
+def save_solution(path, problem, solution):
+    """
+    Speichert problem und solution. Eine eingefrorene CompactRectangleSolution wird
+    direkt aus ihren Spalten geschrieben, sonst Box für Box.
+    """
+    with SolutionWriter(path, problem) as writer:
+        if getattr(solution, 'is_frozen', False):
+            writer.add_columns(solution.rect_id, solution.x, solution.y, solution.rotated,
+                               solution.box_id, len(solution.box_penalties))
+        else:
+            for box_content in solution.boxes:
+                writer.add_box(box_content)
+
+
+class SolutionFile(MappedBinaryFile):
+    """
+    Liest eine mit SolutionWriter geschriebene Datei per mmap (nur auf little-endian
+    Systemen). rectangle_records und placement_records sind bis close() gültig,
+    daraus abgeleitete Sichten (z.B. column()) auch danach, solange sie gehalten werden.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, _HEADER, SOLUTION_MAGIC, SOLUTION_VERSION, "Lösungsdatei")
+        self.L, self.rect_count, self.box_count, self.placement_count = self.header_fields
+        rect_end = _HEADER.size + 8*self.rect_count
+        self.rectangle_records = self._view(_HEADER.size, rect_end, 'i')
+        self.placement_records = self._view(rect_end, rect_end + 4*len(_PLACEMENT_FIELDS)*self.placement_count, 'i')
+
+    def column(self, name):
+        """Spalte rect_id, x, y, rotated oder box_id als Sicht (ohne Kopie)."""
+        self._check_open()
+        return self.placement_records[_PLACEMENT_FIELDS.index(name)::len(_PLACEMENT_FIELDS)]
+
+    def problem(self, **kwargs):
+        self._check_open()
+        records = self.rectangle_records
+        rects = [Rectangle(w, h) for w, h in zip(records[0::2].tolist(), records[1::2].tolist())]
+        return RectanglePackingProblem(self.L, rects, **kwargs)
+
+    def solution(self, problem=None):
+        """
+        Baut die Lösung für problem (Standard: self.problem()) auf; mit problem.compact
+        als CompactRectangleSolution direkt aus den Spalten.
+        """
+        if problem is None:
+            problem = self.problem()
+        elif problem.L != self.L or len(problem.rectangles) != self.rect_count:
+            raise ValueError("Lösungsdatei gehört zu einer anderen Probleminstanz")
+        solution = problem.create_empty_solution()
+        columns = [array('i', self.column(name).tolist()) for name in _PLACEMENT_FIELDS]
+        if getattr(solution, 'is_frozen', False):
+            solution.rect_id, solution.x, solution.y, solution.rotated, solution.box_id = columns
+            solution.box_penalties = array('q', [-1])*self.box_count
+            return solution
+        rects = problem.rectangles
+        boxes = [Box() for _ in range(self.box_count)]
+        for rid, x, y, rot, b_idx in zip(*columns):
+            list.append(boxes[b_idx], (rects[rid], (x, y), bool(rot)))
+        solution.boxes = boxes
+        return solution
+
+    def placements_by_rect(self):
+        """Liste rect_id -> (Box-Kennung, x, y, rotated) bzw. None für nicht platzierte Rechtecke."""
+        rect_id, xs, ys, rotated, box_id = (self.column(name).tolist() for name in _PLACEMENT_FIELDS)
+        # Box-Kennung = kleinste rect_id der Box, unabhängig von der Box-Reihenfolge
+        label = [None]*self.box_count
+        for rid, b_idx in zip(rect_id, box_id):
+            if label[b_idx] is None or rid < label[b_idx]:
+                label[b_idx] = rid
+        result = [None]*self.rect_count
+        for rid, x, y, rot, b_idx in zip(rect_id, xs, ys, rotated, box_id):
+            result[rid] = (label[b_idx], x, y, rot)
+        return result
+
+
+def diff_solutions(old, new):
+    """
+    Vergleicht zwei Lösungsdateien (SolutionFile) desselben Problems.
+    :return: Liste (rect_id, alt, neu) der Rechtecke, deren Platzierung (Box, x, y,
+             rotated) sich geändert hat; Boxen werden über ihren Inhalt identifiziert
+             (kleinste rect_id), nicht über ihren Index.
+    """
+    if old.L != new.L or old.rect_count != new.rect_count:
+        raise ValueError("Lösungsdateien gehören zu verschiedenen Probleminstanzen")
+    if old.rectangle_records != new.rectangle_records:
+        raise ValueError("Lösungsdateien gehören zu verschiedenen Probleminstanzen")
+    return [(rid, a, b) for rid, (a, b) in enumerate(zip(old.placements_by_rect(), new.placements_by_rect()))
+            if a != b]
+
+
+def _as_array(values):
+    if isinstance(values, array) and values.typecode == 'i':
+        return values
+    return array('i', values.tolist() if hasattr(values, "tolist") else values)
@@ -0,0 +1,238 @@
+"""
+Shelf-Packing mit persistentem Regal-Zustand pro Box.
+
+Das Shelf-Verfahren legt Rechtecke nur rechts an das oberste Regal an oder
+eröffnet darüber ein neues. Dafür genügt der Zustand des obersten Regals
+(y, Höhe, belegte Breite); statt ihn bei jedem Einfügen aus dem sortierten
+Box-Inhalt neu aufzubauen, wird er an der Box gecacht und von Box.append
+fortgeschrieben. Ein Einfügen kostet damit O(1).
+
+ShelfDecoder packt ganze Permutationen ohne Box-Objekte in flache int-Arrays
+(für Nachbarschaften, die nur den Zielfunktionswert vieler Kandidaten brauchen).
+"""
+from array import array
+
+
+class ShelfState:
+    """Oberstes Regal einer Box: y (None = leere Box), Höhe und belegte Breite."""
+    __slots__ = ('y', 'height', 'width')
+
+    def __init__(self, y=None, height=0, width=0):
+        self.y = y
+        self.height = height
+        self.width = width
+
+    def __copy__(self):
+        return ShelfState(self.y, self.height, self.width)
+
+    def add_placement(self, placement):
+        """Schreibt den Zustand für eine neue Platzierung (Rectangle,(x,y),rotated) fort."""
+        r, (_, ry), rot = placement
+        w = r.width if not rot else r.height
+        h = r.height if not rot else r.width
+        if self.y is None or ry > self.y:
+            self.y = ry
+            self.height = h
+            self.width = w
+        elif ry == self.y:
+            self.width += w
+            self.height = max(self.height, h)
+
+
+def shelf_state(box_content):
+    """
+    ShelfState zum Inhalt einer Box. Für Box-Objekte wird er an der Box gecacht
+    (append hält ihn aktuell, alle anderen Änderungen verwerfen ihn).
+    """
+    state = getattr(box_content, 'shelf_state', None)
+    if state is not None:
+        return state
+    state = ShelfState()
+    for placement in box_content:
+        state.add_placement(placement)
+    if hasattr(box_content, 'shelf_state'):
+        box_content.shelf_state = state
+    return state
+
+
+def shelf_placement(rect, box_content, L):
+    """
+    Shelf-Platzierung für rect in box_content, ohne die Box zu verändern:
+    erst rechts im obersten Regal (normal, dann rotiert), sonst in einem neuen Regal
+    darüber. Gibt (rect, (x,y), rotated) zurück oder None.
+    """
+    state = shelf_state(box_content)
+    w, h = rect.width, rect.height
+    if state.y is None:
+        # leere Box
+        if w <= L and h <= L:
+            return (rect, (0, 0), False)
+        return None
+
+    # versuche im obersten Regal
+    if state.width + w <= L and state.y + max(state.height, h) <= L:
+        return (rect, (state.width, state.y), False)
+    if state.width + h <= L and state.y + max(state.height, w) <= L:
+        return (rect, (state.width, state.y), True)
+    # neues Regal
+    new_y = state.y + state.height
+    if new_y >= L:
+        return None
+    if w <= L and new_y + h <= L:
+        return (rect, (0, new_y), False)
+    if h <= L and new_y + w <= L:
+        return (rect, (0, new_y), True)
+    return None
+
+
+def shelf_insert(rect, box_content, L):
+    """Platziert rect per Shelf-Verfahren direkt in box_content; False, falls es nicht passt."""
+    placement = shelf_placement(rect, box_content, L)
+    if placement is None:
+        return False
+    box_content.append(placement)
+    return True
+
+
+class ShelfDecoder:
+    """
+    Dekodier-Kern für Permutationen von Rechteck-Indizes (Shelf-Verfahren, First-Fit
+    über die Boxen wie place_rectangle_shelf), ohne Box- oder Tupel-Objekte zu bauen.
+    Pro Box werden nur y, Höhe und belegte Breite des obersten Regals in int-Arrays
+    gehalten, pro Position Box, x, y und Rotation. Shelf-Packungen sind per
+    Konstruktion überlappungsfrei und innerhalb der Box, der Zielfunktionswert ist
+    daher box_count * BOX_COST. Erst materialize() baut die Boxen.
+    """
+
+    def __init__(self, rectangles, L):
+        self.rectangles = rectangles
+        self.L = L
+        self.widths = array('i', (r.width for r in rectangles))
+        self.heights = array('i', (r.height for r in rectangles))
+        self._index = {id(r): i for i, r in enumerate(rectangles)}
+
+    def indices(self, rects):
+        """Permutation als array('i') von Indizes in self.rectangles."""
+        index = self._index
+        return array('i', (index[id(r)] for r in rects))
+
+    def decode(self, order, checkpoint_interval, parent=None, first_changed=0):
+        """
+        Packt order (array('i') von Rechteck-Indizes). Mit parent (DecodedPacking mit
+        gleicher Reihenfolge bis first_changed) wird ab dessen letztem Checkpoint davor
+        fortgesetzt. Alle checkpoint_interval Positionen wird der Regal-Zustand gesichert.
+        """
+        L = self.L
+        widths = self.widths
+        heights = self.heights
+        interval = checkpoint_interval
+        start = 0
+        if parent is not None and parent.interval == interval:
+            k = min(first_changed // interval, len(parent.checkpoints) - 1)
+            start = k*interval
+            box_of = parent.box_of[:start]
+            xs = parent.x[:start]
+            ys = parent.y[:start]
+            rotated = parent.rotated[:start]
+            shelf_y, shelf_h, shelf_w = (column[:] for column in parent.checkpoints[k])
+            # Checkpoints des gemeinsamen Prefix teilen (werden nie verändert)
+            checkpoints = parent.checkpoints[:k + 1]
+        else:
+            box_of, xs, ys, rotated = array('i'), array('i'), array('i'), array('b')
+            shelf_y, shelf_h, shelf_w = array('i'), array('i'), array('i')
+            checkpoints = [(array('i'), array('i'), array('i'))]
+
+        for pos in range(start, len(order)):
+            if pos % interval == 0 and pos != start:
+                checkpoints.append((shelf_y[:], shelf_h[:], shelf_w[:]))
+            i = order[pos]
+            w = widths[i]
+            h = heights[i]
+            b = 0
+            box_count = len(shelf_y)
+            created = False
+            while True:
+                if b == box_count:
+                    # neue (leere) Box: Regal (0, 0, 0) verhält sich wie eine leere Box
+                    shelf_y.append(0)
+                    shelf_h.append(0)
+                    shelf_w.append(0)
+                    box_count += 1
+                    created = True
+                sy = shelf_y[b]
+                sh = shelf_h[b]
+                sw = shelf_w[b]
+                # versuche im obersten Regal
+                if sw + w <= L and sy + (sh if sh > h else h) <= L:
+                    place = (sw, sy, 0)
+                    shelf_w[b] = sw + w
+                    shelf_h[b] = sh if sh > h else h
+                elif sw + h <= L and sy + (sh if sh > w else w) <= L:
+                    place = (sw, sy, 1)
+                    shelf_w[b] = sw + h
+                    shelf_h[b] = sh if sh > w else w
+                elif sy + sh < L and w <= L and sy + sh + h <= L:
+                    place = (0, sy + sh, 0)
+                    shelf_y[b] = sy + sh
+                    shelf_h[b] = h
+                    shelf_w[b] = w
+                elif sy + sh < L and h <= L and sy + sh + w <= L:
+                    place = (0, sy + sh, 1)
+                    shelf_y[b] = sy + sh
+                    shelf_h[b] = w
+                    shelf_w[b] = h
+                elif created:
+                    # passt nicht einmal in eine leere Box: die Box bleibt leer
+                    place = None
+                else:
+                    b += 1
+                    continue
+                break
+            if place is None:
+                box_of.append(-1)
+                place = (0, 0, 0)
+            else:
+                box_of.append(b)
+            xs.append(place[0])
+            ys.append(place[1])
+            rotated.append(place[2])
+
+        return DecodedPacking(order, box_of, xs, ys, rotated, (shelf_y, shelf_h, shelf_w),
+                              interval, checkpoints)
+
+    def materialize(self, decoded, box_cls, penalty_free=True):
+        """
+        Baut die Boxen (box_cls, z.B. Box) einer dekodierten Packung in Einfüge-Reihenfolge.
+        Regal-Zustand und (Null-)Strafe werden direkt gesetzt.
+        """
+        rects = self.rectangles
+        shelf_y, shelf_h, shelf_w = decoded.shelves
+        boxes = [box_cls() for _ in range(decoded.box_count)]
+        for i, b, x, y, rot in zip(decoded.order, decoded.box_of, decoded.x, decoded.y, decoded.rotated):
+            if b >= 0:
+                list.append(boxes[b], (rects[i], (x, y), bool(rot)))
+        for b, box_content in enumerate(boxes):
+            if len(box_content):
+                box_content.shelf_state = ShelfState(shelf_y[b], shelf_h[b], shelf_w[b])
+            if penalty_free:
+                box_content.cached_penalty = (self.L, 0)
+        return boxes
+
+
+class DecodedPacking:
+    """Ergebnis von ShelfDecoder.decode: flache Spalten pro Position plus Regal-Zustände."""
+    __slots__ = ('order', 'box_of', 'x', 'y', 'rotated', 'shelves', 'interval', 'checkpoints')
+
+    def __init__(self, order, box_of, x, y, rotated, shelves, interval, checkpoints):
+        self.order = order
+        self.box_of = box_of
+        self.x = x
+        self.y = y
+        self.rotated = rotated
+        self.shelves = shelves
+        self.interval = interval
+        self.checkpoints = checkpoints
+
+    @property
+    def box_count(self):
+        return len(self.shelves[0])
@@ -0,0 +1,110 @@
+"""
+Räumlicher Index für den Inhalt einer Box (uniformes Gitter über das LxL-Quadrat).
+
+Overlap-Tests gegen eine Box mit k Rechtecken kosten linear O(k); mit dem Gitter
+werden nur die Rechtecke in den Zellen geprüft, die das Anfrage-Rechteck schneidet.
+Für kleine Boxen ist der lineare Scan schneller, daher nutzen die Aufrufer den
+Index erst ab INDEX_MIN_ITEMS Rechtecken (siehe uses_index).
+"""
+
+# Ab so vielen Rechtecken pro Box lohnt sich der Index
+INDEX_MIN_ITEMS = 32
+
+
+class GridIndex:
+    """
+    Uniformes Gitter mit Zellgröße cell_size; jede Zelle kennt die Schlüssel der
+    Rechtecke, die sie berühren. Koordinaten außerhalb [0, L) landen in den Randzellen.
+    Überlappung ist wie in evaluate_solution offen disjunkt (Anstoßen ist erlaubt).
+    """
+
+    def __init__(self, L, cell_size=None):
+        self.L = L
+        self.cell_size = cell_size if cell_size else max(1, L // 8)
+        self._cells_per_axis = max(1, -(-L // self.cell_size))
+        self._cells = {}    # (cx, cy) -> list of keys
+        self._entries = {}  # key -> (x, y, w, h)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def insert(self, key, x, y, w, h):
+        self._entries[key] = (x, y, w, h)
+        for cell in self._cells_for(x, y, w, h):
+            self._cells.setdefault(cell, []).append(key)
+
+    def insert_placement(self, placement):
+        """Fügt (Rectangle,(x,y),rotated) ein; der Schlüssel ist das Tupel selbst."""
+        r, (x, y), rot = placement
+        w = r.width if not rot else r.height
+        h = r.height if not rot else r.width
+        self.insert(placement, x, y, w, h)
+
+    def remove(self, key):
+        x, y, w, h = self._entries.pop(key)
+        for cell in self._cells_for(x, y, w, h):
+            keys = self._cells[cell]
+            keys.remove(key)
+            if not keys:
+                del self._cells[cell]
+
+    def query(self, x, y, w, h):
+        """Alle Schlüssel, deren Rechteck (x,y,w,h) im Inneren schneidet."""
+        found = []
+        seen = set()
+        for cell in self._cells_for(x, y, w, h):
+            for key in self._cells.get(cell, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if self._overlaps(key, x, y, w, h):
+                    found.append(key)
+        return found
+
+    def overlaps_any(self, x, y, w, h, exclude=None):
+        """True, falls (x,y,w,h) irgendein Rechteck außer exclude schneidet."""
+        for cell in self._cells_for(x, y, w, h):
+            for key in self._cells.get(cell, ()):
+                if key != exclude and self._overlaps(key, x, y, w, h):
+                    return True
+        return False
+
+    def _overlaps(self, key, x, y, w, h):
+        rx, ry, rw, rh = self._entries[key]
+        return not (x + w <= rx or rx + rw <= x or y + h <= ry or ry + rh <= y)
+
+    def _cells_for(self, x, y, w, h):
+        cs = self.cell_size
+        last = self._cells_per_axis - 1
+        # Die rechte/obere Kante ist offen: letzte Zelle ist ceil((x+w)/cs) - 1,
+        # bei ganzzahligen Koordinaten also (x+w-1)//cs
+        x0 = min(max(int(x // cs), 0), last)
+        x1 = min(max(int(-(-(x + w) // cs)) - 1, x0), last)
+        y0 = min(max(int(y // cs), 0), last)
+        y1 = min(max(int(-(-(y + h) // cs)) - 1, y0), last)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+
+def uses_index(box_content):
+    """
+    Lohnt sich der Index für diese Box? Nur Box-Objekte können ihn cachen; für
+    einfache Listen würde er bei jedem Aufruf neu gebaut, dort bleibt es beim linearen Scan.
+    """
+    return hasattr(box_content, 'spatial_index') and len(box_content) >= INDEX_MIN_ITEMS
+
+
+def box_index(box_content, L):
+    """
+    GridIndex zum Inhalt einer Box. Für Box-Objekte wird er an der Box gecacht
+    (append hält ihn aktuell, alle anderen Änderungen verwerfen ihn); für einfache
+    Listen wird er jedes Mal neu gebaut (siehe uses_index).
+    """
+    index = getattr(box_content, 'spatial_index', None)
+    if index is not None and index.L == L:
+        return index
+    index = GridIndex(L)
+    for placement in box_content:
+        index.insert_placement(placement)
+    if hasattr(box_content, 'spatial_index'):
+        box_content.spatial_index = index
+    return index
@@ -0,0 +1,55 @@
+"""
+Reihenfolgeunabhängiger Hash für Lösungen (Zobrist-Prinzip, additiv statt XOR).
+
+Jede Platzierung (Breite, Höhe, x, y, Rotation) erhält einen 64-Bit-Schlüssel,
+der Hash einer Box ist die Summe ihrer Schlüssel (mod 2^64) und wird an der Box
+gecacht (Box.append addiert den neuen Schlüssel, jede andere Änderung verwirft
+ihn). Der Hash einer Lösung ist die Summe der durchmischten Box-Hashes, hängt also
+weder von der Reihenfolge der Rechtecke in einer Box noch von der Reihenfolge der
+Boxen ab. Die Summe (statt XOR) sorgt dafür, dass doppelte Platzierungen sich nicht
+gegenseitig aufheben. Rechtecke gleicher Maße sind austauschbar: Lösungen, die sich
+nur darin unterscheiden, haben denselben Hash - und denselben Zielfunktionswert.
+
+Nach einer Änderung einzelner Boxen lässt sich der Lösungs-Hash inkrementell
+fortschreiben: h - mix(alte Box) + mix(neue Box) (siehe Move.result_hash).
+"""
+MASK = (1 << 64) - 1
+
+
+def mix(value):
+    """splitmix64-Finalizer."""
+    z = (value + 0x9E3779B97F4A7C15) & MASK
+    z = ((z ^ (z >> 30))*0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27))*0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+def placement_key(placement):
+    r, (x, y), rotated = placement
+    return mix(hash((r.width, r.height, x, y, bool(rotated))) & MASK)
+
+
+def box_hash(box_content):
+    """Hash einer Box; für Box-Objekte bis zur nächsten Änderung gecacht."""
+    cached = getattr(box_content, '_zobrist', None)
+    if cached is not None:
+        return cached
+    value = 0
+    for placement in box_content:
+        value += placement_key(placement)
+    value &= MASK
+    if hasattr(box_content, '_zobrist'):
+        box_content._zobrist = value
+    return value
+
+
+def box_contribution(box_content):
+    """Beitrag einer Box zum Lösungs-Hash."""
+    return mix(box_hash(box_content))
+
+
+def solution_hash(solution):
+    value = 0
+    for box_content in solution.boxes:
+        value += mix(box_hash(box_content))
+    return value & MASK
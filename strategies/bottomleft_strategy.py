@@ -1,3 +1,9 @@
+from collections import deque
+
+from problem.rectangle_packing_problem import Box
+from problem.spatial_index import box_index, uses_index
+from .box_summary import BoxSummaries
+from .free_rect_index import FreeRectIndex
 
 class StrategyBottomLeft:
     """
@@ -13,24 +19,131 @@ class StrategyBottomLeft:
     
     Diese Methode ist grundlegend anders als der Guillotine-Ansatz und arbeitet ausschließlich
     nach dem Prinzip der lokal bestmöglichen Platzierung.
+
+    Mit mode="skyline" wird statt der Kandidatenpunkte pro Box eine Skyline
+    (Liste von Segmenten (x, y, breite)) in solution.skyline_data[box_idx] gepflegt.
+    Die tiefste (dann linkeste) Position wird in O(Segmente) gefunden. Lücken, die dabei
+    unter einem Rechteck eingeschlossen werden, landen als Freiflächen in
+    solution.skyline_waste (FreeRectIndex über alle Boxen) und werden vor der
+    Skyline per Best-Fit aufgefüllt; ohne diese "Waste-Map" braucht der Skyline-Modus
+    deutlich mehr Boxen als der Fill-Modus (L=50, Seiten 1-25: 215 statt 202 Boxen bei
+    3000 Rechtecken). Mit ihr liegt er im Mittel etwa 0.5% über dem Fill-Modus
+    (203 statt 202), ist aber um ein Vielfaches schneller; er bleibt daher opt-in.
+
+    Pro Box wird eine BoxSummary (freie Fläche, maximale Breite/Höhe, geschlossen)
+    in solution.bottomleft_data gepflegt; aussichtslose Boxen werden so ohne
+    Geometrieprüfung übersprungen und volle Boxen gar nicht mehr besucht.
     """
+    def __init__(self, mode="fill"):
+        """
+        :param mode: "fill" (Kandidatenpunkte, Standard) oder "skyline".
+        """
+        if mode not in ("fill", "skyline"):
+            raise ValueError(f"Unbekannter Modus: {mode}")
+        self.mode = mode
+
     def get_ordered_rectangles(self, rectangles):
         # Sortierung absteigend nach Fläche (du kannst auch andere Kriterien wählen)
         return sorted(rectangles, key=lambda r: r.width * r.height, reverse=True)
     
     def place_rectangle_in_solution(self, rect, solution, problem):
-        # Versuche in allen existierenden Boxen das Rechteck zu platzieren
-        for box in solution.boxes:
-            pos, rotated = self._find_position_for_rect(rect, box, problem.L)
+        L = problem.L
+        summaries = self._box_summaries(solution, problem)
+        if self.mode == "skyline" and self._place_in_waste(rect, solution, summaries):
+            return solution
+        # Versuche in allen offenen Boxen das Rechteck zu platzieren; Boxen, deren
+        # Restkapazität (Fläche, maximale Breite/Höhe) nicht reicht, werden in O(1) übersprungen
+        for b_idx in summaries.open_boxes:
+            if not summaries.summaries[b_idx].may_fit(rect.width, rect.height):
+                continue
+            if self.mode == "skyline":
+                skyline = self._skyline(solution, b_idx, L)
+                pos, rotated = self._find_skyline_position(rect, skyline, L)
+            else:
+                pos, rotated = self._find_position_for_rect(rect, solution.boxes[b_idx], L)
             if pos is not None:
-                box.append((rect, pos, rotated))
+                solution.writable_box(b_idx).append((rect, pos, rotated))
+                self._record_placement(solution, summaries, b_idx, rect, pos, rotated, L)
                 return solution
         # Falls in keiner Box Platz ist: Neue Box anlegen
-        new_box = []
+        new_box = Box()
         new_box.append((rect, (0, 0), False))  # Da r.width, r.height ≤ L ist, passt es immer
         solution.boxes.append(new_box)
+        b_idx = len(solution.boxes) - 1
+        summaries.add_box(0)
+        if self.mode == "skyline":
+            if not hasattr(solution, 'skyline_data'):
+                solution.skyline_data = {}  # dict: box_idx -> list of [x, y, width]
+            solution.skyline_data[b_idx] = [[0, 0, L]]
+        self._record_placement(solution, summaries, b_idx, rect, (0, 0), False, L)
         return solution
-    
+
+    def _box_summaries(self, solution, problem):
+        """
+        BoxSummaries der Lösung (solution.bottomleft_data); Boxen, die ohne diese
+        Strategie entstanden sind, werden anhand ihres Inhalts nachgetragen.
+        """
+        summaries = getattr(solution, 'bottomleft_data', None)
+        if summaries is None or summaries.L != problem.L:
+            min_area = min((r.width*r.height for r in problem.rectangles), default=0)
+            summaries = BoxSummaries(problem.L, min_area)
+            solution.bottomleft_data = summaries
+        while summaries.box_count < len(solution.boxes):
+            box = solution.boxes[summaries.box_count]
+            used_area = box.used_area() if isinstance(box, Box) else sum(r.width*r.height for (r, _, _) in box)
+            summaries.add_box(used_area)
+        return summaries
+
+    def _record_placement(self, solution, summaries, b_idx, rect, pos, rotated, L):
+        """Schreibt Skyline (im Skyline-Modus) und Box-Kennzahlen nach einer Platzierung fort."""
+        if self.mode != "skyline":
+            max_w, max_h = self._fill_limits(solution.boxes[b_idx], L)
+            summaries.placed(b_idx, rect.width*rect.height, max_w, max_h)
+            return
+        w = rect.width if not rotated else rect.height
+        h = rect.height if not rotated else rect.width
+        skyline = solution.skyline_data[b_idx]
+        waste = self._waste_index(solution)
+        for free_rect in self._covered_gaps(skyline, pos[0], pos[1], w):
+            waste.add(b_idx, free_rect)
+        self._add_to_skyline(skyline, pos[0], pos[1] + h, w)
+        max_w, max_h = self._skyline_limits(skyline, L)
+        summaries.placed(b_idx, rect.width*rect.height, max_w, max_h)
+
+    def _fill_limits(self, box, L):
+        """
+        Obere Schranken für ein noch platzierbares Rechteck im Fill-Modus:
+        Breite = längster freier Abschnitt einer Zeile, Höhe = längster freier
+        Abschnitt einer Spalte. Zwischen zwei Rechteckkanten ändern sich die freien
+        Abschnitte nicht, daher genügt ein Durchgang pro Streifen.
+        """
+        placed = []
+        for (r, (rx, ry), rot) in box:
+            w = r.width if not rot else r.height
+            h = r.height if not rot else r.width
+            placed.append((rx, ry, w, h))
+        max_w = self._longest_free_run([(x, x + w, y, y + h) for (x, y, w, h) in placed], L)
+        max_h = self._longest_free_run([(y, y + h, x, x + w) for (x, y, w, h) in placed], L)
+        return max_w, max_h
+
+    def _longest_free_run(self, spans, L):
+        """
+        Längster freier Abschnitt entlang der ersten Achse über alle Streifen der zweiten.
+        spans: Liste von (a0, a1, b0, b1) = belegtes Intervall [a0, a1) im Bereich [b0, b1).
+        """
+        edges = sorted({max(0, min(L, b)) for (_, _, b0, b1) in spans for b in (b0, b1)} | {0, L})
+        longest = 0
+        for b0, b1 in zip(edges, edges[1:]):
+            covered = sorted((a0, a1) for (a0, a1, s0, s1) in spans if s0 < b1 and s1 > b0)
+            pos = 0
+            for a0, a1 in covered:
+                longest = max(longest, a0 - pos)
+                pos = max(pos, a1)
+            longest = max(longest, L - pos)
+            if longest >= L:
+                break
+        return longest
+
     def _find_position_for_rect(self, rect, box, L):
         """
         Sucht in einer Box mittels Bottom-Left-Fill-Strategie eine Platzierung.
@@ -68,6 +181,8 @@ class StrategyBottomLeft:
         if cx + w > L or cy + h > L:
             return False
         # Prüfe auf Überlappungen mit bereits platzierten Rechtecken
+        if uses_index(box):
+            return not box_index(box, L).overlaps_any(cx, cy, w, h)
         for (r, (rx, ry), rot) in box:
             rw = r.width if not rot else r.height
             rh = r.height if not rot else r.width
@@ -86,3 +201,150 @@ class StrategyBottomLeft:
         if y1 >= y2 + h2 or y2 >= y1 + h1:
             return False
         return True
+
+    # --------------------------------------------------------------------------
+    #   Skyline-Modus
+    # --------------------------------------------------------------------------
+
+    def _skyline(self, solution, b_idx, L):
+        if not hasattr(solution, 'skyline_data'):
+            solution.skyline_data = {}  # dict: box_idx -> list of [x, y, width]
+        skyline = solution.skyline_data.get(b_idx)
+        if skyline is None:
+            skyline = self._skyline_from_box(solution.boxes[b_idx], L)
+            solution.skyline_data[b_idx] = skyline
+        return skyline
+
+    def _waste_index(self, solution):
+        """Freiflächen unterhalb der Skylines (solution.skyline_waste), für alle Boxen registriert."""
+        waste = getattr(solution, 'skyline_waste', None)
+        if waste is None:
+            waste = FreeRectIndex()
+            solution.skyline_waste = waste
+        # Boxen, die ohne Skyline entstanden sind, haben keine bekannten Lücken
+        while waste.box_count < len(solution.boxes):
+            waste.add_box()
+        return waste
+
+    def _covered_gaps(self, skyline, x, y, w):
+        """Lücken zwischen Skyline und der Unterkante eines bei (x, y) liegenden Rechtecks der Breite w."""
+        gaps = []
+        for sx, sy, sw in skyline:
+            if sx >= x + w:
+                break
+            left = max(sx, x)
+            right = min(sx + sw, x + w)
+            if right > left and sy < y:
+                gaps.append((left, sy, right - left, y - sy))
+        return gaps
+
+    def _place_in_waste(self, rect, solution, summaries):
+        """
+        Legt rect in die kleinste passende Lücke unterhalb einer Skyline (Best-Fit,
+        Guillotine-Schnitt wie StrategyGuillotine). Gibt False zurück, wenn keine passt.
+        """
+        waste = self._waste_index(solution)
+        best = waste.best_fit(rect.width, rect.height)
+        if best is None:
+            return False
+        b_idx, (fx, fy, fw, fh), rotated = best
+        w = rect.width if not rotated else rect.height
+        h = rect.height if not rotated else rect.width
+        solution.writable_box(b_idx).append((rect, (fx, fy), rotated))
+        waste.remove(b_idx, (fx, fy, fw, fh))
+        if fw > w:
+            waste.add_merged(b_idx, (fx + w, fy, fw - w, fh))
+        if fh > h:
+            waste.add_merged(b_idx, (fx, fy + h, w, fh - h))
+        # Die Skyline bleibt unverändert, nur die freie Fläche der Box sinkt
+        summaries.placed(b_idx, rect.width*rect.height)
+        return True
+
+    def _skyline_limits(self, skyline, L):
+        """
+        Obere Schranken für ein noch platzierbares Rechteck: Höhe = L - tiefstes Segment,
+        Breite = längster zusammenhängender Abschnitt mit Segmenten unterhalb von L.
+        """
+        max_h = L - min(seg[1] for seg in skyline)
+        max_w = 0
+        run = 0
+        for sx, sy, sw in skyline:
+            run = run + sw if sy < L else 0
+            max_w = max(max_w, run)
+        return max_w, max_h
+
+    def _find_skyline_position(self, rect, skyline, L):
+        """
+        Tiefste, dann linkeste Position, an der rect (ggf. rotiert) auf der Skyline liegt.
+        Das Fenster [x, x+w) wird mit zwei Zeigern über die Segmente geschoben, sein
+        Maximum hält eine monotone Deque (Indizes mit fallender Höhe) -> O(Segmente).
+        Gibt ((x, y), rotated) bzw. (None, False) zurück.
+        """
+        best = None
+        n = len(skyline)
+        for rotated, w, h in ((False, rect.width, rect.height), (True, rect.height, rect.width)):
+            if w > L or h > L:
+                continue
+            window = deque()
+            j = 0
+            for i in range(n):
+                x = skyline[i][0]
+                if x + w > L:
+                    break
+                # Segmente links vom Fenster fallen heraus, rechts kommen neue hinzu
+                while window and window[0] < i:
+                    window.popleft()
+                while j < n and skyline[j][0] < x + w:
+                    while window and skyline[window[-1]][1] <= skyline[j][1]:
+                        window.pop()
+                    window.append(j)
+                    j += 1
+                y = skyline[window[0]][1]
+                if y + h <= L and (best is None or (y, x) < best[0]):
+                    best = ((y, x), rotated)
+        if best is None:
+            return None, False
+        (y, x), rotated = best
+        return (x, y), rotated
+
+    def _add_to_skyline(self, skyline, x, top, w):
+        """Setzt die Skyline auf [x, x+w) auf Höhe top und verschmilzt gleich hohe Nachbarn."""
+        new_skyline = []
+        for sx, sy, sw in skyline:
+            # Teile links und rechts von [x, x+w) bleiben erhalten
+            if sx < x:
+                new_skyline.append([sx, sy, min(sw, x - sx)])
+            if sx + sw > x + w:
+                start = max(sx, x + w)
+                new_skyline.append([start, sy, sx + sw - start])
+        new_skyline.append([x, top, w])
+        new_skyline.sort(key=lambda seg: seg[0])
+        merged = []
+        for seg in new_skyline:
+            if merged and merged[-1][1] == seg[1] and merged[-1][0] + merged[-1][2] == seg[0]:
+                merged[-1][2] += seg[2]
+            else:
+                merged.append(seg)
+        skyline[:] = merged
+
+    def _skyline_from_box(self, box, L):
+        """Baut die Skyline einer bereits gefüllten Box (obere Kante je x-Intervall)."""
+        xs = {0, L}
+        for (r, (rx, ry), rot) in box:
+            w = r.width if not rot else r.height
+            xs.add(max(0, min(L, rx)))
+            xs.add(max(0, min(L, rx + w)))
+        xs = sorted(xs)
+        skyline = []
+        for x0, x1 in zip(xs, xs[1:]):
+            top = 0
+            for (r, (rx, ry), rot) in box:
+                w = r.width if not rot else r.height
+                h = r.height if not rot else r.width
+                if rx < x1 and rx + w > x0:
+                    top = max(top, ry + h)
+            if skyline and skyline[-1][1] == top:
+                skyline[-1][2] += x1 - x0
+            else:
+                skyline.append([x0, top, x1 - x0])
+        return skyline
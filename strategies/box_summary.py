@@ -0,0 +1,61 @@
+class BoxSummary:
+    """
+    Günstige Kennzahlen einer Box, mit denen aussichtslose Boxen in O(1)
+    verworfen werden, bevor irgendeine Geometrie gerechnet wird:
+      - free_area: freie Fläche (L² - belegte Fläche)
+      - max_w, max_h: obere Schranken für Breite/Höhe eines noch platzierbaren Rechtecks
+      - closed: die Box kann kein Rechteck der Instanz mehr aufnehmen
+    """
+    __slots__ = ('free_area', 'max_w', 'max_h', 'closed')
+
+    def __init__(self, free_area, max_w, max_h):
+        self.free_area = free_area
+        self.max_w = max_w
+        self.max_h = max_h
+        self.closed = False
+
+    def may_fit(self, w, h):
+        if self.closed or w*h > self.free_area:
+            return False
+        return (w <= self.max_w and h <= self.max_h) or (h <= self.max_w and w <= self.max_h)
+
+
+class BoxSummaries:
+    """
+    BoxSummary für jede Box einer Lösung plus die Liste der noch offenen Boxen
+    (aufsteigend nach Index, damit First-Fit-Reihenfolge erhalten bleibt).
+    """
+
+    def __init__(self, L, min_area):
+        self.L = L
+        self.min_area = min_area  # kleinste Rechteckfläche der Instanz
+        self.summaries = []
+        self.open_boxes = []
+
+    @property
+    def box_count(self):
+        return len(self.summaries)
+
+    def add_box(self, used_area):
+        summary = BoxSummary(self.L*self.L - used_area, self.L, self.L)
+        self.summaries.append(summary)
+        self.open_boxes.append(len(self.summaries) - 1)
+        self._check_closed(len(self.summaries) - 1)
+        return summary
+
+    def placed(self, box_idx, area, max_w=None, max_h=None):
+        """Trägt eine Platzierung ein; optional neue Maß-Schranken (z.B. aus der Skyline)."""
+        summary = self.summaries[box_idx]
+        summary.free_area -= area
+        if max_w is not None:
+            summary.max_w = max_w
+            summary.max_h = max_h
+        self._check_closed(box_idx)
+
+    def _check_closed(self, box_idx):
+        summary = self.summaries[box_idx]
+        if summary.closed:
+            return
+        if summary.free_area < self.min_area or summary.max_w == 0 or summary.max_h == 0:
+            summary.closed = True
+            self.open_boxes.remove(box_idx)
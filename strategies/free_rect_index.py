@@ -0,0 +1,163 @@
+from bisect import bisect_left, insort
+from heapq import heappop, heappush
+
+class FreeRectIndex:
+    """
+    Index über die freien Rechtecke ALLER Boxen für das Guillotine-Verfahren.
+
+    - Freiflächen liegen in Eimern je Maß (w, h); jeder Eimer ist ein Heap über
+      (box_idx, seq), gelöschte Einträge werden erst beim Auslesen verworfen.
+      Zu jeder Breite gibt es die sortierte Liste der vorkommenden Höhen, die größte
+      steht am Ende. best_fit sucht pro Breite >= w die kleinste Höhe >= h per
+      Bisektion, Kosten O(verschiedene Breiten · log) statt O(Freiflächen).
+      Bei gleicher Fläche gewinnt die kleinere Box, dann die früher angelegte
+      Freifläche (wie der lineare Scan über alle Boxen).
+    - Pro Box werden die Freiflächen zusätzlich in einem Dict gehalten (Duplikate
+      werden beim Einfügen verworfen) und ihre Kanten in einer Kanten-Map, über die
+      add_merged Nachbarn mit gemeinsamer Kante per Dict-Zugriff findet.
+    """
+
+    def __init__(self):
+        self._buckets = {}   # (w, h) -> Heap [(box_idx, seq, x, y)]
+        self._heights = {}   # w -> sortierte Liste der Höhen mit nicht leerem Eimer
+        self._widths = []    # sortierte Liste der Breiten mit nicht leeren Eimern
+        self._live = {}      # (w, h) -> Anzahl gültiger Einträge im Eimer
+        self._by_box = []    # box_idx -> dict (x, y, w, h) -> seq
+        self._edges = []     # box_idx -> dict Kante -> (x, y, w, h)
+        self._seq = 0
+
+    @property
+    def box_count(self):
+        return len(self._by_box)
+
+    def add_box(self, L=None):
+        """
+        Registriert eine neue (leere) Box mit der Freifläche (0,0,L,L);
+        ohne L startet die Box ganz ohne Freiflächen.
+        """
+        self._by_box.append({})
+        self._edges.append({})
+        box_idx = len(self._by_box) - 1
+        if L is not None:
+            self.add(box_idx, (0, 0, L, L))
+        return box_idx
+
+    def free_rects(self, box_idx):
+        return list(self._by_box[box_idx])
+
+    def add(self, box_idx, free_rect):
+        box_free = self._by_box[box_idx]
+        if free_rect in box_free:
+            return
+        x, y, w, h = free_rect
+        box_free[free_rect] = self._seq
+        edges = self._edges[box_idx]
+        for edge in self._edge_keys(free_rect):
+            edges[edge] = free_rect
+        size = (w, h)
+        bucket = self._buckets.get(size)
+        if bucket is None:
+            bucket = self._buckets[size] = []
+        heappush(bucket, (box_idx, self._seq, x, y))
+        live = self._live.get(size, 0)
+        self._live[size] = live + 1
+        if live == 0:
+            heights = self._heights.get(w)
+            if heights is None:
+                heights = self._heights[w] = []
+                insort(self._widths, w)
+            insort(heights, h)
+        self._seq += 1
+
+    def remove(self, box_idx, free_rect):
+        self._by_box[box_idx].pop(free_rect)
+        edges = self._edges[box_idx]
+        for edge in self._edge_keys(free_rect):
+            if edges.get(edge) == free_rect:
+                del edges[edge]
+        x, y, w, h = free_rect
+        size = (w, h)
+        # Der Heap-Eintrag bleibt liegen und wird in _bucket_top verworfen
+        self._live[size] -= 1
+        if self._live[size] == 0:
+            del self._live[size]
+            del self._buckets[size]
+            heights = self._heights[w]
+            del heights[bisect_left(heights, h)]
+            if not heights:
+                del self._heights[w]
+                del self._widths[bisect_left(self._widths, w)]
+
+    def best_fit(self, w, h):
+        """
+        Kleinste Freifläche (über alle Boxen), in die w x h passt, ggf. rotiert.
+        Gibt (box_idx, (x, y, fw, fh), rotated) oder None zurück.
+        """
+        best = None
+        for rotated, need_w, need_h in ((False, w, h), (True, h, w)):
+            candidate = self._smallest(need_w, need_h)
+            # Bei derselben Freifläche hat die unrotierte Lage Vorrang
+            if candidate is not None and (best is None or candidate[0] < best[0][0]):
+                best = (candidate, rotated)
+        if best is None:
+            return None
+        (_, box_idx, _, fx, fy, fw, fh), rotated = best
+        return box_idx, (fx, fy, fw, fh), rotated
+
+    def add_merged(self, box_idx, free_rect):
+        """
+        Fügt free_rect ein und verschmilzt es so lange mit Freiflächen derselben Box,
+        mit denen es eine komplette Kante teilt.
+        """
+        x, y, w, h = free_rect
+        edges = self._edges[box_idx]
+        while True:
+            below = edges.get(('top', x, w, y))
+            above = edges.get(('bottom', x, w, y + h))
+            left = edges.get(('right', y, h, x))
+            right = edges.get(('left', y, h, x + w))
+            if below is not None:
+                self.remove(box_idx, below)
+                y, h = below[1], h + below[3]
+            elif above is not None:
+                self.remove(box_idx, above)
+                h = h + above[3]
+            elif left is not None:
+                self.remove(box_idx, left)
+                x, w = left[0], w + left[2]
+            elif right is not None:
+                self.remove(box_idx, right)
+                w = w + right[2]
+            else:
+                break
+        self.add(box_idx, (x, y, w, h))
+
+    def _smallest(self, w, h):
+        """Kleinste Freifläche mit Breite >= w und Höhe >= h als (Schlüssel, box_idx, seq, x, y, fw, fh)."""
+        best = None
+        for fw in self._widths[bisect_left(self._widths, w):]:
+            heights = self._heights[fw]
+            if heights[-1] < h:
+                continue
+            # Bei fester Breite ist die kleinste ausreichende Höhe auch die kleinste Fläche
+            fh = heights[bisect_left(heights, h)]
+            box_idx, seq, fx, fy = self._bucket_top(fw, fh)
+            key = (fw*fh, box_idx, seq)
+            if best is None or key < best[0]:
+                best = (key, box_idx, seq, fx, fy, fw, fh)
+        return best
+
+    def _bucket_top(self, w, h):
+        """Gültiger Eintrag mit kleinstem (box_idx, seq) im Eimer (w, h)."""
+        bucket = self._buckets[(w, h)]
+        while True:
+            box_idx, seq, x, y = bucket[0]
+            if self._by_box[box_idx].get((x, y, w, h)) == seq:
+                return bucket[0]
+            heappop(bucket)
+
+    @staticmethod
+    def _edge_keys(free_rect):
+        x, y, w, h = free_rect
+        return (('bottom', x, w, y), ('top', x, w, y + h),
+                ('left', y, h, x), ('right', y, h, x + w))
@@ -0,0 +1,100 @@
+"""
+Tests für die unteren Schranken (problem.bounds) und das Abbruchkriterium
+stop_at_bound der lokalen Suche. Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_bounds.py
+"""
+import random
+
+import pytest
+
+from problem.bounds import continuous_bound, large_item_bound, lower_bound
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Rectangle, Box
+from algorithms.greedy import greedy
+from algorithms.local_search import local_search
+from strategies.bottomleft_strategy import StrategyBottomLeft
+from strategies.guillotine_strategy import StrategyGuillotine
+
+
+def test_bounds_on_small_examples():
+    L = 10
+    assert lower_bound(L, []) == 0
+    # Fläche reicht für 2 Boxen, aber keine zwei 6x6 passen zusammen in eine
+    rects = [Rectangle(6, 6) for _ in range(3)] + [Rectangle(4, 4) for _ in range(3)]
+    assert continuous_bound(L, rects) == 2
+    assert large_item_bound(L, rects) == 3
+    # Neben einem 6x6 ist kein Streifen breit genug für ein 5x5
+    rects = [Rectangle(6, 6) for _ in range(3)] + [Rectangle(5, 5) for _ in range(4)]
+    assert large_item_bound(L, rects) == 4
+    assert lower_bound(L, rects) == 4
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_lower_bound_below_feasible_greedy(seed):
+    rng = random.Random(seed)
+    L = rng.randint(5, 30)
+    low = rng.choice([1, L // 3, L // 2]) or 1
+    random.seed(seed)
+    rects = generate_instances(1, rng.randint(1, 40), low, L, low, L, L)[0]
+    problem = RectanglePackingProblem(L, rects)
+    bound = problem.box_lower_bound()
+    assert problem.objective_lower_bound() == bound*problem.BOX_COST
+    for strategy in (StrategyGuillotine(), StrategyBottomLeft(), StrategyBottomLeft(mode="skyline")):
+        solution = greedy(problem, strategy)
+        assert problem.solution_penalty(solution) == 0
+        assert len(solution.boxes) >= bound
+
+
+class _LooseBoundProblem(RectanglePackingProblem):
+    """Schranke über jedem erreichbaren Wert: stop_at_bound greift, sobald es darf."""
+
+    def objective_lower_bound(self):
+        return 10**12
+
+
+class _CountingGenerator:
+    """Nachbarschaft ohne Nachbarn, zählt nur, wie oft local_search sie fragt."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_neighbors(self, problem, solution):
+        self.calls += 1
+        return []
+
+    def get_neighbors_subset(self, problem, solution, sample_size):
+        return self.get_neighbors(problem, solution)
+
+
+def _search(problem, start, **kwargs):
+    """Anzahl Nachbarschaftsabfragen: 0 = vor der ersten Iteration an der Schranke beendet."""
+    generator = _CountingGenerator()
+    local_search(problem, start, generator, max_iter=5, max_time=10.0, **kwargs)
+    return generator.calls
+
+
+def _overlapping_start(problem):
+    start = problem.create_empty_solution()
+    start.boxes.append(Box([(r, (0, 0), False) for r in problem.rectangles]))
+    return start
+
+
+def test_stop_at_bound_requires_feasible_incumbent():
+    random.seed(0)
+    rects = generate_instances(1, 6, 1, 4, 1, 4, 10)[0]
+    problem = _LooseBoundProblem(10, rects)
+    feasible = greedy(problem, StrategyGuillotine())
+    assert _search(problem, feasible, stop_at_bound=True) == 0
+    # unzulässig unter der Schranke: weitersuchen
+    start = _overlapping_start(problem)
+    assert problem.solution_penalty(start) > 0
+    assert _search(problem, start, stop_at_bound=True) == 1
+
+
+def test_stop_at_bound_is_off_by_default():
+    random.seed(0)
+    rects = generate_instances(1, 6, 1, 4, 1, 4, 10)[0]
+    problem = _LooseBoundProblem(10, rects)
+    start = _overlapping_start(problem)
+    assert _search(problem, start) == 1
+    assert _search(problem, greedy(problem, StrategyGuillotine())) == 1
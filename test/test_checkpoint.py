@@ -0,0 +1,105 @@
+"""
+Tests für Checkpoints der lokalen Suche (algorithms.checkpoint): Fortsetzen,
+Versionsprüfung und Fehlerbehandlung. Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_checkpoint.py
+"""
+import pickle
+import random
+
+import pytest
+
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
+from algorithms.checkpoint import CHECKPOINT_MAGIC, CHECKPOINT_VERSION, load_checkpoint
+from algorithms.local_search import local_search, resume_local_search
+from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
+
+
+def _problem(compact=False):
+    random.seed(7)
+    rects = generate_instances(1, 30, 1, 8, 1, 8, 20)[0]
+    return RectanglePackingProblem(20, rects, compact=compact)
+
+
+def _neighbor():
+    return GeometryBasedNeighbor(max_shift=3, neighbor_count=3)
+
+
+def _start(problem):
+    start = problem.create_empty_solution()
+    for r in problem.rectangles:
+        start.boxes.append(Box([(r, (0, 0), False)]))
+    return start
+
+
+def _placements(problem, solution):
+    index = {id(r): i for i, r in enumerate(problem.rectangles)}
+    return [[(index[id(r)], pos, bool(rot)) for (r, pos, rot) in box] for box in solution.boxes]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_resume_continues_like_an_uninterrupted_run(tmp_path, compact):
+    problem = _problem(compact)
+    random.seed(1)
+    full = local_search(problem, _start(problem), _neighbor(), max_iter=12, max_time=60.0, partial_sample_size=3)
+
+    path = tmp_path / "search.ckpt"
+    random.seed(1)
+    local_search(problem, _start(problem), _neighbor(), max_iter=5, max_time=60.0, partial_sample_size=3,
+                 checkpoint_path=str(path))
+    checkpoint = load_checkpoint(str(path), problem)
+    assert checkpoint.iteration == 5
+    random.seed(99)  # der Zustand kommt aus dem Checkpoint
+    resumed = resume_local_search(problem, str(path), max_iter=12, max_time=60.0, partial_sample_size=3)
+    assert _placements(problem, resumed) == _placements(problem, full)
+    # der fortgesetzte Lauf schreibt denselben Checkpoint weiter
+    assert load_checkpoint(str(path), problem).iteration > checkpoint.iteration
+
+
+def test_other_instance_is_rejected(tmp_path):
+    problem = _problem()
+    path = tmp_path / "search.ckpt"
+    local_search(problem, _start(problem), _neighbor(), max_iter=1, checkpoint_path=str(path))
+    other = RectanglePackingProblem(problem.L, problem.rectangles[:-1])
+    with pytest.raises(ValueError):
+        load_checkpoint(str(path), other)
+
+
+@pytest.mark.parametrize("content", [
+    b"XXXX" + bytes([CHECKPOINT_VERSION]),                                        # falsche Kennung
+    CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION - 1]),                           # alte Version im Kopf
+    CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + pickle.dumps({"L": 20}),     # Payload ohne Version
+    CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + b"kein pickle",              # beschädigt
+    CHECKPOINT_MAGIC,                                                             # abgeschnitten
+])
+def test_invalid_files_raise_value_error(tmp_path, content):
+    path = tmp_path / "bad.ckpt"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        load_checkpoint(str(path), _problem())
+
+
+class _FailingNeighbor:
+    def get_neighbors(self, problem, solution):
+        raise RuntimeError("Nachbarschaft kaputt")
+
+    def get_neighbors_subset(self, problem, solution, sample_size):
+        return self.get_neighbors(problem, solution)
+
+
+def test_failed_checkpoint_write_does_not_mask_error(tmp_path):
+    problem = _problem()
+    # Verzeichnis existiert nicht: der Checkpoint kann nicht geschrieben werden
+    path = tmp_path / "fehlt" / "search.ckpt"
+    with pytest.raises(RuntimeError, match="Nachbarschaft kaputt"):
+        local_search(problem, _start(problem), _FailingNeighbor(), max_iter=3, checkpoint_path=str(path))
+
+
+def test_checkpoint_written_after_error(tmp_path):
+    problem = _problem()
+    path = tmp_path / "search.ckpt"
+    with pytest.raises(RuntimeError):
+        local_search(problem, _start(problem), _FailingNeighbor(), max_iter=3, checkpoint_path=str(path))
+    checkpoint = load_checkpoint(str(path), problem)
+    assert checkpoint.iteration == 0
+    assert checkpoint.best_value == problem.evaluate_solution(_start(problem))
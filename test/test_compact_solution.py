@@ -0,0 +1,82 @@
+"""
+Tests für CompactRectangleSolution: Konvertierung, Einfrieren/Auftauen, Kopien
+und Pickling. Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_compact_solution.py
+"""
+import pickle
+import random
+
+import pytest
+
+from problem.compact_solution import CompactRectangleSolution
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem
+from algorithms.greedy import greedy
+from strategies.guillotine_strategy import StrategyGuillotine
+
+
+def _placements(solution, rectangles):
+    index = {id(r): i for i, r in enumerate(rectangles)}
+    return [[(index[id(r)], pos, bool(rot)) for (r, pos, rot) in box] for box in solution.boxes]
+
+
+@pytest.fixture
+def instance():
+    random.seed(1)
+    rects = generate_instances(1, 60, 1, 9, 1, 9, 20)[0]
+    return rects, RectanglePackingProblem(20, rects, compact=True)
+
+
+def test_greedy_returns_frozen_solution(instance):
+    rects, problem = instance
+    solution = greedy(problem, StrategyGuillotine())
+    assert isinstance(solution, CompactRectangleSolution)
+    assert solution.is_frozen
+    assert len(solution.rect_id) == len(rects)
+
+
+def test_round_trip_keeps_placements(instance):
+    rects, problem = instance
+    plain = greedy(RectanglePackingProblem(20, rects), StrategyGuillotine())
+    compact = CompactRectangleSolution.from_solution(plain, problem)
+    assert compact.is_frozen
+    assert _placements(compact, rects) == _placements(plain, rects)
+    # Auftauen, Einfrieren und zurück in eine gewöhnliche Lösung
+    compact.freeze()
+    back = compact.to_solution()
+    assert _placements(back, rects) == _placements(plain, rects)
+    assert problem.evaluate_solution(back) == problem.evaluate_solution(plain)
+
+
+@pytest.mark.parametrize("frozen", [True, False])
+def test_copy_does_not_share_changes(instance, frozen):
+    rects, problem = instance
+    solution = greedy(problem, StrategyGuillotine())
+    if not frozen:
+        solution.boxes
+    before = _placements(solution, rects)
+    copied = solution.copy()
+    box = copied.writable_box(0)
+    r, (x, y), rot = box[0]
+    box[0] = (r, (x + 1, y), rot)
+    assert _placements(solution, rects) == before
+    assert _placements(copied, rects) != before
+
+
+@pytest.mark.parametrize("frozen", [True, False])
+def test_pickle_round_trip(instance, frozen):
+    rects, problem = instance
+    solution = greedy(problem, StrategyGuillotine())
+    value = problem.evaluate_solution(solution)
+    if frozen:
+        solution.freeze()
+    solution._rect_id_map()  # id()-Map darf nicht mit gepickelt werden
+    restored = pickle.loads(pickle.dumps(solution))
+    assert restored._rect_ids is None
+    assert restored.is_frozen == frozen
+    assert _placements(restored, restored.rectangles) == _placements(solution, rects)
+    # Die Listen-Sicht verweist auf die mit entpickelten Rechtecke und lässt sich wieder einfrieren
+    restored_problem = RectanglePackingProblem(20, restored.rectangles, compact=True)
+    assert restored_problem.evaluate_solution(restored) == value
+    restored.freeze()
+    assert len(restored.rect_id) == len(rects)
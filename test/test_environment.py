@@ -1,6 +1,32 @@
+"""
+Benchmark-Suite für Greedy-Strategien und Nachbarschaften (mit local_search).
+
+Für jede Instanzgröße n und Boxgröße L werden (mit festem Seed) Instanzen erzeugt
+und alle Varianten gemessen: Wall- und CPU-Zeit, Spitzen-Speicher (tracemalloc,
+in einem separaten Lauf, damit die Zeiten nicht verfälscht werden), Bewertungen
+pro Sekunde, Speicher der Ergebnislösung, Zielfunktionswert und Abstand zur unteren Schranke (problem.bounds;
+die lokale Suche endet vorzeitig, sobald sie die Schranke zulässig erreicht). Die Ergebnisse werden als JSON geschrieben,
+pro Variante wird eine empirische Komplexität O(n^k) geschätzt und optional
+gegen eine gespeicherte Baseline auf Regressionen geprüft.
+
+Aufruf aus dem Projektverzeichnis, z.B.:
+    PYTHONPATH=. python test/test_environment.py --sizes 100 1000 10000 --L 50 200 --output bench.json
+    PYTHONPATH=. python test/test_environment.py --baseline bench.json
+    PYTHONPATH=. python test/test_environment.py --compact   # CompactRectangleSolution
+Der Exit-Code ist 1, wenn gegenüber der Baseline Regressionen gefunden wurden.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
 import time
+import tracemalloc
+from datetime import datetime
+
 from problem.instance_generator import generate_instances
-from problem.rectangle_packing_problem import RectanglePackingProblem
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
 from algorithms.greedy import greedy
 from algorithms.local_search import local_search
 from strategies.guillotine_strategy import StrategyGuillotine
@@ -9,59 +35,301 @@ from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
 from neighbors.rule_based_neighbor import RuleBasedNeighbor
 from neighbors.overlapping_neighbor import OverlappingNeighbor
 
-def run_tests(test_cases):
+DEFAULT_SIZES = (100, 300, 1000, 3000)
+DEFAULT_LS = (50, 200)
+# Relative Verschlechterung, ab der eine Messung als Regression gilt
+REGRESSION_TOLERANCE = 0.25
+# Kürzere Laufzeiten sind zu verrauscht für einen Vergleich (Sekunden)
+MIN_SIGNIFICANT_TIME = 0.05
+
+
+def greedy_strategies():
+    return [
+        ("Guillotine", lambda: StrategyGuillotine(sort_by="area-desc")),
+        ("BottomLeft", lambda: StrategyBottomLeft()),
+        ("BottomLeft-Skyline", lambda: StrategyBottomLeft(mode="skyline")),
+    ]
+
+
+def neighborhoods():
+    return [
+        ("Geometry", lambda: GeometryBasedNeighbor(max_shift=5, neighbor_count=5)),
+        ("Rule", lambda: RuleBasedNeighbor(swaps_per_call=5)),
+        ("Overlap", lambda: OverlappingNeighbor(initial_overlap_ratio=100, decrement=10)),
+    ]
+
+
+class _CountingNeighbor:
     """
-    test_cases: Liste von Tupeln (count, num_rect, min_side1, max_side1, min_side2, max_side2, L).
-    Für jedes Tupel werden Instanzen generiert und anschließend
-    - Greedy (Guillotine und BottomLeft)
-    - LocalSearch (verschiedene Nachbarschaften)
-    angewendet.
+    Reicht alle Aufrufe an den Nachbarschaftsgenerator durch und zählt die
+    Kandidaten, die local_search tatsächlich abruft (= bewertet).
     """
-    results = []
-    for (count, nr, mn1, mx1, mn2, mx2, L) in test_cases:
-        instances = generate_instances(count, nr, mn1, mx1, mn2, mx2, L)
-        for inst_idx, rects in enumerate(instances):
-            problem = RectanglePackingProblem(L, rects)
-
-            # GREEDY: Nur Guillotine und BottomLeft testen
-            greedy_strats = [
-                ("Guillotine", StrategyGuillotine(sort_by="area-desc")),
-                ("BottomLeft", StrategyBottomLeft())
-            ]
-            for (sname, s) in greedy_strats:
-                start_time = time.process_time()
-                sol = greedy(problem, s)
-                end_time = time.process_time()
-                val = problem.evaluate_solution(sol)
-                results.append(("Greedy", sname, nr, L, val, end_time-start_time))
-
-            # Lokale Suche wie bisher
-            neighs = [
-                ("Geometry", GeometryBasedNeighbor(max_shift=5, neighbor_count=5)),
-                ("Rule", RuleBasedNeighbor(swaps_per_call=5)),
-                ("Overlap", OverlappingNeighbor(initial_overlap_ratio=100, decrement=10))
-            ]
-            bad_sol = problem.create_empty_solution()
-            for r in rects:
-                bad_sol.boxes.append([(r, (0,0), False)])
-            for (nname, nobj) in neighs:
-                start_time = time.process_time()
-                best_sol = local_search(problem, bad_sol, nobj, max_iter=100)
-                end_time = time.process_time()
-                val = problem.evaluate_solution(best_sol)
-                results.append(("LocalSearch", nname, nr, L, val, end_time-start_time))
-
-    # Ausgabe
-    print("Alg;Variante;RectCount;L;ObjVal;Time")
-    for r in results:
-        print(";".join(map(str, r)))
-    
-def main():
-    test_cases = [
-        (3, 50, 1, 20, 1, 20, 50),
-        (3, 100, 1, 25, 1, 25, 50)
-    ]
-    run_tests(test_cases)
+
+    _WRAPPED = ('iter_moves', 'get_moves', 'get_moves_subset', 'get_neighbors', 'get_neighbors_subset')
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.evaluations = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if name not in self._WRAPPED:
+            return attr
+
+        def counted(*args, **kwargs):
+            for candidate in attr(*args, **kwargs):
+                self.evaluations += 1
+                yield candidate
+
+        if name == 'iter_moves':
+            return counted
+        return lambda *args, **kwargs: list(counted(*args, **kwargs))
+
+
+def _measure(run, measure_memory):
+    """
+    Führt run() aus und liefert (Ergebnis, Wall-Zeit, CPU-Zeit, Spitzen-Speicher in Byte).
+    run muss deterministisch sein, da für den Speicher ein zweiter Lauf erfolgt.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = run()
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, wall_time, cpu_time, peak_memory
+
+
+def _solution_memory(solution):
+    """
+    Bytes, die die Lösung selbst belegt (ohne Rectangle-Objekte und Strategie-Daten):
+    eingefrorene kompakte Lösungen nur ihre Spalten, sonst Box-Listen und Tupel.
+    """
+    if getattr(solution, 'is_frozen', False):
+        return solution.nbytes()
+    total = sys.getsizeof(solution.boxes)
+    for box_content in solution.boxes:
+        total += sys.getsizeof(box_content)
+        for placement in box_content:
+            total += sys.getsizeof(placement) + sys.getsizeof(placement[1])
+    return total
+
+
+def _record(alg, variant, n, L, wall_time, cpu_time, peak_memory, evaluations, objective, lower_bound,
+            solution_memory=None, penalty=0):
+    return {
+        "alg": alg, "variant": variant, "n": n, "L": L,
+        "wall_time": wall_time, "cpu_time": cpu_time, "peak_memory": peak_memory,
+        "solution_memory": solution_memory,
+        "evaluations": evaluations,
+        "evals_per_sec": evaluations / wall_time if wall_time > 0 else None,
+        "objective": objective,
+        "lower_bound": lower_bound,
+        # unter der Schranke liegen auch unzulässige Lösungen (siehe objective_lower_bound)
+        "optimal": objective <= lower_bound and penalty == 0,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, Ls=DEFAULT_LS, seed=0, max_iter=100, max_time=10.0,
+                   partial_sample_size=5, max_run_time=60.0, measure_memory=True, compact=False, log=print):
+    """
+    Misst alle Strategien und Nachbarschaften für alle Kombinationen aus sizes und Ls.
+    Rechteckseiten liegen in [1, L/2]. Für Greedy zählen die Platzierungen als
+    Bewertungen, für die lokale Suche die bewerteten Nachbarn bzw. Züge.
+    Überschreitet ein Lauf max_run_time Sekunden, wird die Variante für größere n
+    übersprungen. Mit compact=True arbeiten alle Läufe auf CompactRectangleSolution;
+    greedy und local_search frieren ihr Ergebnis ein (siehe solution_memory).
+    :return: Liste von Ergebnis-Dicts (siehe _record)
+    """
+    records = []
+    too_slow = set()
+    for L in Ls:
+        for n in sorted(sizes):
+            random.seed(seed)
+            rects = generate_instances(1, n, 1, max(1, L // 2), 1, max(1, L // 2), L)[0]
+            problem = RectanglePackingProblem(L, rects, compact=compact)
+            bound = problem.objective_lower_bound()
+
+            for sname, make_strategy in greedy_strategies():
+                if ("Greedy", sname, L) in too_slow:
+                    continue
+                sol, wall, cpu, peak = _measure(lambda: greedy(problem, make_strategy()), measure_memory)
+                # vor evaluate_solution messen, das eine kompakte Lösung wieder auftaut
+                memory = _solution_memory(sol)
+                records.append(_record("Greedy", sname, n, L, wall, cpu, peak, n, problem.evaluate_solution(sol),
+                                       bound, memory, problem.solution_penalty(sol)))
+                log(_format_record(records[-1]))
+                if wall > max_run_time:
+                    too_slow.add(("Greedy", sname, L))
+
+            for nname, make_neighbor in neighborhoods():
+                if ("LocalSearch", nname, L) in too_slow:
+                    continue
+                counter = None
+
+                def run():
+                    nonlocal counter
+                    random.seed(seed)
+                    bad_sol = problem.create_empty_solution()
+                    for r in rects:
+                        bad_sol.boxes.append(Box([(r, (0, 0), False)]))
+                    counter = _CountingNeighbor(make_neighbor())
+                    return local_search(problem, bad_sol, counter, max_iter=max_iter, max_time=max_time,
+                                        partial_sample_size=partial_sample_size, stop_at_bound=True)
+
+                sol, wall, cpu, peak = _measure(run, measure_memory=False)
+                evaluations = counter.evaluations
+                if measure_memory:
+                    _, _, _, peak = _measure(run, measure_memory=True)
+                memory = _solution_memory(sol)
+                records.append(_record("LocalSearch", nname, n, L, wall, cpu, peak, evaluations,
+                                       problem.evaluate_solution(sol), bound, memory,
+                                       problem.solution_penalty(sol)))
+                log(_format_record(records[-1]))
+                if wall > max_run_time:
+                    too_slow.add(("LocalSearch", nname, L))
+    return records
+
+
+def fit_complexity(records):
+    """
+    Schätzt pro (alg, variant, L) den Exponenten k in t ~ c * n^k (Kleinste Quadrate
+    im log-log-Raum). Für Greedy wird die Gesamtzeit verwendet, für die lokale
+    Suche die Zeit pro Bewertung (die Gesamtzeit ist dort durch max_time begrenzt).
+    """
+    groups = {}
+    for rec in records:
+        if rec["alg"] == "Greedy":
+            cost = rec["wall_time"]
+        elif rec["evaluations"]:
+            cost = rec["wall_time"] / rec["evaluations"]
+        else:
+            continue
+        if cost > 0:
+            groups.setdefault((rec["alg"], rec["variant"], rec["L"]), []).append((rec["n"], cost))
+
+    fits = []
+    for (alg, variant, L), points in sorted(groups.items()):
+        if len(points) < 2:
+            continue
+        xs = [math.log(n) for n, _ in points]
+        ys = [math.log(cost) for _, cost in points]
+        x_mean = sum(xs) / len(xs)
+        y_mean = sum(ys) / len(ys)
+        sxx = sum((x - x_mean)**2 for x in xs)
+        if sxx == 0:
+            continue
+        exponent = sum((x - x_mean)*(y - y_mean) for x, y in zip(xs, ys)) / sxx
+        fits.append({
+            "alg": alg, "variant": variant, "L": L,
+            "metric": "wall_time" if alg == "Greedy" else "time_per_evaluation",
+            "exponent": exponent, "points": len(points),
+        })
+    return fits
+
+
+def find_regressions(records, baseline_records, tolerance=REGRESSION_TOLERANCE):
+    """
+    Vergleicht Messungen mit gleichem (alg, variant, n, L) mit der Baseline
+    (Zeiten nur oberhalb von MIN_SIGNIFICANT_TIME):
+      - Greedy: Wall-Zeit
+      - lokale Suche: Bewertungen pro Sekunde (die Wall-Zeit ist durch max_time begrenzt)
+      - Zielfunktionswert, falls beide Läufe gleich viele Bewertungen hatten
+        (dann ist der Lauf bei festem Seed deterministisch)
+    """
+    baseline = {_key(rec): rec for rec in baseline_records}
+    regressions = []
+    for rec in records:
+        old = baseline.get(_key(rec))
+        if old is None:
+            continue
+        if (rec["alg"] == "Greedy"
+                and old["wall_time"] >= MIN_SIGNIFICANT_TIME and rec["wall_time"] >= MIN_SIGNIFICANT_TIME
+                and rec["wall_time"] > old["wall_time"]*(1 + tolerance)):
+            regressions.append(_regression(rec, "wall_time", old["wall_time"], rec["wall_time"]))
+        if (rec["alg"] != "Greedy" and old.get("evals_per_sec") and rec.get("evals_per_sec")
+                and rec["wall_time"] >= MIN_SIGNIFICANT_TIME
+                and rec["evals_per_sec"] < old["evals_per_sec"]/(1 + tolerance)):
+            regressions.append(_regression(rec, "evals_per_sec", old["evals_per_sec"], rec["evals_per_sec"]))
+        if rec["evaluations"] == old["evaluations"] and rec["objective"] > old["objective"]:
+            regressions.append(_regression(rec, "objective", old["objective"], rec["objective"]))
+    return regressions
+
+
+def _key(rec):
+    return (rec["alg"], rec["variant"], rec["n"], rec["L"])
+
+
+def _regression(rec, metric, old, new):
+    return {"alg": rec["alg"], "variant": rec["variant"], "n": rec["n"], "L": rec["L"],
+            "metric": metric, "baseline": old, "current": new}
+
+
+def _format_record(rec):
+    peak = "-" if rec["peak_memory"] is None else str(rec["peak_memory"])
+    solution_memory = "-" if rec.get("solution_memory") is None else str(rec["solution_memory"])
+    eps = "-" if rec["evals_per_sec"] is None else f"{rec['evals_per_sec']:.1f}"
+    return ";".join([rec["alg"], rec["variant"], str(rec["n"]), str(rec["L"]), str(rec["objective"]),
+                     str(rec["lower_bound"]), f"{rec['wall_time']:.4f}", f"{rec['cpu_time']:.4f}", peak, solution_memory, eps])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark-Suite für Strategien und Nachbarschaften")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--L", type=int, nargs="+", default=list(DEFAULT_LS), dest="Ls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--max-time", type=float, default=10.0, help="Zeitlimit je lokaler Suche (s)")
+    parser.add_argument("--sample-size", type=int, default=5, help="partial_sample_size der lokalen Suche")
+    parser.add_argument("--max-run-time", type=float, default=60.0,
+                        help="Varianten, die länger brauchen, werden für größere n übersprungen")
+    parser.add_argument("--no-memory", action="store_true", help="Spitzen-Speicher nicht messen")
+    parser.add_argument("--compact", action="store_true", help="CompactRectangleSolution verwenden")
+    parser.add_argument("--output", default=None, help="JSON-Datei für die Ergebnisse")
+    parser.add_argument("--baseline", default=None, help="JSON-Datei einer früheren Messung")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    print("Alg;Variante;RectCount;L;ObjVal;LowerBound;WallTime;CpuTime;PeakMemory;SolutionMemory;EvalsPerSec")
+    records = run_benchmarks(args.sizes, args.Ls, args.seed, args.max_iter, args.max_time,
+                             args.sample_size, args.max_run_time, not args.no_memory, args.compact)
+    fits = fit_complexity(records)
+    print("\nAlg;Variante;L;Metrik;Exponent")
+    for fit in fits:
+        print(f"{fit['alg']};{fit['variant']};{fit['L']};{fit['metric']};O(n^{fit['exponent']:.2f})")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(records, json.load(f)["results"], args.tolerance)
+        print(f"\n{len(regressions)} Regression(en) gegenüber {args.baseline}")
+        for reg in regressions:
+            print(f"{reg['alg']};{reg['variant']};{reg['n']};{reg['L']};{reg['metric']}: "
+                  f"{reg['baseline']} -> {reg['current']}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "arguments": vars(args),
+            },
+            "results": records,
+            "complexity": fits,
+            "regressions": regressions,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if regressions else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
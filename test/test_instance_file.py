@@ -0,0 +1,100 @@
+"""
+Tests für den seeded Instanzgenerator (problem.instance_generator) und das
+Binärformat für Instanzmengen (problem.instance_file). Aufruf aus dem
+Projektverzeichnis:
+    python -m pytest test/test_instance_file.py
+"""
+import gc
+
+import pytest
+
+from problem import instance_generator
+from problem.instance_generator import DISTRIBUTIONS, iter_instances, iter_instance_arrays, write_instances
+from problem.instance_file import InstanceFile, InstanceFileWriter
+from problem.rectangle_packing_problem import Rectangle
+
+
+def _dims(rects):
+    return [(r.width, r.height) for r in rects]
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+def test_generator_is_seeded_and_respects_bounds(distribution):
+    first = list(iter_instances(3, 20, 2, 30, 3, 12, 15, seed=4, distribution=distribution))
+    second = list(iter_instances(3, 20, 2, 30, 3, 12, 15, seed=4, distribution=distribution))
+    assert [_dims(rects) for rects in first] == [_dims(rects) for rects in second]
+    for rects in first:
+        assert len(rects) == 20
+        assert all(2 <= r.width <= 15 and 3 <= r.height <= 12 for r in rects)
+    other = list(iter_instances(3, 20, 2, 30, 3, 12, 15, seed=5, distribution=distribution))
+    assert [_dims(rects) for rects in other] != [_dims(rects) for rects in first]
+
+
+def test_unknown_distribution_raises():
+    with pytest.raises(ValueError):
+        next(iter_instance_arrays(1, 5, 1, 5, 1, 5, 5, distribution="gibt es nicht"))
+
+
+def test_round_trip_arrays_and_rectangles(tmp_path):
+    path = str(tmp_path / "instances.rpin")
+    arrays = list(iter_instance_arrays(4, 50, 1, 20, 1, 20, 20, seed=1, distribution="exponential"))
+    assert write_instances(path, 20, arrays) == 4
+    with InstanceFile(path) as f:
+        assert len(f) == 4
+        assert f.L == 20
+        for i, (widths, heights) in enumerate(arrays):
+            assert f.size(i) == 50
+            w, h = f.arrays(i)
+            assert list(w) == list(widths) and list(h) == list(heights)
+            assert _dims(f[i]) == list(zip(widths.tolist(), heights.tolist()))
+        assert _dims(f[-1]) == _dims(f.rectangles(3))
+        problem = f.problem(2)
+        assert problem.L == 20 and _dims(problem.rectangles) == _dims(f[2])
+        with pytest.raises(IndexError):
+            f.records(4)
+
+
+def test_round_trip_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(instance_generator, "np", None)
+    instances = list(iter_instances(3, 6, 2, 9, 2, 9, 8, seed=2, distribution="bimodal"))
+    path = str(tmp_path / "instances.rpin")
+    write_instances(path, 8, instances + [[]])
+    with InstanceFile(path) as f:
+        assert [_dims(rects) for rects in f] == [_dims(rects) for rects in instances] + [[]]
+        assert f.size(3) == 0
+
+
+def test_writer_rejects_mismatched_columns_and_aborts(tmp_path):
+    path = tmp_path / "instances.rpin"
+    with pytest.raises(ValueError):
+        with InstanceFileWriter(str(path), 10) as writer:
+            writer.add([Rectangle(2, 3)])
+            writer.add_arrays([1, 2], [3])
+    # abgebrochen: weder Datei noch temporäre Datei bleiben liegen
+    assert not path.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("content", [b"RP", b"XXXX" + bytes(60), b"RPIN" + bytes([99]) + bytes(59)])
+def test_invalid_files_raise_value_error(tmp_path, content):
+    path = tmp_path / "bad.rpin"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        InstanceFile(str(path))
+
+
+def test_views_outlive_close(tmp_path):
+    path = str(tmp_path / "instances.rpin")
+    write_instances(path, 20, iter_instance_arrays(3, 10, 1, 9, 1, 9, 20, seed=1))
+    with InstanceFile(path) as f:
+        expected = _dims(f[0])
+        w, h = f.arrays(0)
+        records = f.records(1)
+    assert f.closed
+    assert list(zip(list(w), list(h))) == expected
+    assert len(records) == 20
+    with pytest.raises(ValueError):
+        f.records(0)
+    f.close()  # zweites close ist harmlos
+    del w, h, records
+    gc.collect()
@@ -0,0 +1,83 @@
+"""
+Test für algorithms.metrics: jeder Messpunkt aus INSTRUMENTATION muss bei einem
+kleinen Lauf über alle Strategien und Nachbarschaften tatsächlich aufgerufen
+werden (fängt Umbenennungen und umgestellte Aufrufer ab). Aufruf aus dem
+Projektverzeichnis:
+    python -m pytest test/test_metrics.py
+"""
+import copy
+import random
+
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
+from algorithms import metrics
+from algorithms.greedy import greedy
+from algorithms.local_search import local_search
+from strategies.bottomleft_strategy import StrategyBottomLeft
+from strategies.guillotine_strategy import StrategyGuillotine
+from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
+from neighbors.overlapping_neighbor import OverlappingNeighbor
+from neighbors.rule_based_neighbor import RuleBasedNeighbor
+
+
+class _ListOnly:
+    """Nur die Listen-Schnittstelle einer Nachbarschaft (local_search nutzt dann _neighbor_step)."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def get_neighbors(self, problem, solution):
+        return self.inner.get_neighbors(problem, solution)
+
+    def get_neighbors_subset(self, problem, solution, sample_size):
+        return self.inner.get_neighbors_subset(problem, solution, sample_size)
+
+
+def _workload():
+    random.seed(5)
+    rects = generate_instances(1, 40, 1, 8, 1, 8, 20)[0]
+    for compact in (False, True):
+        problem = RectanglePackingProblem(20, rects, compact=compact)
+        for strategy in (StrategyGuillotine(), StrategyBottomLeft(), StrategyBottomLeft(mode="skyline")):
+            greedy(problem, strategy)
+        shelf = problem.create_empty_solution()
+        for r in rects:
+            problem.place_rectangle_shelf(r, shelf)
+        copy.deepcopy(shelf)
+
+        def start():
+            solution = problem.create_empty_solution()
+            for r in rects:
+                solution.boxes.append(Box([(r, (0, 0), False)]))
+            return solution
+
+        local_search(problem, start(), GeometryBasedNeighbor(max_shift=3, neighbor_count=3), max_iter=5,
+                     partial_sample_size=3)
+        local_search(problem, start(), RuleBasedNeighbor(swaps_per_call=3), max_iter=3, partial_sample_size=3)
+        local_search(problem, start(), OverlappingNeighbor(initial_overlap_ratio=100, decrement=10), max_iter=3,
+                     partial_sample_size=3)
+        local_search(problem, start(), _ListOnly(GeometryBasedNeighbor(max_shift=3, neighbor_count=3)), max_iter=3,
+                     partial_sample_size=3)
+        local_search(problem, start(), GeometryBasedNeighbor(max_shift=3, neighbor_count=3), max_iter=2,
+                     partial_sample_size=3, workers=2)
+
+
+def test_every_instrumentation_hook_is_called():
+    with metrics.collecting() as collected:
+        _workload()
+        hooks = metrics.hook_counts()
+    silent = sorted(hook for hook, calls in hooks.items() if calls == 0)
+    assert not silent, f"Messpunkte ohne Aufruf: {silent}"
+    assert all(count > 0 for count in collected.result["counters"].values())
+    assert collected.result["timers"]["local_search.iteration"]["count"] > 0
+    assert not metrics.is_enabled()
+
+
+def test_disable_restores_originals():
+    original = RectanglePackingProblem.evaluate_solution
+    metrics.enable()
+    try:
+        assert RectanglePackingProblem.evaluate_solution is not original
+    finally:
+        metrics.disable()
+    assert RectanglePackingProblem.evaluate_solution is original
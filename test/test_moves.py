@@ -0,0 +1,146 @@
+"""
+Tests für die Move-API (neighbors.moves) und das Weiterpacken ab Prefix-Checkpoints
+der regelbasierten Nachbarschaft: delta/apply/undo/materialize müssen zur
+vollständigen Bewertung passen, Checkpoint-Dekodierung zur Dekodierung von vorne.
+Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_moves.py
+"""
+import random
+from array import array
+
+import pytest
+
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
+from problem.shelf_packing import ShelfDecoder
+from problem.zobrist import solution_hash
+from algorithms.greedy import greedy
+from strategies.guillotine_strategy import StrategyGuillotine
+from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
+from neighbors.overlapping_neighbor import OverlappingNeighbor
+from neighbors.rule_based_neighbor import RuleBasedNeighbor
+
+NEIGHBORS = [
+    lambda: GeometryBasedNeighbor(max_shift=3, neighbor_count=4),
+    lambda: RuleBasedNeighbor(swaps_per_call=6),
+    lambda: OverlappingNeighbor(initial_overlap_ratio=100, decrement=10),
+]
+
+
+def _problem(compact=False):
+    random.seed(4)
+    rects = generate_instances(1, 50, 1, 9, 1, 9, 20)[0]
+    return RectanglePackingProblem(20, rects, compact=compact)
+
+
+def _placements(problem, solution):
+    index = {id(r): i for i, r in enumerate(problem.rectangles)}
+    return [[(index[id(r)], pos, bool(rot)) for (r, pos, rot) in box] for box in solution.boxes]
+
+
+def _starts(problem):
+    """Greedy-Lösung und eine schlechte Startlösung (jedes Rechteck in eigener Box)."""
+    bad = problem.create_empty_solution()
+    for r in problem.rectangles:
+        bad.boxes.append(Box([(r, (0, 0), False)]))
+    return [greedy(problem, StrategyGuillotine()), bad]
+
+
+def _fresh_value(problem, solution):
+    """Zielfunktionswert ohne gecachte Box-Strafen."""
+    return len(solution.boxes)*problem.BOX_COST + \
+        sum(problem._compute_box_penalty(box_content) for box_content in solution.boxes)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("make_neighbor", NEIGHBORS)
+def test_delta_apply_undo_materialize(make_neighbor, compact):
+    problem = _problem(compact)
+    neighbor = make_neighbor()
+    for solution in _starts(problem):
+        random.seed(9)
+        value = problem.evaluate_solution(solution)
+        before = _placements(problem, solution)
+        before_hash = solution_hash(solution)
+        moves = neighbor.get_moves_subset(problem, solution, 8)
+        assert moves
+        for move in moves:
+            delta = move.delta(problem, solution)
+            expected_hash = move.result_hash(solution, before_hash)
+
+            neighbor_solution = move.materialize(solution)
+            assert _placements(problem, solution) == before
+            assert problem.evaluate_solution(neighbor_solution) == value + delta
+            assert _fresh_value(problem, neighbor_solution) == value + delta
+
+            move.apply(solution)
+            assert _placements(problem, solution) == _placements(problem, neighbor_solution)
+            assert problem.evaluate_solution(solution) == value + delta
+            if expected_hash is not None:
+                assert expected_hash == solution_hash(solution)
+
+            move.undo(solution)
+            assert _placements(problem, solution) == before
+            assert problem.evaluate_solution(solution) == value
+            assert solution_hash(solution) == before_hash
+
+
+def test_undo_without_apply_raises():
+    problem = _problem()
+    solution = _starts(problem)[0]
+    move = GeometryBasedNeighbor(max_shift=3).get_moves_subset(problem, solution, 3)[0]
+    with pytest.raises(RuntimeError):
+        move.undo(solution)
+
+
+@pytest.mark.parametrize("make_neighbor", NEIGHBORS)
+def test_moves_match_neighbor_solutions(make_neighbor):
+    """get_moves_subset + materialize liefert dieselben Nachbarn wie get_neighbors_subset."""
+    problem = _problem()
+    for solution in _starts(problem):
+        random.seed(21)
+        from_moves = [move.materialize(solution) for move in make_neighbor().get_moves_subset(problem, solution, 5)]
+        random.seed(21)
+        from_list = make_neighbor().get_neighbors_subset(problem, solution, 5)
+        assert [_placements(problem, s) for s in from_moves] == [_placements(problem, s) for s in from_list]
+
+
+@pytest.mark.parametrize("interval", [1, 3, 7, 16])
+def test_checkpoint_decode_matches_decode_from_scratch(interval):
+    problem = _problem()
+    decoder = ShelfDecoder(problem.rectangles, problem.L)
+    rng = random.Random(interval)
+    order = array('i', range(len(problem.rectangles)))
+    rng.shuffle(order)
+    parent = decoder.decode(order, interval)
+    for _ in range(30):
+        new_order = order[:]
+        i, j = rng.sample(range(len(order)), 2)
+        new_order[i], new_order[j] = new_order[j], new_order[i]
+        resumed = decoder.decode(new_order, interval, parent, min(i, j))
+        scratch = decoder.decode(new_order, interval)
+        for column in ('box_of', 'x', 'y', 'rotated', 'shelves'):
+            assert getattr(resumed, column) == getattr(scratch, column)
+        assert len(resumed.checkpoints) == len(scratch.checkpoints)
+        # Shelf-Packungen sind zulässig, der Null-Strafen-Cache von materialize stimmt also
+        boxes = decoder.materialize(resumed, Box)
+        assert all(problem._compute_box_penalty(box_content) == 0 for box_content in boxes)
+
+
+def test_rule_neighbors_resume_from_known_packing():
+    """Nachbarn einer selbst gepackten Lösung (Checkpoints) entsprechen einer Packung von vorne."""
+    problem = _problem()
+    neighbor = RuleBasedNeighbor(swaps_per_call=4, checkpoint_interval=5)
+    random.seed(2)
+    first = neighbor.get_moves_subset(problem, _starts(problem)[1], 1)[0]
+    solution = first.materialize(_starts(problem)[1])
+    parent = neighbor._lookup_packing(problem, solution)
+    assert parent is not None
+    decoder = ShelfDecoder(problem.rectangles, problem.L)
+    for neighbor_solution in neighbor.get_neighbors_subset(problem, solution, 4):
+        order = decoder.indices(r for box in neighbor_solution.boxes for (r, _, _) in box)
+        # gleiche Permutation in Box-Reihenfolge neu gepackt ergibt dieselben Boxen
+        shelf = problem.create_empty_solution()
+        for i in order:
+            problem.place_rectangle_shelf(problem.rectangles[i], shelf)
+        assert _placements(problem, shelf) == _placements(problem, neighbor_solution)
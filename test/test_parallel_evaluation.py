@@ -0,0 +1,39 @@
+"""
+Regressionstest: local_search mit workers > 1 für alle Nachbarschaften
+(einfache und kompakte Lösungen). Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_parallel_evaluation.py
+"""
+import random
+
+import pytest
+
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
+from algorithms.local_search import local_search
+from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
+from neighbors.rule_based_neighbor import RuleBasedNeighbor
+from neighbors.overlapping_neighbor import OverlappingNeighbor
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("make_neighbor", [GeometryBasedNeighbor, RuleBasedNeighbor, OverlappingNeighbor])
+def test_local_search_with_workers(make_neighbor, compact):
+    random.seed(3)
+    rects = generate_instances(1, 40, 1, 9, 1, 9, 20)[0]
+    problem = RectanglePackingProblem(20, rects, compact=compact)
+    start = problem.create_empty_solution()
+    for r in rects:
+        start.boxes.append(Box([(r, (0, 0), False)]))
+    start_value = problem.evaluate_solution(start)
+
+    reported = []
+
+    def snapshot_cb(sol, iteration, val, elapsed):
+        # der von local_search fortgeschriebene Wert muss zur Lösung passen
+        reported.append((val, problem.evaluate_solution(sol)))
+
+    best = local_search(problem, start, make_neighbor(), max_iter=20, max_time=30.0, partial_sample_size=4,
+                        snapshot_callback=snapshot_cb, workers=2, parallel_seed=1, stop_at_bound=False)
+    assert sorted(id(r) for box in best.boxes for (r, _, _) in box) == sorted(id(r) for r in rects)
+    assert all(val == actual for val, actual in reported)
+    assert problem.evaluate_solution(best) <= start_value
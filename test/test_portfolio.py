@@ -0,0 +1,76 @@
+"""
+Tests für das Multi-Start-Portfolio (algorithms.portfolio): Zeitbudget und
+Anzahl gleichzeitig laufender Runden. Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_portfolio.py
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem
+from algorithms import portfolio
+from algorithms.portfolio import RunSpec, run_portfolio
+
+# Puffer für Prozessstart und die letzte, noch laufende Iteration (Sekunden)
+SLACK = 1.5
+
+
+def _problem():
+    random.seed(11)
+    rects = generate_instances(1, 400, 1, 12, 1, 12, 40)[0]
+    return RectanglePackingProblem(40, rects)
+
+
+def _specs(count):
+    # ohne Abbruch an der Schranke nutzt jede Runde ihr volles Zeitbudget
+    return [RunSpec(start="random", neighbor="geometry", seed=i,
+                    search_kwargs={"partial_sample_size": 20, "max_iter": 10**6, "stop_at_bound": False})
+            for i in range(count)]
+
+
+def test_portfolio_respects_deadline():
+    problem = _problem()
+    max_time = 1.0
+    started = time.time()
+    result = run_portfolio(problem, _specs(6), workers=2, max_time=max_time, round_time=0.4)
+    assert time.time() - started < max_time + SLACK
+    assert all(elapsed < max_time + SLACK for (elapsed, _, _, _, _) in result.history)
+    assert result.best_value == problem.evaluate_solution(result.best_solution)
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    """Thread-Pool statt Prozess-Pool, der bei jeder Übergabe die Zahl offener Runden und das Budget notiert."""
+
+    submissions = []  # (offene Runden inkl. der neuen, Zeitpunkt, max_time der Runde)
+
+    def __init__(self, max_workers, initializer, initargs):
+        super().__init__(max_workers=max_workers, initializer=initializer, initargs=initargs)
+        self._futures = []
+
+    def submit(self, fn, task):
+        future = super().submit(fn, task)
+        self._futures.append(future)
+        open_rounds = sum(1 for f in self._futures if not f.done() or f is future)
+        self.submissions.append((open_rounds, time.time(), task[-1]))
+        return future
+
+
+def test_portfolio_submits_at_most_workers_rounds(monkeypatch):
+    monkeypatch.setattr(portfolio, "ProcessPoolExecutor", _RecordingExecutor)
+    monkeypatch.setattr(_RecordingExecutor, "submissions", [])
+    problem = _problem()
+    max_time = 1.0
+    started = time.time()
+    run_portfolio(problem, _specs(8), workers=2, max_time=max_time, round_time=0.3)
+    submissions = _RecordingExecutor.submissions
+    assert submissions
+    assert max(open_rounds for (open_rounds, _, _) in submissions) <= 2
+    # jede Runde endet spätestens zur Deadline
+    assert all(at + budget <= started + max_time + 0.05 for (_, at, budget) in submissions)
+
+
+def test_portfolio_max_rounds():
+    problem = _problem()
+    result = run_portfolio(problem, _specs(3), workers=2, max_time=30.0, round_time=0.2, max_rounds=1)
+    assert sorted(run_idx for (_, run_idx, _, _, _) in result.history) == [0, 1, 2]
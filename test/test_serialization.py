@@ -0,0 +1,130 @@
+"""
+Tests für das Binärformat für Probleme und Lösungen (problem.serialization):
+Round-Trip normal/kompakt, Spalten, diff_solutions und Fehlerfälle. Aufruf aus
+dem Projektverzeichnis:
+    python -m pytest test/test_serialization.py
+"""
+import gc
+
+import pytest
+
+from problem.instance_generator import iter_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Rectangle
+from problem.serialization import SolutionFile, SolutionWriter, diff_solutions, save_problem, save_solution
+from problem.zobrist import solution_hash
+from algorithms.greedy import greedy
+from strategies.guillotine_strategy import StrategyGuillotine
+
+
+def _placements(solution, rectangles):
+    index = {id(r): i for i, r in enumerate(rectangles)}
+    return [[(index[id(r)], pos, bool(rot)) for (r, pos, rot) in box] for box in solution.boxes]
+
+
+@pytest.fixture
+def rects():
+    return next(iter_instances(1, 200, 1, 12, 1, 12, 20, seed=3))
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_round_trip(tmp_path, rects, compact):
+    path = str(tmp_path / "solution.rps")
+    problem = RectanglePackingProblem(20, rects, compact=compact)
+    solution = greedy(problem, StrategyGuillotine())
+    value = problem.evaluate_solution(solution)
+    if compact:
+        solution.freeze()
+    save_solution(path, problem, solution)
+    with SolutionFile(path) as f:
+        assert (f.L, f.rect_count, f.box_count, f.placement_count) == (20, 200, len(solution.boxes), 200)
+        restored = f.solution(problem)
+        assert type(restored) is type(solution)
+        assert _placements(restored, rects) == _placements(solution, rects)
+        assert problem.evaluate_solution(restored) == value
+        assert solution_hash(restored) == solution_hash(solution)
+        # ohne Problem: Rechtecke kommen aus der Datei
+        own_problem = f.problem()
+        assert [(r.width, r.height) for r in own_problem.rectangles] == [(r.width, r.height) for r in rects]
+        assert own_problem.evaluate_solution(f.solution()) == value
+        assert sorted(f.column("rect_id").tolist()) == list(range(200))
+
+
+def test_problem_only_file(tmp_path, rects):
+    path = str(tmp_path / "problem.rps")
+    save_problem(path, RectanglePackingProblem(20, rects))
+    with SolutionFile(path) as f:
+        assert (f.box_count, f.placement_count) == (0, 0)
+        assert len(f.problem().rectangles) == 200
+        assert f.solution().boxes == []
+
+
+def test_other_instance_is_rejected(tmp_path, rects):
+    path = str(tmp_path / "solution.rps")
+    problem = RectanglePackingProblem(20, rects)
+    save_solution(path, problem, greedy(problem, StrategyGuillotine()))
+    with SolutionFile(path) as f:
+        with pytest.raises(ValueError):
+            f.solution(RectanglePackingProblem(20, rects[:-1]))
+        with pytest.raises(ValueError):
+            f.solution(RectanglePackingProblem(30, rects))
+
+
+def test_foreign_rectangle_aborts_writer(tmp_path, rects):
+    path = tmp_path / "solution.rps"
+    with pytest.raises(ValueError):
+        with SolutionWriter(str(path), RectanglePackingProblem(20, rects)) as writer:
+            writer.add_box([(Rectangle(2, 2), (0, 0), False)])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_diff_ignores_box_order(tmp_path, rects):
+    problem = RectanglePackingProblem(20, rects)
+    solution = greedy(problem, StrategyGuillotine())
+    save_solution(str(tmp_path / "a.rps"), problem, solution)
+    changed = solution.copy()
+    changed.boxes.reverse()
+    save_solution(str(tmp_path / "b.rps"), problem, changed)
+    box = changed.writable_box(0)
+    r, (x, y), rot = box[0]
+    box[0] = (r, (x + 1, y), rot)
+    save_solution(str(tmp_path / "c.rps"), problem, changed)
+    rid = next(i for i, rect in enumerate(rects) if rect is r)
+    with SolutionFile(str(tmp_path / "a.rps")) as a, SolutionFile(str(tmp_path / "b.rps")) as b, \
+            SolutionFile(str(tmp_path / "c.rps")) as c:
+        assert diff_solutions(a, b) == []
+        diff = diff_solutions(a, c)
+        assert [entry[0] for entry in diff] == [rid]
+        _, old, new = diff[0]
+        assert (new[1], new[2]) == (old[1] + 1, old[2])
+
+
+def test_diff_of_different_instances_raises(tmp_path, rects):
+    save_problem(str(tmp_path / "a.rps"), RectanglePackingProblem(20, rects))
+    other = [Rectangle(r.height, r.width) for r in rects]
+    save_problem(str(tmp_path / "b.rps"), RectanglePackingProblem(20, other))
+    with SolutionFile(str(tmp_path / "a.rps")) as a, SolutionFile(str(tmp_path / "b.rps")) as b:
+        with pytest.raises(ValueError):
+            diff_solutions(a, b)
+
+
+@pytest.mark.parametrize("content", [b"RP", b"XXXX" + bytes(60), b"RPSF" + bytes([99]) + bytes(59)])
+def test_invalid_files_raise_value_error(tmp_path, content):
+    path = tmp_path / "bad.rps"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        SolutionFile(str(path))
+
+
+def test_columns_outlive_close(tmp_path, rects):
+    path = str(tmp_path / "solution.rps")
+    problem = RectanglePackingProblem(20, rects)
+    save_solution(path, problem, greedy(problem, StrategyGuillotine()))
+    with SolutionFile(path) as f:
+        expected = f.column("x").tolist()
+        xs = f.column("x")
+    assert f.closed
+    assert xs.tolist() == expected
+    with pytest.raises(ValueError):
+        f.column("y")
+    del xs
+    gc.collect()
@@ -0,0 +1,112 @@
+"""
+Tests für das Delta-Snapshot-Log der Visualisierung (gui.snapshot_log):
+Rekonstruktion an Keyframes und dazwischen, wahlfreier Zugriff, Cursor,
+schrumpfende Boxanzahl und clear(). Aufruf aus dem Projektverzeichnis:
+    python -m pytest test/test_snapshot_log.py
+"""
+import random
+
+import pytest
+
+from gui.snapshot_log import SnapshotLog
+from problem.instance_generator import generate_instances
+from problem.rectangle_packing_problem import RectanglePackingProblem, Box
+from algorithms.local_search import local_search
+from neighbors.geometry_based_neighbor import GeometryBasedNeighbor
+from strategies.bottomleft_strategy import StrategyBottomLeft
+
+
+def _picture(solution):
+    """Was die GUI zeichnet: pro Box die Platzierungen als Maße, ohne Rechteck-Identität."""
+    return [sorted((r.width, r.height, x, y, bool(rot)) for (r, (x, y), rot) in box_content)
+            for box_content in solution.boxes]
+
+
+def _record_run(keyframe_interval):
+    random.seed(1)
+    rects = generate_instances(1, 120, 1, 9, 1, 9, 20)[0]
+    problem = RectanglePackingProblem(20, rects)
+    log = SnapshotLog(keyframe_interval=keyframe_interval)
+    pictures = []
+    # Greedy-Aufbau (Boxen kommen hinzu) ...
+    strategy = StrategyBottomLeft()
+    solution = problem.create_empty_solution()
+    for i, r in enumerate(strategy.get_ordered_rectangles(rects)):
+        solution = strategy.place_rectangle_in_solution(r, solution, problem)
+        if i % 5 == 0:
+            log.append(solution, f"greedy {i}")
+            pictures.append(_picture(solution))
+    # ... und lokale Suche ab einer Box pro Rechteck (Boxen verschwinden)
+    start = problem.create_empty_solution()
+    for r in rects:
+        start.boxes.append(Box([(r, (0, 0), False)]))
+
+    def callback(current, iteration, value, elapsed):
+        log.append(current, f"iteration {iteration}")
+        pictures.append(_picture(current))
+
+    local_search(problem, start, GeometryBasedNeighbor(max_shift=3, neighbor_count=4), max_iter=60,
+                 max_time=30.0, partial_sample_size=5, snapshot_callback=callback)
+    return log, pictures
+
+
+@pytest.mark.parametrize("keyframe_interval", [1, 4, 32])
+def test_every_step_is_reconstructed(keyframe_interval):
+    log, pictures = _record_run(keyframe_interval)
+    assert len(log) == len(pictures) > keyframe_interval
+    assert len(pictures[-1]) < max(len(p) for p in pictures)  # Boxanzahl ist geschrumpft
+    rng = random.Random(3)
+    forward = list(range(len(log)))
+    order = forward + forward[::-1] + rng.sample(forward, len(forward))
+    for idx in order:
+        solution, _ = log[idx]
+        assert _picture(solution) == pictures[idx], idx
+    assert _picture(log[-1][0]) == pictures[-1]
+    labels = [log[idx][1] for idx in forward]
+    assert labels[0] == "greedy 0" and labels[-1].startswith("iteration")
+
+
+def test_reconstructed_solution_is_independent_of_the_log():
+    log, pictures = _record_run(4)
+    solution, _ = log[5]
+    solution.boxes.clear()
+    assert _picture(log[5][0]) == pictures[5]
+    assert _picture(log[6][0]) == pictures[6]
+
+
+def test_solution_changed_after_append_does_not_change_snapshot():
+    random.seed(2)
+    rects = generate_instances(1, 10, 1, 5, 1, 5, 10)[0]
+    problem = RectanglePackingProblem(10, rects)
+    solution = problem.create_empty_solution()
+    solution.boxes.append(Box([(r, (0, 0), False) for r in rects[:5]]))
+    log = SnapshotLog(keyframe_interval=2)
+    log.append(solution, "vorher")
+    expected = _picture(solution)
+    copied = solution.copy()
+    copied.writable_box(0).pop()
+    copied.boxes.append(Box([(r, (0, 0), False) for r in rects[5:]]))
+    log.append(copied, "nachher")
+    assert _picture(log[0][0]) == expected
+    assert _picture(log[1][0]) == _picture(copied)
+    assert [log[i][1] for i in range(len(log))] == ["vorher", "nachher"]
+
+
+def test_index_errors_and_clear():
+    log, _ = _record_run(8)
+    assert log
+    with pytest.raises(IndexError):
+        log[len(log)]
+    with pytest.raises(IndexError):
+        log[-len(log) - 1]
+    log.clear()
+    assert not log and len(log) == 0
+    with pytest.raises(IndexError):
+        log[0]
+    # nach clear beginnt das Log wieder mit einem Keyframe
+    random.seed(0)
+    rects = generate_instances(1, 4, 1, 3, 1, 3, 10)[0]
+    solution = RectanglePackingProblem(10, rects).create_empty_solution()
+    solution.boxes.append(Box([(r, (0, 0), False) for r in rects]))
+    log.append(solution, "neu")
+    assert _picture(log[0][0]) == _picture(solution)